@@ -0,0 +1,114 @@
+import os
+from typing import Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+Color = Tuple[int, int, int]
+Palette = Mapping[str, Sequence[Color]]
+
+# Euclidean RGB distance still counted as a palette colour
+COLOR_TOLERANCE = float(os.getenv("PIXEL_COLOR_TOLERANCE", 24))
+# Half-size of the square patch sampled around a point (1 = 3x3)
+PATCH_RADIUS = int(os.getenv("PIXEL_PATCH_RADIUS", 1))
+# Confidence a label needs to count as a match
+MIN_CONFIDENCE = float(os.getenv("PIXEL_MIN_CONFIDENCE", 0.5))
+
+
+class ColorMatch(NamedTuple):
+    """Best palette label for a patch of pixels; label is None if nothing is close."""
+
+    label: Optional[str]
+    confidence: float
+    distance: float
+    color: Color
+
+    @property
+    def exact(self) -> bool:
+        return self.label is not None and self.distance == 0
+
+
+def _nearest_labels(
+    pixels: np.ndarray, palette: Palette, tolerance: float
+) -> Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Labels, then for (n, 3) `pixels`: index of each pixel's nearest label,
+    whether it is within `tolerance`, and the (n, labels) distances.
+    """
+    labels = list(palette)
+    colors = np.array([c for label in labels for c in palette[label]], dtype=float)
+    starts = np.cumsum([0] + [len(palette[label]) for label in labels[:-1]])
+
+    # (pixels, colours) distances, then the closest colour of each label
+    distances = np.linalg.norm(pixels[:, None, :] - colors[None, :, :], axis=2)
+    label_distances = np.minimum.reduceat(distances, starts, axis=1)
+    nearest = label_distances.argmin(axis=1)
+    within = label_distances.min(axis=1) <= tolerance
+    return labels, nearest, within, label_distances
+
+
+def classify_patch(
+    patch: np.ndarray,
+    palette: Palette,
+    center: Optional[Tuple[int, int]] = None,
+    tolerance: float = COLOR_TOLERANCE,
+) -> ColorMatch:
+    """
+    Classify an (h, w, 3) patch against every palette colour at once.
+    Each pixel votes for its nearest label if it is within `tolerance`. The
+    center pixel weighs as much as all its neighbours together, so the center
+    alone gives 0.5 and a near-miss center can be outvoted by its neighbourhood.
+    """
+    patch = np.asarray(patch)
+    h, w = patch.shape[:2]
+    pixels = patch.reshape(-1, 3).astype(float)
+    cy, cx = center if center is not None else (h // 2, w // 2)
+    center_index = cy * w + cx
+
+    labels, nearest, within, label_distances = _nearest_labels(
+        pixels, palette, tolerance
+    )
+
+    weights = np.ones(len(pixels))
+    weights[center_index] = max(len(pixels) - 1, 1)
+    scores = (
+        np.bincount(nearest[within], weights=weights[within], minlength=len(labels))
+        / weights.sum()
+    )
+
+    best = int(scores.argmax())
+    center_color = tuple(int(c) for c in patch.reshape(-1, 3)[center_index])
+    return ColorMatch(
+        labels[best] if scores[best] > 0 else None,
+        float(scores[best]),
+        float(label_distances[center_index, best]),
+        center_color,
+    )
+
+
+def classify_rows(
+    strip: np.ndarray,
+    palette: Palette,
+    tolerance: float = COLOR_TOLERANCE,
+    min_confidence: float = MIN_CONFIDENCE,
+) -> Tuple[list, np.ndarray, np.ndarray]:
+    """
+    Classify every row of an (h, w, 3) strip in one pass, with the same
+    majority rule as classify_patch (every pixel of a row weighs the same).
+    Returns the palette labels, then per row the index of its label (-1 if
+    no label reaches `min_confidence`) and that label's confidence.
+    """
+    strip = np.asarray(strip)
+    h, w = strip.shape[:2]
+    labels, nearest, within, _ = _nearest_labels(
+        strip.reshape(-1, 3).astype(float), palette, tolerance
+    )
+
+    # (rows, labels) share of each row's pixels voting for each label
+    votes = np.zeros((h, len(labels)))
+    rows = np.repeat(np.arange(h), w)
+    np.add.at(votes, (rows[within], nearest[within]), 1.0)
+    shares = votes / w
+
+    best = shares.argmax(axis=1)
+    confidence = shares[np.arange(h), best]
+    return labels, np.where(confidence >= min_confidence, best, -1), confidence
@@ -1,38 +1,29 @@
 import time
-import win32gui
 import pyautogui
 import pygetwindow as gw
-
-from utils.constants.button_coords import REF_WINDOW_SIZES
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+from commands.color_classifier import (
+    MIN_CONFIDENCE,
+    PATCH_RADIUS,
+    ColorMatch,
+    Palette,
+    classify_patch,
+)
+from commands.frame_cache import frame_cache
+from commands.window_transform import window_transforms
+from utils.metrics import metrics
 from utils.logging_config import configure_logging
 
 logger = configure_logging("Coords")
 
 
-def _client_to_screen(hwnd, point):
-    """Win32 ClientToScreen in physical px; returns (x,y) in physical px."""
-    ox, oy = win32gui.ClientToScreen(hwnd, (0, 0))
-    return ox + point[0], oy + point[1]
-
-
-def _scale_for_window(hwnd, logical_point, state_name):
-    """Turn a logical_point in your design coords into a physical client px tuple."""
-    ref_sizes = REF_WINDOW_SIZES.get(state_name)
-    if not ref_sizes:
-        logger.error(
-            f"State name '{state_name}' not found in REF_WINDOW_SIZES, using default size."
-        )
-        ref_w, ref_h = 1024, 768
-    else:
-        ref_w, ref_h = ref_sizes
-
-    left, top, right, bottom = win32gui.GetClientRect(hwnd)
-    actual_w, actual_h = right - left, bottom - top
-
-    sx, sy = actual_w / ref_w, actual_h / ref_h
-    phys_x = int(logical_point[0] * sx)
-    phys_y = int(logical_point[1] * sy)
-    return phys_x, phys_y
+def _to_screen(logical_point, window, state_name) -> Tuple[int, int]:
+    """Screen px of a logical client point through the window's cached transform."""
+    if window:
+        return window_transforms.get(window).point_to_screen(logical_point, state_name)
+    return logical_point
 
 
 def click(logical_point, window=None, state_name="LE_CHEMINOT"):
@@ -43,12 +34,7 @@ def click(logical_point, window=None, state_name="LE_CHEMINOT"):
     if window is None:
         window = gw.getActiveWindow()
 
-    if window:
-        hwnd = window._hWnd
-        phys_pt = _scale_for_window(hwnd, logical_point, state_name)
-        screen_x, screen_y = _client_to_screen(hwnd, phys_pt)
-    else:
-        screen_x, screen_y = logical_point
+    screen_x, screen_y = _to_screen(logical_point, window, state_name)
 
     _nudge_from_corners()
     moveTo(
@@ -58,6 +44,7 @@ def click(logical_point, window=None, state_name="LE_CHEMINOT"):
         state_name=state_name,
     )
     pyautogui.click(screen_x, screen_y)
+    frame_cache.invalidate()
 
 
 def moveTo(logical_point, window=None, duration=0.0, state_name="LE_CHEMINOT"):
@@ -67,119 +54,146 @@ def moveTo(logical_point, window=None, duration=0.0, state_name="LE_CHEMINOT"):
     if window is None:
         window = gw.getActiveWindow()
 
-    if window:
-        hwnd = window._hWnd
-        phys_pt = _scale_for_window(hwnd, logical_point, state_name)
-        screen_x, screen_y = _client_to_screen(hwnd, phys_pt)
-    else:
-        screen_x, screen_y = logical_point
+    screen_x, screen_y = _to_screen(logical_point, window, state_name)
 
     _nudge_from_corners()
     pyautogui.moveTo(screen_x, screen_y, duration=duration)
+    # Hovering can change what's on screen
+    frame_cache.invalidate()
 
 
 def pixel(logical_point, window=None, state_name="LE_CHEMINOT"):
     """
     Read the screen-pixel at the logical client-relative point.
+    Reads from the cached frame of `window` when possible.
     """
     if window is None:
         window = gw.getActiveWindow()
 
     if window:
-        hwnd = window._hWnd
-        phys_pt = _scale_for_window(hwnd, logical_point, state_name)
-        screen_x, screen_y = _client_to_screen(hwnd, phys_pt)
-    else:
-        screen_x, screen_y = logical_point
+        frame = frame_cache.get(window)
+        if frame is not None:
+            try:
+                return frame.pixel(logical_point, state_name)
+            except IndexError as e:
+                logger.debug(f"Falling back to a live pixel read: {e}")
+
+    screen_x, screen_y = _to_screen(logical_point, window, state_name)
 
     return pyautogui.pixel(screen_x, screen_y)
 
 
+def pixels(
+    logical_points: Sequence[Tuple[int, int]], window=None, state_name="LE_CHEMINOT"
+) -> Optional[np.ndarray]:
+    """
+    Batched read of many logical client-relative points from one cached frame.
+    Returns an (n, 3) RGB array, or None if the window could not be captured.
+    """
+    frame = frame_cache.get(window)
+    if frame is None:
+        return None
+    return frame.pixels(logical_points, state_name)
+
+
+def classify_pixel(
+    logical_point,
+    palette: Palette,
+    window=None,
+    state_name="LE_CHEMINOT",
+    radius: int = PATCH_RADIUS,
+) -> ColorMatch:
+    """
+    Classify the patch around a logical client-relative point against a
+    palette of labelled colours, from the cached frame of `window`.
+    Falls back to a single live pixel read when there is no frame.
+    """
+    if window is None:
+        window = gw.getActiveWindow()
+
+    if window:
+        frame = frame_cache.get(window)
+        patch = frame.patch(logical_point, radius, state_name) if frame else None
+        if patch is not None:
+            return classify_patch(patch[0], palette, center=patch[1])
+
+    color = pixel(logical_point, window=window, state_name=state_name)
+    return classify_patch(np.array([[color]]), palette)
+
+
 def is_pixel_color_match(
     window,
     coords,
     element_name="element",
     expected_colors=None,
-    max_attempts=3,
-    retry_delay=0.5,
+    max_attempts=1,
+    retry_delay=0.0,
+    min_confidence=MIN_CONFIDENCE,
 ):
     """
-    Universal function to check if a pixel at given coordinates exactly matches any of the expected colors.
+    Universal function to check if the pixels at given coordinates show one of the expected colors.
     Works for tabs, buttons, status indicators, or any pixel-based detection.
+    A small patch around the point is compared within a tolerance, so antialiasing,
+    DPI scaling or a hover highlight do not fail the check; one read is normally enough.
+    Further attempts (max_attempts) only re-read after an error or an ambiguous read.
     """
-    import time
-    from datetime import datetime
-    from commands.screenshot import screenshot
-    from utils.file_utils import save_file
+    from utils.flight_recorder import flight_recorder
 
     if expected_colors is None or len(expected_colors) == 0:
         logger.error(
-            f"No expected colors provided for '{element_name}'. Cannot perform color matching."
+            "No expected colors provided for '%s'. Cannot perform color matching.",
+            element_name,
         )
         return False
 
+    palette = {element_name: expected_colors}
+    match = None
     for attempt in range(1, max_attempts + 1):
         try:
-            if window:
-                window.activate()
-                time.sleep(0.2)
-
-            from commands.coords import pixel
-
-            pixel_color = pixel(coords, window=window)
-
-            is_match = pixel_color in expected_colors
+            if attempt > 1:
+                # Retries must look at the screen again, not at the cached frame
+                frame_cache.invalidate()
+                if retry_delay:
+                    time.sleep(retry_delay)
 
+            match = classify_pixel(coords, palette, window=window)
             logger.debug(
-                f"Pixel at {coords} color: {pixel_color}, Expected one of: {expected_colors}"
+                "Pixel at %s color: %s, confidence %.2f (distance %.1f), Expected one of: %s",
+                coords,
+                match.color,
+                match.confidence,
+                match.distance,
+                expected_colors,
             )
 
-            if is_match:
-                logger.debug(
-                    f"Pixel color exactly matches one of the expected colors: {pixel_color}"
-                )
+            if match.label is not None and match.confidence >= min_confidence:
+                if not match.exact:
+                    metrics.inc("pixel_near_matches_total", element=element_name)
                 return True
-            else:
-                logger.warning(
-                    f"Attempt {attempt}/{max_attempts}: Pixel color {pixel_color} doesn't match any expected colors: {expected_colors}"
-                )
-
-                # Screenshot for debugging if the pixel color does not match
-                if attempt == max_attempts:
-                    try:
-                        img = screenshot(
-                            region=(
-                                window.left,
-                                window.top,
-                                window.width,
-                                window.height,
-                            )
-                        )
-                        if img:
-                            save_file(
-                                img,
-                                f"{element_name}_color_mismatch",
-                                directory="logs/screenshots",
-                            )
-                    except Exception as screenshot_err:
-                        logger.error(
-                            f"Failed to save debug screenshot: {screenshot_err}"
-                        )
-
-                if attempt < max_attempts:
-                    time.sleep(retry_delay)
+            if match.confidence == 0:
+                # Nothing in the patch is close to an expected color: a clear answer
+                break
         except Exception as e:
             logger.error(
-                f"Error checking pixel color (attempt {attempt}/{max_attempts}): {e}"
+                "Error checking pixel color (attempt %s/%s): %s",
+                attempt,
+                max_attempts,
+                e,
             )
-            if attempt < max_attempts:
-                time.sleep(retry_delay)
-            else:
-                return False
+
+    if match is None:
+        return False
 
     logger.error(
-        f"Pixel at {coords} for '{element_name}' did not match expected colors after {max_attempts} attempts."
+        "Pixel at %s for '%s' did not match expected colors: %s, confidence %.2f.",
+        coords,
+        element_name,
+        match.color,
+        match.confidence,
     )
+    metrics.inc("pixel_mismatches_total", element=element_name)
+    # The frames read through the cache are already in the flight recorder
+    flight_recorder.dump(f"{element_name}_color_mismatch")
     return False
 
 
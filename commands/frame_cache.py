@@ -0,0 +1,152 @@
+import os
+import time
+import numpy as np
+import pyautogui
+import pygetwindow as gw
+from PIL import Image
+from typing import Optional, Tuple
+
+from commands.window_transform import WindowTransform, window_transforms
+from utils.logging_config import configure_logging
+from utils.flight_recorder import flight_recorder
+
+logger = configure_logging("FrameCache")
+
+
+class Frame:
+    """One capture of a window's client area, as an (h, w, 3) RGB NumPy array."""
+
+    def __init__(self, hwnd, transform: WindowTransform, array: np.ndarray):
+        self.hwnd = hwnd
+        self.transform = transform
+        self.origin = tuple(int(c) for c in transform.origin)
+        self.array = array
+        self.captured_at = time.time()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        h, w = self.array.shape[:2]
+        return w, h
+
+    def to_client(self, logical_points, state_name="LE_CHEMINOT") -> np.ndarray:
+        """Scale logical design coords to physical client px of this capture."""
+        return self.transform.to_client(logical_points, state_name)
+
+    def contains(self, client_points: np.ndarray) -> bool:
+        w, h = self.size
+        xs, ys = client_points[:, 0], client_points[:, 1]
+        return bool(np.all((xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)))
+
+    def pixels(self, logical_points, state_name="LE_CHEMINOT") -> np.ndarray:
+        """Vectorized read of many logical points; returns an (n, 3) array."""
+        pts = self.to_client(logical_points, state_name)
+        if not self.contains(pts):
+            raise IndexError(f"Points {pts.tolist()} outside frame of size {self.size}")
+        return self.array[pts[:, 1], pts[:, 0]]
+
+    def pixel(self, logical_point, state_name="LE_CHEMINOT") -> Tuple[int, int, int]:
+        r, g, b = self.pixels([logical_point], state_name)[0]
+        return int(r), int(g), int(b)
+
+    def patch(
+        self, logical_point, radius: int = 1, state_name="LE_CHEMINOT"
+    ) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        Square patch of up to (2 * radius + 1) px around a logical point, clipped
+        to the frame, with the (row, col) of the point inside it.
+        Returns None if the point is outside the frame.
+        """
+        pts = self.to_client([logical_point], state_name)
+        if not self.contains(pts):
+            return None
+        x, y = (int(c) for c in pts[0])
+        w, h = self.size
+        x0, y0 = max(x - radius, 0), max(y - radius, 0)
+        x1, y1 = min(x + radius + 1, w), min(y + radius + 1, h)
+        return self.array[y0:y1, x0:x1], (y - y0, x - x0)
+
+    def crop(self, region, state_name="LE_CHEMINOT") -> Optional[Image.Image]:
+        """
+        Crop a logical (x, y, w, h) region out of the frame.
+        Returns None if the region is not fully inside the frame.
+        """
+        x, y, w, h = region
+        (px, py), (pr, pb) = self.to_client([(x, y), (x + w, y + h)], state_name)
+        fw, fh = self.size
+        if px < 0 or py < 0 or pr > fw or pb > fh or pr <= px or pb <= py:
+            return None
+        return Image.fromarray(self.array[py:pb, px:pr])
+
+
+class FrameCache:
+    """
+    Per-tick cache of the client-area capture of a window.
+    Every pixel query reads from the same capture until a UI action
+    (click, mouse move, popup close) invalidates it, or it gets too old.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        if max_age is None:
+            max_age = float(os.getenv("FRAME_CACHE_MAX_AGE_SECONDS", 1.0))
+        self.max_age = max_age
+        self._frame: Optional[Frame] = None
+        self.captures = 0
+        self.hits = 0
+
+    def get(self, window=None) -> Optional[Frame]:
+        """Return the cached frame of `window`, capturing a new one if needed."""
+        if window is None:
+            window = gw.getActiveWindow()
+        if window is None:
+            return None
+
+        frame = self._frame
+        if (
+            frame is not None
+            and frame.hwnd == window._hWnd
+            and time.time() - frame.captured_at <= self.max_age
+        ):
+            self.hits += 1
+            return frame
+
+        return self.capture(window)
+
+    def capture(self, window) -> Optional[Frame]:
+        """Grab the client area of `window` in one screenshot."""
+        hwnd = window._hWnd
+        try:
+            window.activate()
+        except gw.PyGetWindowException as e:
+            if "Error code from Windows: 0" not in str(e):
+                logger.debug(f"Could not activate window before capture: {e}")
+
+        try:
+            transform = window_transforms.get(hwnd)
+            ox, oy = transform.origin
+            w, h = transform.client_size
+            img = pyautogui.screenshot(region=(int(ox), int(oy), w, h))
+        except Exception as e:
+            logger.error(f"Failed to capture window frame: {e}")
+            window_transforms.invalidate(hwnd)
+            self._frame = None
+            return None
+
+        array = np.asarray(img.convert("RGB"))
+        self._frame = Frame(hwnd, transform, array)
+        flight_recorder.record_frame(array)
+        self.captures += 1
+        logger.debug(f"Captured frame of '{window.title}' ({w}x{h})")
+        return self._frame
+
+    @property
+    def last_frame(self) -> Optional[Frame]:
+        """Most recent capture, without refreshing it."""
+        return self._frame
+
+    def invalidate(self) -> None:
+        """Drop the cached frame; called after every UI action."""
+        self._frame = None
+
+
+# Shared by coords, screenshot and the states
+frame_cache = FrameCache()
@@ -0,0 +1,116 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from commands.color_classifier import classify_rows
+from commands.frame_cache import frame_cache
+from utils.constants.button_coords import (
+    AM_Y,
+    COLORS,
+    HORAIRE_GROUP_BAND_RADIUS,
+    HORAIRE_GROUP_MAX_GAP,
+    HORAIRE_GROUP_MIN_ROW_HEIGHT,
+    HORAIRE_MAX_GROUPS,
+    HORAIRE_STATE_COORDS,
+)
+from utils.logging_config import configure_logging
+
+logger = configure_logging("HoraireGroups")
+
+GROUP_AVAILABLE = "available"
+GROUP_UNAVAILABLE = "unavailable"
+GROUP_UNKNOWN = "unknown"
+
+GROUP_PALETTE = {
+    GROUP_AVAILABLE: COLORS["COURSE_AVAILABLE"],
+    GROUP_UNAVAILABLE: COLORS["COURSE_UNAVAILABLE"],
+}
+
+FIRST_GROUP = HORAIRE_STATE_COORDS["FIRST_GROUP_COURSE_BLACK_PIXEL"]
+
+
+class GroupResult(NamedTuple):
+    """Availability of one group row of the horaire panel."""
+
+    group: str
+    status: str
+    point: Tuple[int, int]
+    color: Tuple[int, int, int]
+
+
+def find_group_rows(
+    strip: np.ndarray,
+    min_height: int,
+    max_gap: int,
+    max_groups: int = HORAIRE_MAX_GROUPS,
+) -> List[Tuple[int, int, str]]:
+    """
+    (start, end, status) of every group row in an (h, w, 3) strip of the group
+    column, first row at the top. Each pixel row takes its majority group
+    colour; a run of one colour at least `min_height` rows tall is a group row.
+    The first run must cover the top of the strip, and the list ends at a gap
+    longer than `max_gap` rows.
+    """
+    labels, row_labels, _ = classify_rows(strip, GROUP_PALETTE)
+    if not len(row_labels):
+        return []
+
+    # Runs of equal row labels: a new run starts wherever the label changes
+    changes = np.flatnonzero(np.diff(row_labels)) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(row_labels)]))
+    keep = (row_labels[starts] >= 0) & (ends - starts >= min_height)
+    starts, ends = starts[keep], ends[keep]
+    if not len(starts) or starts[0] >= min_height:
+        return []
+
+    gaps = np.flatnonzero(starts[1:] - ends[:-1] > max_gap)
+    count = min(gaps[0] + 1 if len(gaps) else len(starts), max_groups)
+    return [
+        (int(start), int(end), labels[row_labels[start]])
+        for start, end in zip(starts[:count], ends[:count])
+    ]
+
+
+def read_groups(window, state_name: str = "LE_CHEMINOT") -> Optional[List[GroupResult]]:
+    """
+    Classify every group row of the horaire panel from one client-area capture:
+    the column under the first group is scanned down to the calendar grid.
+    The first row is always reported, unknown if it has no group colour.
+    Returns None if the window could not be captured.
+    """
+    frame = frame_cache.get(window)
+    if frame is None:
+        return None
+
+    x, y = FIRST_GROUP
+    (cx, top), (_, bottom) = frame.to_client([FIRST_GROUP, (x, AM_Y)], state_name)
+    width, height = frame.size
+    if not (0 <= cx < width and 0 <= top < height):
+        return None
+    strip = frame.array[
+        top : min(bottom, height),
+        max(cx - HORAIRE_GROUP_BAND_RADIUS, 0) : cx + HORAIRE_GROUP_BAND_RADIUS + 1,
+    ]
+
+    scale_y = float(frame.transform.scale(state_name)[1])
+    rows = find_group_rows(
+        strip,
+        max(int(HORAIRE_GROUP_MIN_ROW_HEIGHT * scale_y), 1),
+        int(HORAIRE_GROUP_MAX_GAP * scale_y),
+    )
+    if not rows:
+        color = tuple(int(c) for c in frame.array[top, cx])
+        return [GroupResult("01", GROUP_UNKNOWN, FIRST_GROUP, color)]
+
+    results = []
+    for i, (start, end, status) in enumerate(rows):
+        middle = (start + end - 1) // 2
+        point = (x, int(round(y + middle / scale_y)))
+        color = tuple(int(c) for c in frame.array[top + middle, cx])
+        results.append(GroupResult(f"{i + 1:02d}", status, point, color))
+
+    logger.debug(
+        "Horaire groups: %s", ", ".join(f"{r.group}={r.status}" for r in results)
+    )
+    return results
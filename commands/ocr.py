@@ -0,0 +1,153 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image
+
+from utils.logging_config import configure_logging
+
+logger = configure_logging("OCR")
+
+try:
+    # Keeps one tesseract engine (and its traineddata) loaded per worker
+    import tesserocr
+except ImportError:
+    # Without it every OCR call spawns a tesseract process through pytesseract
+    tesserocr = None
+
+
+class OcrService:
+    """
+    OCR with warm workers and a result cache keyed by a hash of the image.
+    Uses a persistent tesserocr engine per worker thread, and falls back to
+    pytesseract (one tesseract process per call) if tesserocr is missing.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_size: Optional[int] = None):
+        self.workers = workers or int(os.getenv("OCR_WORKERS", 2))
+        self.cache_size = cache_size or int(os.getenv("OCR_CACHE_SIZE", 128))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ocr"
+        )
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_key(img: Image.Image, lang: str) -> str:
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16).hexdigest()
+        return f"{lang}:{img.mode}:{img.size[0]}x{img.size[1]}:{digest}"
+
+    def _engine(self, lang: str):
+        """Per-thread tesserocr engine, created on first use of each language."""
+        if tesserocr is None:
+            return None
+
+        engines = getattr(self._local, "engines", None)
+        if engines is None:
+            engines = self._local.engines = {}
+
+        if lang not in engines:
+            tessdata = None
+            tesseract_cmd = os.getenv("TESSERACT_CMD")
+            if tesseract_cmd:
+                tessdata = os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+            if tessdata and os.path.isdir(tessdata):
+                engines[lang] = tesserocr.PyTessBaseAPI(path=tessdata, lang=lang)
+            else:
+                engines[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+        return engines[lang]
+
+    def _run_ocr(self, img: Image.Image, lang: str) -> str:
+        engine = self._engine(lang)
+        if engine is not None:
+            engine.SetImage(img)
+            return engine.GetUTF8Text()
+
+        import pytesseract
+
+        return pytesseract.image_to_string(img, lang=lang)
+
+    def _remember(self, key: str, future: Future) -> None:
+        if future.exception() is not None:
+            return
+        with self._lock:
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, img: Image.Image, lang: str = "fra") -> "Future[str]":
+        """Queue `img` for OCR; cached images resolve immediately."""
+        key = self.image_key(img, lang)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+
+        if cached is not None:
+            logger.debug("OCR cache hit")
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        self.misses += 1
+        future = self._executor.submit(self._run_ocr, img.copy(), lang)
+        future.add_done_callback(lambda f: self._remember(key, f))
+        return future
+
+    def image_to_string(
+        self, img: Image.Image, lang: str = "fra", timeout: Optional[float] = None
+    ) -> str:
+        """Blocking OCR of `img`, served from the cache when possible."""
+        return self.submit(img, lang).result(timeout)
+
+    def warm_up(self, langs=("fra", "eng")) -> None:
+        """
+        Load the tesserocr engines on every worker in the background, so the
+        first popup doesn't pay for a cold start. Returns immediately.
+        A no-op without tesserocr: pytesseract has no engine to keep warm.
+        """
+        if tesserocr is None:
+            logger.info(
+                "tesserocr not installed, OCR runs one tesseract process per call"
+            )
+            return
+
+        # Each worker blocks on the barrier, so every thread loads its own engines
+        barrier = threading.Barrier(self.workers)
+        for _ in range(self.workers):
+            self._executor.submit(self._warm_worker, barrier, langs)
+
+    def _warm_worker(self, barrier: threading.Barrier, langs) -> None:
+        try:
+            barrier.wait(timeout=30)
+        except threading.BrokenBarrierError:
+            pass
+        for lang in langs:
+            try:
+                self._engine(lang)
+            except Exception as e:
+                logger.warning(f"OCR warm-up failed for '{lang}': {e}")
+
+
+_service: Optional[OcrService] = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> OcrService:
+    """Shared OCR service, created on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OcrService()
+            logger.debug(
+                f"OCR service with {_service.workers} workers ({'tesserocr' if tesserocr else 'pytesseract'})"
+            )
+    return _service
@@ -4,11 +4,20 @@ import pyautogui
 import pygetwindow as gw
 from typing import Optional, Tuple, Set, Callable, Any
 
-from utils.window_helpers import list_window_titles, wait_for_new_window
+from utils.window_helpers import wait_for_new_window
+from utils.window_registry import window_registry
 from commands.screenshot import screenshot
 from utils.logging_config import configure_logging
-from utils.constants.texts import POPUP_TYPES, POPUP_UNKNOWN_RETURN_VALUE
+from utils.constants.texts import POPUP_UNKNOWN_RETURN_VALUE
 from commands.coords import _nudge_from_corners
+from commands.frame_cache import frame_cache
+from commands.ocr import get_ocr_service
+from commands.popup_matcher import POPUP_MATCHER, PopupMatch
+from commands.popup_signatures import get_signature_store
+from utils.metrics import metrics
+
+# Signature store namespace for POPUP_TYPES classifications
+SIGNATURE_NAMESPACE = "popup_type"
 
 
 class PopupDetector:
@@ -46,46 +55,39 @@ class PopupDetector:
         """
         ignore_titles = ignore_titles or set()
 
-        # Get window titles before action
-        before = list_window_titles()
+        # Snapshot the windows before action
+        before = window_registry.snapshot(refresh=True)
 
         # Execute the action that might trigger a popup
         result = action()
 
         # Wait for a new window to appear
-        new_title = wait_for_new_window(before, timeout=timeout, ignore=ignore_titles)
+        popup_window = wait_for_new_window(
+            before, timeout=timeout, ignore=ignore_titles
+        )
 
         # If we found a new window, return its title and window object
-        if new_title:
+        if popup_window is not None:
+            new_title = popup_window.title
             self.logger.info(f"Detected popup: '{new_title}'")
             try:
-                popup_windows = gw.getWindowsWithTitle(new_title)
-                if not popup_windows:
-                    self.logger.warning(
-                        f"Found popup title '{new_title}' but couldn't get window object"
-                    )
-                    return new_title, None, None
-
-                popup_window = popup_windows[0]
-
                 if activate:
                     popup_window.activate()
                     time.sleep(0.1)
 
                 popup_type = None
 
-                # If set to handle automatically, capture text and handle
+                # If set to handle automatically, identify and handle
                 if handle_automatically:
                     self.logger.debug(
-                        "Automatic popup handling enabled, capturing text..."
+                        "Automatic popup handling enabled, identifying popup..."
                     )
-                    popup_text = self.capture_popup_text(popup_window)
-                    if popup_text:
-                        popup_type = self.handle_popups(
-                            popup_window, popup_text, new_title
-                        )
+                    popup_type = self.identify_and_handle(
+                        popup_window, new_title, require_text=True
+                    )
+                    if popup_type:
                         self.logger.debug(
-                            f"Automatically handled popup as type: {popup_type}"
+                            "Automatically handled popup as type: %s", popup_type
                         )
                         # The popup is already closed by handle_popups
                         return new_title, None, popup_type
@@ -102,7 +104,7 @@ class PopupDetector:
 
                 return new_title, popup_window, popup_type
 
-            except IndexError:
+            except (IndexError, gw.PyGetWindowException):
                 self.logger.warning(
                     f"Found popup title '{new_title}' but window disappeared"
                 )
@@ -110,147 +112,195 @@ class PopupDetector:
 
         return None, None, None
 
-    def capture_popup_text(self, popup_window: gw.Window) -> Optional[str]:
-        """
-        Capture text content from a popup window using OCR.
-        Requires pytesseract to be properly configured.
+    def identify_and_handle(
+        self, popup_window: gw.Window, popup_title: str, require_text: bool = False
+    ) -> Optional[str]:
         """
-        try:
-            import pytesseract
-            from utils.file_utils import save_file
+        Identify a popup and handle it. Known dialogs are recognized from their
+        signature without OCR; new ones go through OCR and, once classified,
+        are added to the signature store.
 
-            if popup_window is None:
-                self.logger.error("Cannot capture text from None window")
-                return None
+        With require_text=True, an unknown popup whose OCR returned no text
+        is left alone and None is returned.
+        """
+        popup_img = self.capture_popup_image(popup_window)
+        if popup_img is None:
+            return None
 
-            window_info = f"{popup_window.title if hasattr(popup_window, 'title') else 'Unknown'} ({popup_window.width}x{popup_window.height})"
-            self.logger.debug(f"Capturing text from popup window: {window_info}")
+        size = (popup_window.width, popup_window.height)
+        store = get_signature_store()
+        known_type = store.lookup(SIGNATURE_NAMESPACE, popup_title, size, popup_img)
+        if known_type:
+            self.logger.debug("Popup recognized from its signature: %s", known_type)
+            match = POPUP_MATCHER.by_return_value(known_type)
+            return self.apply_popup_action(popup_window, match)
 
-            time.sleep(0.2)
+        popup_text, match = self.ocr_popup(popup_window, popup_img, popup_title)
+        if require_text and not popup_text:
+            return None
 
-            # Take screenshot of popup
-            self.logger.debug("Taking screenshot of popup window")
-            region = (
-                popup_window.left,
-                popup_window.top,
-                popup_window.width,
-                popup_window.height,
+        popup_type = self.apply_popup_action(popup_window, match)
+        if popup_text and match is not None:
+            store.remember(
+                SIGNATURE_NAMESPACE, popup_title, size, popup_img, popup_type
             )
+        return popup_type
+
+    def capture_popup_image(self, popup_window: gw.Window):
+        """Screenshot of a popup window, or None if it could not be captured."""
+        if popup_window is None:
+            self.logger.error("Cannot capture None window")
+            return None
+
+        self.logger.debug(
+            "Capturing popup window: %s (%sx%s)",
+            popup_window.title if hasattr(popup_window, "title") else "Unknown",
+            popup_window.width,
+            popup_window.height,
+        )
+
+        time.sleep(0.2)
+
+        # Take screenshot of popup
+        self.logger.debug("Taking screenshot of popup window")
+        region = (
+            popup_window.left,
+            popup_window.top,
+            popup_window.width,
+            popup_window.height,
+        )
+        try:
             popup_img = screenshot(region=region)
+        except Exception as e:
+            self.logger.error(f"Failed to capture popup screenshot: {e}")
+            return None
+
+        if popup_img is None:
+            self.logger.error("Failed to capture popup screenshot")
+        return popup_img
+
+    def capture_popup_text(
+        self, popup_window: gw.Window, popup_img=None
+    ) -> Optional[str]:
+        """
+        Capture text content from a popup window using OCR.
+        Requires tesseract to be properly configured (see commands.ocr).
+        """
+        if popup_window is None:
+            self.logger.error("Cannot capture text from None window")
+            return None
 
+        if popup_img is None:
+            popup_img = self.capture_popup_image(popup_window)
             if popup_img is None:
-                self.logger.error("Failed to capture popup screenshot")
                 return None
 
+        popup_title = popup_window.title if hasattr(popup_window, "title") else None
+        popup_text, _ = self.ocr_popup(popup_window, popup_img, popup_title)
+        return popup_text
+
+    def ocr_popup(
+        self, popup_window: gw.Window, popup_img, popup_title: Optional[str]
+    ) -> Tuple[Optional[str], Optional[PopupMatch]]:
+        """
+        OCR a popup image and classify it in the same pass.
+        Returns (text, match); match is None for unrecognized popups,
+        whose screenshot is saved for later inspection.
+        """
+        try:
+            from utils.flight_recorder import flight_recorder
+
             # Extract text with OCR
             self.logger.debug("Starting OCR text extraction")
-            text = pytesseract.image_to_string(popup_img, lang="fra")
+            text = get_ocr_service().image_to_string(popup_img, lang="fra")
 
             trimmed_text = text.strip() if text else ""
 
-            # Check if popup is recognized
-            popup_recognized = self.is_popup_recognized(popup_window, trimmed_text)
+            # Classify once; recognition and handling share this result
+            match = POPUP_MATCHER.match(popup_title, trimmed_text)
 
-            # Save the screenshot only for unrecognized popups
-            if not popup_recognized:
-                window_title = (
-                    popup_window.title if hasattr(popup_window, "title") else "unknown"
-                )
+            # Dump the popup and what led to it only for unrecognized popups
+            if match is None:
+                window_title = popup_title or "unknown"
                 # Sanitize filename
                 window_title = "".join(
                     c if c.isalnum() or c in " -_" else "_" for c in window_title
                 )
 
-                # Use the save_file utility
-                screenshot_path = save_file(
-                    popup_img, window_title, directory="logs/ocr_screenshots"
-                )
-                self.logger.debug(
-                    f"Saved unrecognized popup screenshot to: {screenshot_path}"
-                )
+                flight_recorder.record(popup_img, f"popup_{window_title}")
+                flight_recorder.dump(f"unknown_popup_{window_title}")
 
             if trimmed_text:
-                self.logger.debug(f"OCR extracted {len(trimmed_text)} characters")
+                self.logger.debug("OCR extracted %s characters", len(trimmed_text))
                 self.logger.debug(
-                    f"OCR text sample: '{trimmed_text[:50]}{'...' if len(trimmed_text) > 50 else ''}'"
+                    "OCR text sample: '%s%s'",
+                    trimmed_text[:50],
+                    "..." if len(trimmed_text) > 50 else "",
                 )
-                return trimmed_text
+                return trimmed_text, match
             else:
                 self.logger.debug("OCR returned empty text")
-                return None
+                return None, match
 
         except Exception as e:
             self.logger.error(f"Failed to capture popup text: {e}")
-            return None
+            return None, None
 
     def handle_popups(self, popup_window, popup_text, popup_title=None):
-
+        """
+        Classify a popup from its title and text and apply its action.
+        Returns the popup type (POPUP_UNKNOWN_RETURN_VALUE if unrecognized).
+        """
         if popup_window is None:
             self.logger.debug("No popup window provided to handle_popups")
             return None
 
         self.logger.debug(
-            f"Analyzing popup - Title: '{popup_title}', Text length: {len(popup_text) if popup_text else 0}"
+            "Analyzing popup - Title: '%s', Text length: %s",
+            popup_title,
+            len(popup_text) if popup_text else 0,
         )
+        match = POPUP_MATCHER.match(popup_title, popup_text)
+        return self.apply_popup_action(popup_window, match)
 
-        norm_popup = normalize(popup_text) if popup_text else ""
-        norm_title = normalize(popup_title) if popup_title else ""
-
-        for popup_type in POPUP_TYPES:
-            popup_name = popup_type.get("return_value", "unknown")
-            # Title matching
-            title_match = True
-            if popup_type["title"] and popup_title:
-                title_matches = [
-                    title
-                    for title in popup_type["title"]
-                    if normalize(title) in norm_title
-                ]
-                title_match = len(title_matches) > 0
-                self.logger.debug(
-                    f"Title match result for {popup_name}: {title_match} (matched: {title_matches if title_match else 'none'})"
-                )
-
-            # Text matching
-            text_match = True
-            if popup_type["text"] and popup_text:
-                text_matches = [
-                    text for text in popup_type["text"] if normalize(text) in norm_popup
-                ]
-                text_match = len(text_matches) > 0
-                self.logger.debug(
-                    f"Text match result for {popup_name}: {text_match} (matched: {text_matches if text_match else 'none'})"
-                )
+    def apply_popup_action(self, popup_window, match: Optional[PopupMatch]):
+        """Apply the action of an already classified popup and return its type."""
+        if popup_window is None:
+            self.logger.debug("No popup window provided to apply_popup_action")
+            return None
 
-            # If both title and text match their patterns, handle this popup type
-            if title_match and text_match:
-                return_value = popup_type["return_value"]
-                self.logger.warning(f"Detected {return_value} popup")
+        metrics.inc(
+            "popups_total",
+            type=match.return_value if match else POPUP_UNKNOWN_RETURN_VALUE,
+        )
+        if match is None:
+            self.logger.debug("No matching popup type found, handling as unknown popup")
+            try:
+                self.close_popup(popup_window)
+            except Exception as e:
+                self.logger.error(f"Error closing unknown popup: {e}", exc_info=True)
+            return POPUP_UNKNOWN_RETURN_VALUE
 
-                try:
-                    if popup_type.get("action") == "click_ok":
-                        self.logger.debug(
-                            f"Handling {return_value} popup with OK button click"
-                        )
-                        self.click_ok_button(popup_window)
-                    elif popup_type.get("action") == "alt_f4":
-                        self.logger.debug(f"Handling {return_value} popup with Alt+F4")
-                        self.close_popup(popup_window)
-                    else:
-                        self.logger.debug(
-                            f"Handling {return_value} popup with standard close"
-                        )
-                        self.close_popup(popup_window)
-                except Exception as e:
-                    self.logger.error(f"Error handling popup: {e}", exc_info=True)
-                return return_value
+        return_value = match.return_value
+        self.logger.warning(
+            f"Detected {return_value} popup (matched: {match.keyword or 'signature'})"
+        )
 
-        self.logger.debug("No matching popup type found, handling as unknown popup")
         try:
-            self.close_popup(popup_window)
+            if match.action == "click_ok":
+                self.logger.debug(
+                    "Handling %s popup with OK button click", return_value
+                )
+                self.click_ok_button(popup_window)
+            elif match.action == "alt_f4":
+                self.logger.debug("Handling %s popup with Alt+F4", return_value)
+                self.close_popup(popup_window)
+            else:
+                self.logger.debug("Handling %s popup with standard close", return_value)
+                self.close_popup(popup_window)
         except Exception as e:
-            self.logger.error(f"Error closing unknown popup: {e}", exc_info=True)
-        return POPUP_UNKNOWN_RETURN_VALUE
+            self.logger.error(f"Error handling popup: {e}", exc_info=True)
+        return return_value
 
     def close_popup(self, popup_window):
         """
@@ -264,15 +314,20 @@ class PopupDetector:
             return
 
         self.logger.debug(
-            f"Attempting to close popup window: {popup_window.title if hasattr(popup_window, 'title') else 'Unknown'}"
+            "Attempting to close popup window: %s",
+            popup_window.title if hasattr(popup_window, "title") else "Unknown",
         )
 
+        # Whatever was under the popup is about to show again
+        frame_cache.invalidate()
+        window_registry.invalidate()
+
         try:
             popup_window.close()
             self.logger.debug("Popup closed successfully with window.close()")
         except Exception as e:
             self.logger.warning(f"Could not close popup normally: {e}")
-            self.logger.debug(f"Close failure details: {str(e)}")
+            self.logger.debug("Close failure details: %s", e)
             try:
                 self.logger.debug("Attempting Alt+F4 method to close popup")
                 popup_window.activate()
@@ -282,7 +337,7 @@ class PopupDetector:
                 self.logger.debug("Alt+F4 sent to popup window")
             except Exception as e2:
                 self.logger.error(f"Failed to close popup with Alt+F4: {e2}")
-                self.logger.debug(f"Alt+F4 failure details: {str(e2)}")
+                self.logger.debug("Alt+F4 failure details: %s", e2)
 
     def detect_and_handle_active_popups(self):
         """
@@ -296,30 +351,30 @@ class PopupDetector:
         # Add critical application windows that should never be closed automatically
         protected_titles = {"Bienvenue sur ChemiNot", "Le ChemiNot"}
 
-        for window in gw.getAllWindows():
-            if not window.visible or not window.title.strip():
+        snapshot = window_registry.snapshot(refresh=True)
+        for hwnd, window in snapshot.windows.items():
+            window_title = snapshot.titles[hwnd]
+            if not window_title.strip() or not window.visible:
                 continue
 
-            window_title = window.title
-
             # Skip windows in the skip list
             if any(title in window_title for title in skip_titles):
                 continue
 
             # Never close main application windows
             if any(title in window_title for title in protected_titles):
-                self.logger.debug(f"Skipping protected window: '{window_title}'")
+                self.logger.debug("Skipping protected window: '%s'", window_title)
                 continue
 
             # Check if this looks like a popup (by size)
             win_width, win_height = window.width, window.height
             self.logger.debug(
-                f"Checking window: '{window_title}' ({win_width}x{win_height})"
+                "Checking window: '%s' (%sx%s)", window_title, win_width, win_height
             )
 
             if win_width > 800 or win_height > 600:
                 self.logger.debug(
-                    f"Skipping large window (window > 800): {win_width}x{win_height}"
+                    "Skipping large window (window > 800): %sx%s", win_width, win_height
                 )
                 continue
 
@@ -327,7 +382,10 @@ class PopupDetector:
             if win_width < 800 and win_height < 600:
                 # This is likely a popup, try to handle it
                 self.logger.debug(
-                    f"Found potential popup: '{window_title}' ({win_width}x{win_height})"
+                    "Found potential popup: '%s' (%sx%s)",
+                    window_title,
+                    win_width,
+                    win_height,
                 )
 
                 # For session selection popups, don't close them automatically
@@ -337,9 +395,8 @@ class PopupDetector:
                     )
                     continue
 
-                # Get popup text and determine popup type
-                popup_text = self.capture_popup_text(window)
-                popup_type = self.handle_popups(window, popup_text, window_title)
+                # Determine popup type (from its signature or OCR) and handle it
+                popup_type = self.identify_and_handle(window, window_title)
 
                 if popup_type and popup_type != POPUP_UNKNOWN_RETURN_VALUE:
                     self.logger.info(
@@ -349,7 +406,7 @@ class PopupDetector:
                     # If we can't determine the type but it's small enough to be a popup,
                     # try to close it using the default method
                     self.logger.debug(
-                        f"No matching popup type found, handling as unknown popup"
+                        "No matching popup type found, handling as unknown popup"
                     )
                     self.close_popup(window)
 
@@ -368,7 +425,8 @@ class PopupDetector:
             return
 
         self.logger.debug(
-            f"Attempting to click OK button on popup: {popup_window.title if hasattr(popup_window, 'title') else 'Unknown'}"
+            "Attempting to click OK button on popup: %s",
+            popup_window.title if hasattr(popup_window, "title") else "Unknown",
         )
 
         try:
@@ -386,7 +444,7 @@ class PopupDetector:
                 self.close_popup(popup_window)  # Fallback to closing
                 return
 
-            self.logger.debug(f"Searching for OK button using image: {ok_button_path}")
+            self.logger.debug("Searching for OK button using image: %s", ok_button_path)
 
             # Limit the search to the popup window
             region = (
@@ -407,7 +465,7 @@ class PopupDetector:
                 if ok_location:
                     x, y = pyautogui.center(ok_location)
                     self.logger.debug(
-                        f"Found OK button at {x}, {y} - moving mouse to hover"
+                        "Found OK button at %s, %s - moving mouse to hover", x, y
                     )
                     # First hover over the button
                     _nudge_from_corners()
@@ -416,6 +474,7 @@ class PopupDetector:
                     self.logger.debug("Clicking OK button after hover")
                     _nudge_from_corners()
                     pyautogui.click()
+                    frame_cache.invalidate()
                     self.logger.info("Successfully clicked OK button")
                     time.sleep(0.5)  # Wait a moment after clicking
                     return
@@ -452,44 +511,5 @@ class PopupDetector:
         Returns:
             bool: True if popup is recognized, False otherwise
         """
-        norm_popup = normalize(trimmed_text) if trimmed_text else ""
-        norm_title = (
-            normalize(popup_window.title) if hasattr(popup_window, "title") else ""
-        )
-
-        for popup_type in POPUP_TYPES:
-            # Title matching
-            title_match = True
-            if popup_type["title"] and hasattr(popup_window, "title"):
-                title_matches = [
-                    title
-                    for title in popup_type["title"]
-                    if normalize(title) in norm_title
-                ]
-                title_match = len(title_matches) > 0
-
-            # Text matching
-            text_match = True
-            if popup_type["text"] and trimmed_text:
-                text_matches = [
-                    text for text in popup_type["text"] if normalize(text) in norm_popup
-                ]
-                text_match = len(text_matches) > 0
-
-            # If both title and text match, this is a recognized popup
-            if title_match and text_match:
-                return True
-
-        return False
-
-
-def normalize(txt: str) -> str:
-    """
-    Normalize text for window matching: lower, ascii, strip, collapse whitespace.
-    """
-    import unicodedata, re
-
-    txt = unicodedata.normalize("NFD", txt)
-    txt = txt.encode("ascii", "ignore").decode("utf-8")
-    txt = re.sub(r"\s+", " ", txt)
-    return txt.lower().strip()
+        popup_title = popup_window.title if hasattr(popup_window, "title") else None
+        return POPUP_MATCHER.match(popup_title, trimmed_text) is not None
@@ -0,0 +1,112 @@
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from utils.constants.texts import POPUP_TYPES
+from utils.window_registry import normalize, window_registry
+
+
+class PopupMatch(NamedTuple):
+    """Result of classifying a popup: its POPUP_TYPES entry and why it matched."""
+
+    popup_type: dict
+    return_value: str
+    keyword: Optional[str]
+    action: Optional[str]
+
+
+class _AhoCorasick:
+    """Multi-pattern substring search: finds every pattern in one pass over the text."""
+
+    def __init__(self, patterns: List[Tuple[str, int]]):
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for pattern, type_index in patterns:
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node].append((type_index, pattern))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text: str) -> Dict[int, str]:
+        """type index -> first pattern of that type found in `text`."""
+        hits: Dict[int, str] = {}
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for type_index, pattern in self._out[node]:
+                hits.setdefault(type_index, pattern)
+        return hits
+
+
+class PopupMatcher:
+    """
+    POPUP_TYPES compiled once: title and text patterns are normalized up front
+    and merged into one automaton each, so a popup is classified in a single
+    pass over its title and text. First matching type wins, as in POPUP_TYPES.
+
+    An empty pattern list matches anything, and so does a missing title or text.
+    """
+
+    def __init__(self, popup_types: List[dict]):
+        self.popup_types = popup_types
+        self._titles = _AhoCorasick(
+            [(normalize(t), i) for i, p in enumerate(popup_types) for t in p["title"]]
+        )
+        self._texts = _AhoCorasick(
+            [(normalize(t), i) for i, p in enumerate(popup_types) for t in p["text"]]
+        )
+        self._by_return_value = {p["return_value"]: p for p in popup_types}
+
+    @staticmethod
+    def _result(popup_type: dict, keyword: Optional[str]) -> PopupMatch:
+        return PopupMatch(
+            popup_type=popup_type,
+            return_value=popup_type["return_value"],
+            keyword=keyword,
+            action=popup_type.get("action"),
+        )
+
+    def match(self, title: Optional[str], text: Optional[str]) -> Optional[PopupMatch]:
+        """Classify a popup from its title and OCR text, or None if unknown."""
+        norm_title = window_registry.normalized(title) if title else ""
+        norm_text = normalize(text) if text else ""
+        title_hits = self._titles.search(norm_title) if norm_title else {}
+        text_hits = self._texts.search(norm_text) if norm_text else {}
+
+        for i, popup_type in enumerate(self.popup_types):
+            title_match = not (popup_type["title"] and title) or i in title_hits
+            text_match = not (popup_type["text"] and text) or i in text_hits
+            if title_match and text_match:
+                return self._result(popup_type, text_hits.get(i) or title_hits.get(i))
+        return None
+
+    def by_return_value(self, return_value: str) -> Optional[PopupMatch]:
+        """Match for an already known popup type (e.g. from its signature)."""
+        popup_type = self._by_return_value.get(return_value)
+        return self._result(popup_type, None) if popup_type else None
+
+
+# Compiled once at import time
+POPUP_MATCHER = PopupMatcher(POPUP_TYPES)
@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+
+from utils.logging_config import configure_logging
+from utils.window_registry import normalize
+
+logger = configure_logging("PopupSignatures")
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix, so dct(x) = M @ x @ M.T for a 2D block."""
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def perceptual_hash(img: Image.Image) -> int:
+    """
+    64-bit pHash: low-frequency DCT coefficients of a 32x32 grayscale
+    thumbnail, thresholded at their median. Robust to tiny rendering noise.
+    """
+    gray = img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+    pixels = np.asarray(gray, dtype=float)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # Leave the DC term out of the median, it only carries overall brightness
+    bits = low > np.median(low[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class PopupSignatureStore:
+    """
+    Remembers what a popup turned out to be, keyed on (namespace, normalized
+    window title, size) plus a perceptual hash of the popup image.
+    Cheminot's dialogs look the same every time, so once OCR classified a
+    popup the next identical one is recognized without OCR. Persisted as JSON.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_distance: Optional[int] = None):
+        self.path = path or os.getenv(
+            "POPUP_SIGNATURES_FILE", "logs/popup_signatures.json"
+        )
+        if max_distance is None:
+            max_distance = int(os.getenv("POPUP_SIGNATURE_MAX_DISTANCE", 4))
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._signatures: Dict[Tuple[str, str, int, int], List[dict]] = {}
+        self._load()
+
+    @staticmethod
+    def _key(namespace: str, title: str, size: Tuple[int, int]):
+        return namespace, normalize(title or ""), int(size[0]), int(size[1])
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for entry in data.get("signatures", []):
+                key = (
+                    entry["namespace"],
+                    entry["title"],
+                    entry["width"],
+                    entry["height"],
+                )
+                self._signatures.setdefault(key, []).append(
+                    {"hash": int(entry["hash"], 16), "label": entry["label"]}
+                )
+            logger.debug(
+                f"Loaded {sum(len(v) for v in self._signatures.values())} popup signatures"
+            )
+        except Exception as e:
+            logger.warning(f"Could not load popup signatures from {self.path}: {e}")
+
+    def _save(self) -> None:
+        entries = [
+            {
+                "namespace": namespace,
+                "title": title,
+                "width": width,
+                "height": height,
+                "hash": f"{sig['hash']:016x}",
+                "label": sig["label"],
+            }
+            for (namespace, title, width, height), sigs in self._signatures.items()
+            for sig in sigs
+        ]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "signatures": entries}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save popup signatures to {self.path}: {e}")
+
+    def lookup(
+        self, namespace: str, title: str, size: Tuple[int, int], img: Image.Image
+    ) -> Optional[str]:
+        """Label of a known popup that looks like `img`, or None if unseen."""
+        key = self._key(namespace, title, size)
+        with self._lock:
+            sigs = self._signatures.get(key)
+            if not sigs:
+                return None
+            phash = perceptual_hash(img)
+            best = min(sigs, key=lambda sig: hamming(sig["hash"], phash))
+            distance = hamming(best["hash"], phash)
+
+        if distance <= self.max_distance:
+            logger.debug(
+                f"Known popup '{title}' -> {best['label']} (distance {distance})"
+            )
+            return best["label"]
+        return None
+
+    def remember(
+        self,
+        namespace: str,
+        title: str,
+        size: Tuple[int, int],
+        img: Image.Image,
+        label: str,
+    ) -> None:
+        """Add the signature of a popup that OCR just classified as `label`."""
+        key = self._key(namespace, title, size)
+        phash = perceptual_hash(img)
+        with self._lock:
+            sigs = self._signatures.setdefault(key, [])
+            for sig in sigs:
+                if hamming(sig["hash"], phash) <= self.max_distance:
+                    if sig["label"] == label:
+                        return
+                    # Same look, new meaning: trust the latest OCR result
+                    sig["label"] = label
+                    break
+            else:
+                sigs.append({"hash": phash, "label": label})
+            self._save()
+        logger.info(f"Learned popup signature '{title}' {size} -> {label}")
+
+
+_store: Optional[PopupSignatureStore] = None
+
+
+def get_signature_store() -> PopupSignatureStore:
+    """Shared signature store, loaded from disk on first use."""
+    global _store
+    if _store is None:
+        _store = PopupSignatureStore()
+    return _store
@@ -1,17 +1,20 @@
 import os
 import time
+from concurrent.futures import Future
+from typing import Optional
 import pyautogui
 import pygetwindow as gw
-import win32gui
 
-from utils.constants.button_coords import REF_WINDOW_SIZES
+from commands.window_transform import window_transforms
 from utils.logging_config import configure_logging
-from utils.file_utils import save_file
+from utils.screenshot_writer import get_screenshot_writer
 
 logger = configure_logging(__name__)
 
 
-def take_debug_screenshot(name: str, directory: str = "logs/screenshots") -> str | None:
+def take_debug_screenshot(
+    name: str, directory: str = "logs/screenshots"
+) -> Optional["Future[Optional[str]]"]:
     """
     Takes a screenshot of the current screen and saves it with timestamp
     Only if LOG_LEVEL is set to DEBUG
@@ -21,14 +24,15 @@ def take_debug_screenshot(name: str, directory: str = "logs/screenshots") -> str
         directory: Directory to save screenshots
 
     Returns:
-        Path to the saved screenshot or None if not in DEBUG mode
+        Future of the path, resolved once the background writer saved it,
+        or None if not in DEBUG mode
     """
     if os.getenv("LOG_LEVEL", "INFO").upper() != "DEBUG":
         return None
 
     try:
         img = screenshot()
-        return save_file(img, name, directory=directory)
+        return get_screenshot_writer().submit(img, name, directory=directory)
     except Exception as e:
         logger.error(f"Error taking debug screenshot: {str(e)}")
         return None
@@ -48,29 +52,20 @@ def screenshot(region=None, window=None, state_name="LE_CHEMINOT"):
     # Case A: logical region + window to scale & crop
     if window and region:
         # Import here to avoid circular import
-        from commands.coords import _client_to_screen, _scale_for_window
-
-        hwnd = window._hWnd
-        x, y, w, h = region
-
-        # 1) get the physical origin
-        phys_x, phys_y = _scale_for_window(hwnd, (x, y), state_name)
-
-        # 2) recompute sx, sy exactly as in coords._scale_for_window
-        ref_w, ref_h = REF_WINDOW_SIZES[state_name]
-        left, top, right, bottom = win32gui.GetClientRect(hwnd)
-        actual_w, actual_h = right - left, bottom - top
-        sx = actual_w / ref_w
-        sy = actual_h / ref_h
-
-        # 3) scale width/height
-        phys_w = int(w * sx)
-        phys_h = int(h * sy)
-
-        # 4) map client to screen
-        screen_x, screen_y = _client_to_screen(hwnd, (phys_x, phys_y))
-
-        return pyautogui.screenshot(region=(screen_x, screen_y, phys_w, phys_h))
+        from commands.frame_cache import frame_cache
+
+        # Crop from the cached client-area frame when the region fits in it
+        frame = frame_cache.get(window)
+        if frame is not None:
+            img = frame.crop(region, state_name)
+            if img is not None:
+                return img
+
+        # Scale the region and map it to screen px with the cached transform
+        screen_region = window_transforms.get(window).region_to_screen(
+            region, state_name
+        )
+        return pyautogui.screenshot(region=screen_region)
     # Case B: region only, no window context
     elif region:
         return pyautogui.screenshot(region=region)
@@ -0,0 +1,125 @@
+import time
+import numpy as np
+from typing import Callable, Iterable, List
+
+from commands.color_classifier import MIN_CONFIDENCE, PATCH_RADIUS, classify_patch
+from commands.frame_cache import frame_cache
+from utils.window_registry import window_registry
+from utils.logging_config import configure_logging
+
+logger = configure_logging("Waits")
+
+Predicate = Callable[[], bool]
+
+
+def wait_until(
+    predicate: Predicate,
+    timeout: float,
+    description: str = "condition",
+    poll: float = 0.1,
+) -> bool:
+    """
+    Poll `predicate` until it holds or `timeout` seconds have elapsed.
+    Returns as soon as the predicate is true, and logs how long the wait
+    actually took so we can see where session time goes.
+    """
+    start = time.time()
+    deadline = start + timeout
+
+    while True:
+        try:
+            if predicate():
+                logger.info(f"Waited {time.time() - start:.2f}s for {description}")
+                return True
+        except Exception as e:
+            logger.debug(f"Predicate for {description} raised: {e}")
+
+        if time.time() >= deadline:
+            logger.warning(
+                f"Gave up waiting for {description} after {time.time() - start:.2f}s"
+            )
+            return False
+        time.sleep(poll)
+
+
+def window_exists(titles: Iterable[str]) -> Predicate:
+    """True once a window whose title contains one of `titles` exists."""
+    titles = list(titles)
+
+    def _predicate() -> bool:
+        return window_registry.find(titles) is not None
+
+    return _predicate
+
+
+def window_gone(titles: Iterable[str]) -> Predicate:
+    """True once no window title contains any of `titles` (case-insensitive)."""
+    titles = list(titles)
+
+    def _predicate() -> bool:
+        return window_registry.find(titles) is None
+
+    return _predicate
+
+
+def pixel_matches(
+    window,
+    coords,
+    expected_colors: List[tuple],
+    state_name: str = "LE_CHEMINOT",
+) -> Predicate:
+    """
+    True once the patch at the logical `coords` shows one of `expected_colors`,
+    with the same tolerance and confidence as is_pixel_color_match.
+    """
+    palette = {"expected": expected_colors}
+
+    def _predicate() -> bool:
+        # A wait needs a fresh look at the screen on every poll
+        frame_cache.invalidate()
+        frame = frame_cache.get(window)
+        if frame is None:
+            return False
+        patch = frame.patch(coords, PATCH_RADIUS, state_name)
+        if patch is None:
+            return False
+        match = classify_patch(patch[0], palette, center=patch[1])
+        return match.label is not None and match.confidence >= MIN_CONFIDENCE
+
+    return _predicate
+
+
+def region_stable(
+    window,
+    region=None,
+    state_name: str = "LE_CHEMINOT",
+    stable_reads: int = 2,
+) -> Predicate:
+    """
+    True once the logical (x, y, w, h) `region` of `window` (or the whole client
+    area) looked identical on `stable_reads` consecutive polls, i.e. stopped changing.
+    """
+    state = {"last": None, "count": 0}
+
+    def _predicate() -> bool:
+        frame_cache.invalidate()
+        frame = frame_cache.get(window)
+        if frame is None:
+            return False
+
+        current = frame.array if region is None else frame.crop(region, state_name)
+        current = np.asarray(current) if current is not None else None
+        last = state["last"]
+        if (
+            current is not None
+            and last is not None
+            and last.shape == current.shape
+            and np.array_equal(last, current)
+        ):
+            state["count"] += 1
+        else:
+            state["count"] = 1
+        state["last"] = current
+        return state["count"] >= stable_reads
+
+    return _predicate
@@ -0,0 +1,149 @@
+import threading
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+import win32gui
+
+from utils.constants.button_coords import REF_WINDOW_SIZES
+from utils.logging_config import configure_logging
+
+logger = configure_logging("WindowTransform")
+
+DEFAULT_REF_SIZE = (1024, 768)
+
+
+def _ref_size(state_name: str) -> Tuple[int, int]:
+    ref_size = REF_WINDOW_SIZES.get(state_name)
+    if not ref_size:
+        logger.error(
+            f"State name '{state_name}' not found in REF_WINDOW_SIZES, using default size."
+        )
+        return DEFAULT_REF_SIZE
+    return ref_size
+
+
+class WindowTransform:
+    """
+    Logical design coords -> physical client px -> screen px for one window,
+    from a single GetClientRect/ClientToScreen. Every mapping is a NumPy
+    operation, so a whole coordinate table is mapped at once.
+    """
+
+    def __init__(
+        self,
+        hwnd: int,
+        origin: Tuple[int, int],
+        client_size: Tuple[int, int],
+        window_rect: Tuple[int, int, int, int],
+    ):
+        self.hwnd = hwnd
+        self.origin = np.array(origin)
+        self.client_size = client_size
+        self.window_rect = window_rect
+
+    @classmethod
+    def measure(cls, hwnd: int) -> "WindowTransform":
+        left, top, right, bottom = win32gui.GetClientRect(hwnd)
+        origin = win32gui.ClientToScreen(hwnd, (0, 0))
+        return cls(
+            hwnd,
+            origin,
+            (right - left, bottom - top),
+            tuple(win32gui.GetWindowRect(hwnd)),
+        )
+
+    def scale(self, state_name: str = "LE_CHEMINOT") -> np.ndarray:
+        ref_w, ref_h = _ref_size(state_name)
+        w, h = self.client_size
+        return np.array([w / ref_w, h / ref_h])
+
+    def to_client(self, logical_points, state_name: str = "LE_CHEMINOT") -> np.ndarray:
+        """(n, 2) logical points -> (n, 2) physical client px."""
+        pts = np.asarray(logical_points, dtype=float).reshape(-1, 2)
+        return (pts * self.scale(state_name)).astype(int)
+
+    def to_screen(self, logical_points, state_name: str = "LE_CHEMINOT") -> np.ndarray:
+        """(n, 2) logical points -> (n, 2) physical screen px."""
+        return self.to_client(logical_points, state_name) + self.origin
+
+    def point_to_screen(
+        self, logical_point, state_name: str = "LE_CHEMINOT"
+    ) -> Tuple[int, int]:
+        x, y = self.to_screen([logical_point], state_name)[0]
+        return int(x), int(y)
+
+    def region_to_screen(
+        self, region, state_name: str = "LE_CHEMINOT"
+    ) -> Tuple[int, int, int, int]:
+        """Logical (x, y, w, h) client region -> physical screen (x, y, w, h)."""
+        x, y, w, h = region
+        sx, sy = self.to_screen([(x, y)], state_name)[0]
+        pw, ph = (np.array([w, h]) * self.scale(state_name)).astype(int)
+        return int(sx), int(sy), int(pw), int(ph)
+
+    def map_table(
+        self,
+        table: Mapping[str, Sequence[int]],
+        state_name: str = "LE_CHEMINOT",
+        screen: bool = True,
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        Map a whole coordinate table (TABS, COURSE_SELECTION_COORDS...) in one
+        operation; screen px by default, client px with screen=False.
+        """
+        if not table:
+            return {}
+        names = list(table)
+        points = [table[name] for name in names]
+        mapped = (
+            self.to_screen(points, state_name)
+            if screen
+            else self.to_client(points, state_name)
+        )
+        return {name: (int(x), int(y)) for name, (x, y) in zip(names, mapped)}
+
+
+class WindowTransformCache:
+    """
+    One WindowTransform per hwnd. Every lookup costs a single GetWindowRect
+    to confirm the window did not move or resize since it was measured, so a
+    click right after Cheminot re-centres its window lands where it should;
+    only a changed rect pays for GetClientRect/ClientToScreen again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transforms: Dict[int, WindowTransform] = {}
+        self.measures = 0
+
+    def get(self, window) -> WindowTransform:
+        hwnd = window if isinstance(window, int) else window._hWnd
+        with self._lock:
+            transform = self._transforms.get(hwnd)
+
+        if transform is not None:
+            try:
+                if tuple(win32gui.GetWindowRect(hwnd)) == transform.window_rect:
+                    return transform
+            except Exception:
+                pass
+            logger.debug(f"Window {hwnd} moved or resized, measuring it again")
+
+        transform = WindowTransform.measure(hwnd)
+        self.measures += 1
+        with self._lock:
+            self._transforms[hwnd] = transform
+        return transform
+
+    def invalidate(self, window=None) -> None:
+        """Forget one window's transform, or all of them."""
+        with self._lock:
+            if window is None:
+                self._transforms.clear()
+            else:
+                hwnd = window if isinstance(window, int) else window._hWnd
+                self._transforms.pop(hwnd, None)
+
+
+# Shared by coords, screenshot and the frame cache
+window_transforms = WindowTransformCache()
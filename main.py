@@ -1,7 +1,5 @@
 import ctypes
 
-from utils.file_utils import cleanup_old_screenshots
-
 DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
 try:
     ctypes.windll.user32.SetProcessDpiAwarenessContext(
@@ -27,14 +25,14 @@ pyautogui.PAUSE = 0.08
 dotenv.load_dotenv()
 
 from states.manager import StateManager
-from states.initial_state import InitialState
-from states.login_state import LoginState
-from states.consultation_state import ConsultationState
-from states.inscription_state import InscriptionState
-from states.selection_cours_state import SelectionCoursState
-from states.horaire_state import HoraireState
-from states.exit_state import ExitState
+from states.factory import create_states
+from states.course_tracker import CourseTracker
 from states.state_types import StateType
+from commands.ocr import get_ocr_service
+from utils.scheduler import get_poll_scheduler
+from notifications.dispatcher import get_notification_dispatcher
+from utils.screenshot_writer import get_screenshot_writer
+from utils.retention import get_retention_service
 from utils.logging_config import configure_logging
 
 required_files = {
@@ -61,43 +59,66 @@ def main():
         sys.exit(1)
 
     try:
-        cleanup_old_screenshots(days=7)
+        # Prune screenshots and rotate logs in the background, now and periodically
+        get_retention_service().start()
+
+        # Load the OCR engines in the background before the first popup shows up
+        get_ocr_service().warm_up()
 
         RETRY_WAIT_MINUTES = int(os.getenv("RETRY_WAIT_MINUTES", 15))
+        PERSISTENT_SESSION = os.getenv("PERSISTENT_SESSION", "0") == "1"
+
+        # Wait between sessions (and in-session checks) follows the poll schedule
+        scheduler = get_poll_scheduler()
+
+        if PERSISTENT_SESSION:
+            # Stay logged in and poll in-session; relaunch quickly if the session dies
+            session_timeout_minutes = int(
+                os.getenv("PERSISTENT_SESSION_MAX_MINUTES", 240)
+            )
+            logger.info(
+                f"Persistent-session mode enabled (poll every {scheduler.interval_at():.0f}s)"
+            )
+        else:
+            session_timeout_minutes = RETRY_WAIT_MINUTES
 
         while True:
-            # Fresh state instances each session
-            states = {
-                StateType.INITIAL: InitialState(),
-                StateType.LOGIN: LoginState(),
-                StateType.CONSULTATION: ConsultationState(),
-                StateType.INSCRIPTION: InscriptionState(),
-                StateType.SELECTION_COURS: SelectionCoursState(),
-                StateType.HORAIRE: HoraireState(),
-                StateType.EXIT: ExitState(),
-            }
+            # Fresh state instances each session, sharing one course tracker
+            tracker = CourseTracker()
+            logger.info(f"Tracking courses: {', '.join(tracker.course_codes)}")
+            states = create_states(tracker)
 
             manager = StateManager(
                 states,
                 initial_state=StateType.INITIAL,
-                session_timeout_seconds=RETRY_WAIT_MINUTES * 60,
+                session_timeout_seconds=session_timeout_minutes * 60,
             )
 
             logger.info(
-                f"-> Starting new session of up to {RETRY_WAIT_MINUTES} minutes"
+                f"-> Starting new session of up to {session_timeout_minutes} minutes"
             )
             manager.run()
 
+            # A session that checked nothing failed on the way (launch, login...)
+            if manager.cycles_completed:
+                scheduler.record_success()
+            else:
+                scheduler.record_failure()
+
+            restart_wait_seconds = scheduler.next_wait()
             logger.info(
-                f"Session ended (timeout or exit). Restarting in {RETRY_WAIT_MINUTES} minutes at {time.strftime('%H:%M:%S', time.localtime(time.time() + RETRY_WAIT_MINUTES * 60))}..."
+                f"Session ended (timeout or exit). Restarting {scheduler.describe(restart_wait_seconds)}..."
             )
-            time.sleep(RETRY_WAIT_MINUTES * 60)
+            time.sleep(restart_wait_seconds)
 
     except KeyboardInterrupt:
         logger.info("Interrupted by user, shutting down.")
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
     finally:
+        # Let queued notifications go out before exiting
+        get_notification_dispatcher().flush(timeout=30)
+        get_screenshot_writer().flush(timeout=10)
         logger.info("=== ChemiNotify Finished ===")
 
 
@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Optional, Union
 import logging
 
+# How long a channel waits for a screenshot still being written
+IMAGE_WAIT_SECONDS = 5
+
+ImagePath = Union[str, "Future[Optional[str]]", None]
+
 
 class NotificationChannel(ABC):
     """
@@ -11,9 +18,10 @@ class NotificationChannel(ABC):
         self.logger = logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
-    def send(self, subject: str, body: str) -> bool:
+    def send(self, subject: str, body: str, image_path: ImagePath = None) -> bool:
         """
-        Send a notification with the given subject and body.
+        Send a notification with the given subject and body, and optionally
+        a screenshot attachment.
 
         Returns True on success, False otherwise.
         """
@@ -21,3 +29,18 @@ class NotificationChannel(ABC):
             "This is an abstract method and should be implemented by subclasses"
         )
         return False
+
+    def resolve_image_path(self, image_path: ImagePath) -> Optional[str]:
+        """
+        Path of the attachment. Screenshots are written in the background, so
+        `image_path` may be the writer's Future: wait for it, briefly.
+        """
+        if not isinstance(image_path, Future):
+            return image_path
+        try:
+            return image_path.result(timeout=IMAGE_WAIT_SECONDS)
+        except Exception as e:
+            self.logger.warning(
+                f"Screenshot not written in time, sending without it: {e}"
+            )
+            return None
@@ -0,0 +1,229 @@
+import time
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+from utils.detection_latency import Detection
+
+from .base import ImagePath
+from .facade import NotificationFacade, get_notification_facade
+from .notification_state import (
+    NOTIFIED_AVAILABLE,
+    NOTIFIED_UNAVAILABLE,
+    NotificationStateStore,
+    get_notification_state,
+)
+
+
+class CycleNotifier:
+    """
+    Turns the per-course results of a cycle into at most one notification.
+    Only transitions against the last notified status are reported (or a
+    group opening in a course already announced), and all of a cycle's
+    transitions go out as a single message, so channels see one message per
+    change instead of one per course per cycle.
+
+    The store is only updated once a channel confirmed delivery: a failed
+    message is retried on the next cycle. "Closed again" news is deferred
+    while a previous message is still in flight (e.g. waiting out a Discord
+    rate limit), openings are always sent right away.
+    """
+
+    def __init__(
+        self,
+        store: Optional[NotificationStateStore] = None,
+        facade: Optional[NotificationFacade] = None,
+    ):
+        self.logger = configure_logging(self.__class__.__name__)
+        self.store = store or get_notification_state()
+        self._facade = facade
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, str] = {}
+        self._in_flight_groups: Dict[str, List[str]] = {}
+        self._detections: Dict[str, Detection] = {}
+        self._images: Dict[str, ImagePath] = {}
+        self._groups: Dict[str, List[str]] = {}
+
+    @property
+    def facade(self) -> NotificationFacade:
+        return self._facade or get_notification_facade()
+
+    def seen_available(
+        self,
+        course_code: str,
+        detection: Optional[Detection] = None,
+        image_path: ImagePath = None,
+        groups: Optional[List[str]] = None,
+    ) -> None:
+        """Attach the detection, screenshot and open groups of an open course."""
+        if detection is not None:
+            self._detections[course_code] = detection
+        if image_path:
+            self._images[course_code] = image_path
+        if groups:
+            self._groups[course_code] = list(groups)
+
+    def _last_known(self, course_code: str) -> Optional[str]:
+        with self._lock:
+            if course_code in self._in_flight:
+                return self._in_flight[course_code]
+        return self.store.get(course_code)
+
+    def _last_groups(self, course_code: str) -> List[str]:
+        with self._lock:
+            if course_code in self._in_flight_groups:
+                return self._in_flight_groups[course_code]
+        return self.store.get_groups(course_code)
+
+    def flush(self, statuses: Dict[str, str]) -> Optional["Future[Dict[str, bool]]"]:
+        """
+        Notify the transitions in `statuses` ({course: available/unavailable})
+        as one message. Returns the send future, or None if nothing was sent.
+        """
+        detections, self._detections = self._detections, {}
+        images, self._images = self._images, {}
+        groups, self._groups = self._groups, {}
+
+        # Course -> groups that opened since the last notification
+        opened: Dict[str, List[str]] = {}
+        closed: List[str] = []
+        silent: Dict[str, str] = {}
+        for course_code, status in statuses.items():
+            last = self._last_known(course_code)
+            current_groups = groups.get(course_code, [])
+            if status == NOTIFIED_AVAILABLE and last == NOTIFIED_AVAILABLE:
+                last_groups = self._last_groups(course_code)
+                new_groups = [g for g in current_groups if g not in last_groups]
+                if new_groups:
+                    opened[course_code] = new_groups
+                elif set(current_groups) != set(last_groups) and current_groups:
+                    # A group closed while another stays open: remember it quietly,
+                    # so that group reopening is news again
+                    silent[course_code] = status
+                continue
+            if status == last:
+                continue
+            if status == NOTIFIED_AVAILABLE:
+                opened[course_code] = current_groups
+            elif last is None:
+                # Never announced as open: nothing to take back
+                silent[course_code] = status
+            else:
+                closed.append(course_code)
+        self.store.update(silent, groups=groups)
+
+        if closed and not opened and self._busy():
+            self.logger.info(
+                f"Previous notification still in flight, deferring: {', '.join(closed)} closed"
+            )
+            closed = []
+        if not opened and not closed:
+            self.logger.debug("No availability change to notify")
+            return None
+
+        for course_code in opened:
+            metrics.inc(
+                "notification_transitions_total", course=course_code, to="available"
+            )
+        for course_code in closed:
+            metrics.inc(
+                "notification_transitions_total", course=course_code, to="unavailable"
+            )
+
+        changes = {code: NOTIFIED_AVAILABLE for code in opened}
+        changes.update({code: NOTIFIED_UNAVAILABLE for code in closed})
+        changed_groups = {code: groups.get(code, []) for code in opened}
+        with self._lock:
+            self._in_flight.update(changes)
+            self._in_flight_groups.update(
+                {code: changed_groups.get(code, []) for code in changes}
+            )
+
+        subject, body = self._build_message(opened, closed)
+        image_path = next((images[c] for c in opened if c in images), None)
+
+        facade = self.facade
+        future = facade.send_async(subject, body, image_path)
+        sent_detections = [detections[c] for c in opened if c in detections]
+        for detection in sent_detections:
+            detection.enqueued()
+        future.add_done_callback(
+            lambda sent: self._on_sent(
+                sent, changes, changed_groups, sent_detections, facade
+            )
+        )
+        self.logger.info(f"Notification queued: {subject}")
+        return future
+
+    def _busy(self) -> bool:
+        with self._lock:
+            return bool(self._in_flight)
+
+    @staticmethod
+    def _describe_groups(groups: List[str]) -> str:
+        if not groups:
+            return ""
+        label = "group" if len(groups) == 1 else "groups"
+        return f" ({label} {', '.join(groups)})"
+
+    @classmethod
+    def _build_message(cls, opened: Dict[str, List[str]], closed: List[str]):
+        if len(opened) == 1:
+            code, groups = next(iter(opened.items()))
+            subject = f"{code}{cls._describe_groups(groups)} available"
+        elif opened:
+            subject = f"{len(opened)} courses available"
+        else:
+            subject = (
+                "Course closed again" if len(closed) == 1 else "Courses closed again"
+            )
+
+        lines = [
+            f"{code} is now available!{cls._describe_groups(groups)}"
+            for code, groups in opened.items()
+        ]
+        lines += [f"{code} is no longer available." for code in closed]
+        lines.append(f"Detected on {time.strftime('%B %d, %Y at %I:%M %p')}")
+        return subject, "\n".join(lines)
+
+    def _on_sent(
+        self,
+        sent: Future,
+        changes: Dict[str, str],
+        changed_groups: Dict[str, List[str]],
+        detections: List[Detection],
+        facade: NotificationFacade,
+    ) -> None:
+        """Called in the background once every channel answered."""
+        results = sent.result()
+        delivered_at = facade.delivered_at(results)
+        with self._lock:
+            for course_code in changes:
+                self._in_flight.pop(course_code, None)
+                self._in_flight_groups.pop(course_code, None)
+
+        if delivered_at:
+            self.store.update(changes, delivered_at, changed_groups)
+            for detection in detections:
+                detection.delivered(delivered_at)
+        else:
+            self.logger.warning(
+                f"Notification for {', '.join(changes)} not delivered, retrying next cycle"
+            )
+            for detection in detections:
+                detection.failed_delivery()
+
+
+_notifier: Optional[CycleNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_cycle_notifier() -> CycleNotifier:
+    """Shared notifier, so in-flight messages are known across sessions."""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = CycleNotifier()
+    return _notifier
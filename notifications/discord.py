@@ -1,14 +1,17 @@
 import os
-import requests
+import mimetypes
 from typing import Optional
 from utils.logging_config import configure_logging
 
-from .base import NotificationChannel
+from .base import ImagePath, NotificationChannel
+from .http_session import get_http_session, get_timeout, may_have_posted
 
 
 class DiscordNotification(NotificationChannel):
     """
     Notification channel to send messages to Discord via webhook.
+    Posts through the shared keep-alive session, with bounded timeouts and
+    retries; meant to run on the NotificationDispatcher, not inline.
     """
 
     def __init__(self, webhook_url: Optional[str] = os.getenv("DISCORD_WEBHOOK_URL")):
@@ -18,7 +21,7 @@ class DiscordNotification(NotificationChannel):
             os.getenv("NOTIFICATION_INCLUDE_SCREENSHOTS", "1") != "0"
         )
 
-    def send(self, subject: str, body: str, image_path: Optional[str] = None) -> bool:
+    def send(self, subject: str, body: str, image_path: ImagePath = None) -> bool:
         """
         Send a Discord notification, optionally with an image attachment.
         """
@@ -26,6 +29,9 @@ class DiscordNotification(NotificationChannel):
             self.logger.warning("No webhook URL configured.")
             return False
 
+        if self.include_screenshots:
+            image_path = self.resolve_image_path(image_path)
+
         if not self.include_screenshots or not image_path:
             return self._send_text_message(subject, body)
 
@@ -38,10 +44,15 @@ class DiscordNotification(NotificationChannel):
             message_content = f"**{subject}**\n{body}"
 
             with open(image_path, "rb") as img:
-                files = {"file": (os.path.basename(image_path), img, "image/png")}
+                mimetype = (
+                    mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+                )
+                files = {"file": (os.path.basename(image_path), img, mimetype)}
                 payload = {"content": message_content}
 
-                resp = requests.post(self.webhook_url, data=payload, files=files)
+                resp = get_http_session().post(
+                    self.webhook_url, data=payload, files=files, timeout=get_timeout()
+                )
 
             if resp.status_code in (200, 204):
                 self.logger.info(f"Sent with image: {subject}")
@@ -52,6 +63,11 @@ class DiscordNotification(NotificationChannel):
                 )
                 return self._send_text_message(subject, body)
         except Exception as e:
+            if may_have_posted(e):
+                # No answer, but the post may have gone through: a text
+                # fallback could send the message twice
+                self.logger.error(f"No answer to the Discord post with image: {e}")
+                return False
             self.logger.exception(
                 f"Exception when sending Discord notification with image: {e}"
             )
@@ -64,7 +80,9 @@ class DiscordNotification(NotificationChannel):
 
         payload = {"content": f"**{subject}**\n{body}"}
         try:
-            resp = requests.post(self.webhook_url, json=payload)
+            resp = get_http_session().post(
+                self.webhook_url, json=payload, timeout=get_timeout()
+            )
             if resp.status_code in (200, 204):
                 self.logger.info(f"Sent with text message only: {subject}")
                 return True
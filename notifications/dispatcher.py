@@ -0,0 +1,87 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Set
+
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+
+from .base import NotificationChannel
+
+logger = configure_logging("NotificationDispatcher")
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications on background workers, so a slow or hanging channel
+    never blocks the state machine. `submit` returns a Future of the
+    channel's send() result right away.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or int(os.getenv("NOTIFICATION_WORKERS", 4))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="notify"
+        )
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _deliver(
+        self, channel: NotificationChannel, subject: str, *args, **kwargs
+    ) -> bool:
+        name = channel.__class__.__name__
+        try:
+            ok = bool(channel.send(subject, *args, **kwargs))
+        except Exception as e:
+            logger.exception(f"{name} failed to send '{subject}': {e}")
+            ok = False
+        metrics.inc(
+            "notifications_total", channel=name, result="ok" if ok else "failed"
+        )
+        return ok
+
+    def submit(
+        self, channel: NotificationChannel, subject: str, *args, **kwargs
+    ) -> "Future[bool]":
+        """Queue channel.send(subject, *args, **kwargs) and return at once."""
+        future = self._executor.submit(self._deliver, channel, subject, *args, **kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        logger.debug(f"Queued '{subject}' for {channel.__class__.__name__}")
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued notifications; True if none is left pending."""
+        with self._lock:
+            pending = set(self._pending)
+        if not pending:
+            return True
+        _, not_done = wait(pending, timeout=timeout)
+        if not_done:
+            logger.warning(
+                f"{len(not_done)} notifications still pending after {timeout}s"
+            )
+        return not not_done
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Shared dispatcher, created on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+    return _dispatcher
@@ -1,18 +1,142 @@
+import os
+import ssl
+import mimetypes
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import List, Optional
+
 from dotenv import load_dotenv
 
-from .base import NotificationChannel
+from utils.logging_config import configure_logging
+from .base import ImagePath, NotificationChannel
 
 load_dotenv()
 
 
 class EmailNotification(NotificationChannel):
     """
-    Notification channel to send emails.
+    Notification channel to send emails over SMTP.
+    Keeps one SMTP connection open and reuses it across messages,
+    reconnecting when the server dropped it. Plain SMTP without auth works
+    against a local aiosmtpd/smtpd stand-in.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        sender: Optional[str] = None,
+        recipients: Optional[List[str]] = None,
+    ):
+        self.logger = configure_logging(self.__class__.__name__)
+        self.host = host or os.getenv("SMTP_HOST")
+        self.port = port or int(os.getenv("SMTP_PORT", 587))
+        self.username = username or os.getenv("SMTP_USERNAME")
+        self.password = password or os.getenv("SMTP_PASSWORD")
+        self.use_ssl = os.getenv("SMTP_SSL", "0") == "1"
+        self.use_starttls = os.getenv("SMTP_STARTTLS", "1") == "1" and not self.use_ssl
+        self.timeout = float(os.getenv("SMTP_TIMEOUT_SECONDS", 10))
+        self.sender = sender or os.getenv("EMAIL_FROM") or self.username
+        if recipients is None:
+            recipients = [
+                r.strip() for r in os.getenv("EMAIL_TO", "").split(",") if r.strip()
+            ]
+        self.recipients = recipients
+        self.include_screenshots = (
+            os.getenv("NOTIFICATION_INCLUDE_SCREENSHOTS", "1") != "0"
+        )
+
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(
+                self.host,
+                self.port,
+                timeout=self.timeout,
+                context=ssl.create_default_context(),
+            )
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_starttls:
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self.logger.debug(f"Connected to SMTP server {self.host}:{self.port}")
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        """The open connection, or a new one if there is none or it went stale."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self.close()
+        self._smtp = self._connect()
+        return self._smtp
+
+    def _build_message(
+        self, subject: str, body: str, image_path: ImagePath
+    ) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg.set_content(body)
+
+        if self.include_screenshots:
+            image_path = self.resolve_image_path(image_path)
+        if self.include_screenshots and image_path and os.path.exists(image_path):
+            mimetype = mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+            maintype, subtype = mimetype.split("/", 1)
+            with open(image_path, "rb") as img:
+                msg.add_attachment(
+                    img.read(),
+                    maintype=maintype,
+                    subtype=subtype,
+                    filename=os.path.basename(image_path),
+                )
+        return msg
+
+    def send(self, subject: str, body: str, image_path: ImagePath = None) -> bool:
+        if not self.host or not self.recipients:
+            self.logger.warning("No SMTP host or recipients configured.")
+            return False
+
+        msg = self._build_message(subject, body, image_path)
+        with self._lock:
+            # One retry on a fresh connection if the kept-alive one was dropped
+            for attempt in (1, 2):
+                try:
+                    self._connection().send_message(msg)
+                    self.logger.info(f"Sent email: {subject}")
+                    return True
+                except smtplib.SMTPServerDisconnected as e:
+                    error = e
+                except smtplib.SMTPException as e:
+                    # An answer from the server (SMTPException is an OSError
+                    # too): sending the same message again would not help
+                    self.logger.error(f"SMTP error sending '{subject}': {e}")
+                    return False
+                except OSError as e:
+                    error = e
+                self.close()
+                if attempt == 2:
+                    self.logger.error(f"Failed to send email '{subject}': {error}")
+        return False
 
-    def send(self, subject: str, body: str) -> bool:
-        # implement email logic
-        return True
+    def close(self) -> None:
+        """Drop the kept-alive connection."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
@@ -1,35 +1,161 @@
-from typing import Optional, List
+from concurrent.futures import Future
+from typing import Dict, Optional, List
 import os
+import threading
+import time
 
-from .base import NotificationChannel
+from utils.logging_config import configure_logging
+
+from .base import ImagePath, NotificationChannel
 from .discord import DiscordNotification
+from .dispatcher import get_notification_dispatcher
+from .email import EmailNotification
+
+
+class DeliveryResults(Dict[str, bool]):
+    """
+    {channel class name: sent} for one message, plus when each channel that
+    sent it finished, stamped per message so concurrent sends never mix.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delivered_at: Dict[str, float] = {}
+
+
+class _FanOut:
+    """
+    Collects the per-channel futures of one message into one result.
+    A channel that misses its deadline counts as failed; its send keeps
+    running in the background but no longer holds up the result.
+    """
+
+    def __init__(
+        self, names: List[str], futures: List[Future], deadline: float, logger
+    ):
+        self.result: "Future[DeliveryResults]" = Future()
+        self.logger = logger
+        self._results = DeliveryResults()
+        self._names = names
+        self._lock = threading.Lock()
+        self._timer = threading.Timer(deadline, self._expire, args=(deadline,))
+        self._timer.daemon = True
+        self._timer.start()
+
+        for name, future in zip(names, futures):
+            future.add_done_callback(lambda f, name=name: self._settle(name, f))
+
+    def _settle(self, name: str, future: Future) -> None:
+        ok = future.exception() is None and bool(future.result())
+        # Runs on the worker as soon as the channel's send returned
+        finished_at = time.time()
+        with self._lock:
+            if name in self._results:
+                return
+            self._results[name] = ok
+            if ok:
+                self._results.delivered_at[name] = finished_at
+            complete = len(self._results) == len(self._names)
+        if complete:
+            self._finish()
+
+    def _expire(self, deadline: float) -> None:
+        with self._lock:
+            late = [n for n in self._names if n not in self._results]
+            for name in late:
+                self._results[name] = False
+        if late:
+            self.logger.warning(
+                f"{', '.join(late)} missed the {deadline:.0f}s deadline"
+            )
+            self._finish()
+
+    def _finish(self) -> None:
+        self._timer.cancel()
+        with self._lock:
+            if not self.result.done():
+                results = DeliveryResults(self._results)
+                results.delivered_at.update(self._results.delivered_at)
+                self.result.set_result(results)
 
 
 class NotificationFacade:
     """
     Facade to send notifications via multiple channels.
+    Every channel is sent to concurrently on the notification dispatcher,
+    each with its own deadline, and the results come back as one dict.
     """
 
     def __init__(self, channels: Optional[List[NotificationChannel]] = None):
+        self.logger = configure_logging(self.__class__.__name__)
+        self.deadline = float(os.getenv("NOTIFICATION_CHANNEL_DEADLINE_SECONDS", 30))
         if channels:
             self._channels = channels
         else:
             self._channels = []
             if os.getenv("DISCORD_WEBHOOK_URL"):
                 self._channels.append(DiscordNotification())
+            if os.getenv("SMTP_HOST") and os.getenv("EMAIL_TO"):
+                self._channels.append(EmailNotification())
+
+    @property
+    def channels(self) -> List[NotificationChannel]:
+        return list(self._channels)
 
     def register(self, channel: NotificationChannel) -> None:
         """Register a new notification channel at runtime."""
         self._channels.append(channel)
 
-    def send(self, subject: str, body: str) -> dict[str, bool]:
+    def send_async(
+        self, subject: str, body: str, image_path: ImagePath = None
+    ) -> "Future[DeliveryResults]":
+        """
+        Send to every channel in parallel and return at once.
+        The future resolves to {channel class name: sent} once every channel
+        answered or missed its deadline.
+        """
+        if not self._channels:
+            self.logger.warning("No notification channel configured.")
+            future: Future = Future()
+            future.set_result(DeliveryResults())
+            return future
+
+        dispatcher = get_notification_dispatcher()
+        names = [channel.__class__.__name__ for channel in self._channels]
+        futures = [
+            dispatcher.submit(channel, subject, body, image_path)
+            for channel in self._channels
+        ]
+        return _FanOut(names, futures, self.deadline, self.logger).result
+
+    def send(
+        self, subject: str, body: str, image_path: ImagePath = None
+    ) -> dict[str, bool]:
         """
         Send the given subject and body to all registered channels.
         Returns a dict mapping channel class names to send status.
         """
-        results = {}
+        return self.send_async(subject, body, image_path).result()
+
+    @staticmethod
+    def delivered_at(results: Dict[str, bool]) -> Optional[float]:
+        """Earliest confirmed delivery of this message among its channels."""
+        times = [
+            at
+            for name, at in getattr(results, "delivered_at", {}).items()
+            if results.get(name)
+        ]
+        return min(times) if times else None
+
+
+_facade: Optional[NotificationFacade] = None
+_facade_lock = threading.Lock()
+
 
-        for channel in self._channels:
-            name = channel.__class__.__name__
-            results[name] = channel.send(subject, body)
-        return results
+def get_notification_facade() -> NotificationFacade:
+    """Shared facade, so channels keep their connections between messages."""
+    global _facade
+    with _facade_lock:
+        if _facade is None:
+            _facade = NotificationFacade()
+    return _facade
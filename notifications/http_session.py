@@ -0,0 +1,106 @@
+import os
+import threading
+from http.client import RemoteDisconnected
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, ProtocolError
+from urllib3.util.retry import Retry
+
+# Transient answers worth retrying; 429 honours Discord's Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# How a kept-alive connection the server already closed fails: closed
+# without a status line, or reset while the request was being written
+STALE_CONNECTION_ERRORS = (
+    RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+def get_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout for every notification request."""
+    read_timeout = float(os.getenv("NOTIFICATION_TIMEOUT_SECONDS", 10))
+    return min(3.05, read_timeout), read_timeout
+
+
+def may_have_posted(error: Exception) -> bool:
+    """
+    Whether a failed request may still have reached the webhook: anything but
+    a failed connect (refused, DNS, connect timeout), so resending could
+    post the message twice.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return False
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        # Retries exhausted: the adapter wraps urllib3's MaxRetryError
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return not isinstance(reason, ConnectTimeoutError)
+    return False
+
+
+def _stale_connection(error: Optional[Exception]) -> bool:
+    """A request that died on a connection the server had closed, unanswered."""
+    return (
+        isinstance(error, ProtocolError)
+        and len(error.args) > 1
+        and isinstance(error.args[1], STALE_CONNECTION_ERRORS)
+    )
+
+
+class WebhookRetry(Retry):
+    """
+    Retry that only replays a POST the webhook never accepted: a failed
+    connect sent nothing and a 429/5xx answer was a refusal. A read timeout
+    may come after the message was posted, so it is never retried (read=0).
+    The one exception is the first stale keep-alive connection: the server
+    had closed it, so the request was not processed and it counts as a
+    connect error. A second one, on the fresh connection, is not retried.
+    """
+
+    def _is_connection_error(self, err: Exception) -> bool:
+        if super()._is_connection_error(err):
+            return True
+        return _stale_connection(err) and not any(
+            _stale_connection(attempt.error) for attempt in self.history
+        )
+
+
+def _build_session() -> requests.Session:
+    retry = WebhookRetry(
+        total=int(os.getenv("NOTIFICATION_RETRIES", 3)),
+        backoff_factor=float(os.getenv("NOTIFICATION_RETRY_BACKOFF_SECONDS", 0.5)),
+        read=0,
+        other=0,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Shared keep-alive session for the notification channels: connections to
+    the webhook host are reused, and transient failures retried with backoff.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+    return _session
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+from utils.logging_config import configure_logging
+
+logger = configure_logging("NotificationState")
+
+# Statuses a notification can be about
+NOTIFIED_AVAILABLE = "available"
+NOTIFIED_UNAVAILABLE = "unavailable"
+
+
+class NotificationStateStore:
+    """
+    Last status the user was told about, per course, with the groups that
+    were open. A course is only notified again once its status differs from
+    the stored one or another group opened, so an open course is announced
+    once, not on every cycle. Persisted as JSON so a restart does not
+    re-announce courses that are still open.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "NOTIFICATION_STATE_FILE", "logs/notification_state.json"
+        )
+        self._lock = threading.Lock()
+        self._courses: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._courses = dict(data.get("courses", {}))
+            logger.debug(f"Loaded notified status of {len(self._courses)} courses")
+        except Exception as e:
+            logger.warning(f"Could not load notification state from {self.path}: {e}")
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "courses": self._courses}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save notification state to {self.path}: {e}")
+
+    def get(self, course_code: str) -> Optional[str]:
+        """Last notified status of the course, or None if it never was."""
+        with self._lock:
+            entry = self._courses.get(course_code)
+        return entry["status"] if entry else None
+
+    def get_groups(self, course_code: str) -> List[str]:
+        """Groups that were open when the course was last notified."""
+        with self._lock:
+            entry = self._courses.get(course_code)
+        return list(entry.get("groups", [])) if entry else []
+
+    def update(
+        self,
+        statuses: Dict[str, str],
+        at: Optional[float] = None,
+        groups: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """Store the statuses (and open groups) the user was just told about."""
+        if not statuses:
+            return
+        at = at or time.time()
+        groups = groups or {}
+        with self._lock:
+            for course_code, status in statuses.items():
+                self._courses[course_code] = {
+                    "status": status,
+                    "groups": list(groups.get(course_code, [])),
+                    "since": at,
+                }
+            self._save()
+
+
+_store: Optional[NotificationStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_notification_state() -> NotificationStateStore:
+    """Shared store, loaded on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NotificationStateStore()
+    return _store
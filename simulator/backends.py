@@ -0,0 +1,256 @@
+import os
+import sys
+import types
+from PIL import Image
+from typing import Optional
+
+from simulator.desktop import SCREEN_SIZE, SimulatedDesktop
+
+WM_CLOSE = 0x0010
+
+
+class PyGetWindowException(Exception):
+    pass
+
+
+def _window_class(desktop: SimulatedDesktop):
+    class Window:
+        """pygetwindow.Window over a simulated window, looked up live by hwnd."""
+
+        def __init__(self, hwnd: int):
+            self._hWnd = hwnd
+            self._last_title = ""
+
+        def _win(self):
+            win = desktop.window(self._hWnd)
+            if win is None:
+                raise PyGetWindowException(
+                    f"Error code from Windows: 1400 - Invalid window handle {self._hWnd}"
+                )
+            return win
+
+        @property
+        def title(self) -> str:
+            win = desktop.window(self._hWnd)
+            if win is not None:
+                self._last_title = win.title
+            return self._last_title
+
+        @property
+        def left(self) -> int:
+            return self._win().rect[0]
+
+        @property
+        def top(self) -> int:
+            return self._win().rect[1]
+
+        @property
+        def width(self) -> int:
+            left, _, right, _ = self._win().rect
+            return right - left
+
+        @property
+        def height(self) -> int:
+            _, top, _, bottom = self._win().rect
+            return bottom - top
+
+        @property
+        def visible(self) -> bool:
+            win = desktop.window(self._hWnd)
+            return bool(win and win.visible)
+
+        @property
+        def isActive(self) -> bool:
+            return desktop.active is not None and desktop.active.hwnd == self._hWnd
+
+        def activate(self) -> None:
+            self._win()
+            desktop.activate(self._hWnd)
+
+        def close(self) -> None:
+            self._win()
+            desktop.close(self._hWnd)
+
+        def __repr__(self) -> str:
+            return f"<SimWindow hwnd={self._hWnd:#x} title={self.title!r}>"
+
+    return Window
+
+
+def _pygetwindow(desktop: SimulatedDesktop) -> types.ModuleType:
+    mod = types.ModuleType("pygetwindow")
+    Window = _window_class(desktop)
+    mod.Window = mod.Win32Window = Window
+    mod.PyGetWindowException = PyGetWindowException
+
+    def getAllWindows():
+        with desktop.lock:
+            return [Window(w.hwnd) for w in desktop.windows]
+
+    def getWindowsWithTitle(title: str):
+        return [w for w in getAllWindows() if title.upper() in w.title.upper()]
+
+    def getActiveWindow() -> Optional[Window]:
+        active = desktop.active
+        return Window(active.hwnd) if active else None
+
+    mod.getAllWindows = getAllWindows
+    mod.getWindowsWithTitle = getWindowsWithTitle
+    mod.getActiveWindow = getActiveWindow
+    return mod
+
+
+def _pyautogui(desktop: SimulatedDesktop) -> types.ModuleType:
+    mod = types.ModuleType("pyautogui")
+    mod.FAILSAFE = False
+    mod.PAUSE = 0.0
+
+    def size():
+        return SCREEN_SIZE
+
+    def position():
+        return desktop.mouse
+
+    def moveTo(x=None, y=None, duration=0.0, **kwargs):
+        if x is not None and y is not None:
+            desktop.mouse = (int(x), int(y))
+
+    def click(x=None, y=None, **kwargs):
+        if x is None or y is None:
+            x, y = desktop.mouse
+        desktop.click(int(x), int(y))
+
+    def pixel(x, y):
+        desktop.stats["pixels"] += 1
+        r, g, b = desktop.render()[int(y), int(x)]
+        return int(r), int(g), int(b)
+
+    def screenshot(region=None, **kwargs):
+        desktop.stats["screenshots"] += 1
+        frame = desktop.render()
+        if region:
+            x, y, w, h = (int(v) for v in region)
+            frame = frame[max(0, y) : y + h, max(0, x) : x + w]
+        return Image.fromarray(frame.copy())
+
+    def write(text, interval=0.0, **kwargs):
+        desktop.type_text(text)
+
+    def press(key, **kwargs):
+        desktop.press(key)
+
+    def hotkey(*keys, **kwargs):
+        desktop.hotkey(*keys)
+
+    def locateOnScreen(*args, **kwargs):
+        return None
+
+    def center(box):
+        left, top, width, height = box
+        return left + width // 2, top + height // 2
+
+    for fn in (
+        size,
+        position,
+        moveTo,
+        click,
+        pixel,
+        screenshot,
+        write,
+        press,
+        hotkey,
+        locateOnScreen,
+        center,
+    ):
+        setattr(mod, fn.__name__, fn)
+    return mod
+
+
+def _win32(desktop: SimulatedDesktop):
+    win32gui = types.ModuleType("win32gui")
+    win32con = types.ModuleType("win32con")
+    win32con.WM_CLOSE = WM_CLOSE
+
+    def _win(hwnd):
+        win = desktop.window(hwnd)
+        if win is None:
+            raise OSError(1400, "Invalid window handle")
+        return win
+
+    def GetClientRect(hwnd):
+        w, h = _win(hwnd).client_size
+        return 0, 0, w, h
+
+    def GetWindowRect(hwnd):
+        return _win(hwnd).rect
+
+    def ClientToScreen(hwnd, point):
+        ox, oy = _win(hwnd).client_origin
+        return ox + int(point[0]), oy + int(point[1])
+
+    def EnumWindows(callback, extra):
+        with desktop.lock:
+            hwnds = [w.hwnd for w in desktop.windows]
+        for hwnd in hwnds:
+            if callback(hwnd, extra) is False:
+                break
+
+    def IsWindowVisible(hwnd):
+        win = desktop.window(hwnd)
+        return bool(win and win.visible)
+
+    def GetWindowText(hwnd):
+        win = desktop.window(hwnd)
+        return win.title if win else ""
+
+    def PostMessage(hwnd, msg, wparam, lparam):
+        if msg == WM_CLOSE:
+            desktop.post_close(hwnd)
+
+    for fn in (
+        GetClientRect,
+        GetWindowRect,
+        ClientToScreen,
+        EnumWindows,
+        IsWindowVisible,
+        GetWindowText,
+        PostMessage,
+    ):
+        setattr(win32gui, fn.__name__, fn)
+    return win32gui, win32con
+
+
+def _pytesseract(desktop: SimulatedDesktop) -> types.ModuleType:
+    mod = types.ModuleType("pytesseract")
+    mod.pytesseract = types.SimpleNamespace(tesseract_cmd=None)
+
+    def image_to_string(img, lang=None, **kwargs):
+        return desktop.ocr_text()
+
+    mod.image_to_string = image_to_string
+    return mod
+
+
+def install(desktop: SimulatedDesktop) -> None:
+    """
+    Route every Windows-only dependency to `desktop`: must run before any
+    commands/, states/ or utils/ module is imported.
+    """
+    win32gui, win32con = _win32(desktop)
+    sys.modules["pygetwindow"] = _pygetwindow(desktop)
+    sys.modules["pyautogui"] = _pyautogui(desktop)
+    sys.modules["win32gui"] = win32gui
+    sys.modules["win32con"] = win32con
+    sys.modules["pytesseract"] = _pytesseract(desktop)
+    os.startfile = desktop.launch
+
+    from utils.window_events import FakeWindowEventSource, set_window_event_source
+
+    events = FakeWindowEventSource()
+    desktop.on_window_created.append(events.emit)
+    set_window_event_source(events)
+
+    # OCR must go through the fake pytesseract even if tesserocr is installed
+    import commands.ocr
+
+    commands.ocr.tesserocr = None
@@ -0,0 +1,269 @@
+"""
+End-to-end benchmark of the state machine against the simulated desktop.
+
+    python -m simulator.bench --cycles 5 --courses GTI611,LOG710 --full LOG710
+    python -m simulator.bench --persistent --cycles 20 --sleep-scale 0.1
+
+Reports per-state handle() latency and per-cycle latency (one cycle = one
+check of every tracked course, including the relaunch when not persistent).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from simulator.desktop import SimCourse, SimulatedDesktop
+from simulator import backends
+
+_real_sleep = time.sleep
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values) if values else 0.0,
+        "p50_ms": 1000 * _percentile(values, 50),
+        "p95_ms": 1000 * _percentile(values, 95),
+        "max_ms": 1000 * max(values) if values else 0.0,
+    }
+
+
+class BenchRecorder:
+    """Times every handle() call and splits them into check cycles."""
+
+    def __init__(
+        self,
+        desktop: SimulatedDesktop,
+        target_cycles: int,
+        open_at: int,
+        open_group: int = 1,
+    ):
+        self.desktop = desktop
+        self.target_cycles = target_cycles
+        self.open_at = open_at
+        self.open_group = open_group
+        self.state_samples: Dict[str, List[float]] = defaultdict(list)
+        self.cycle_samples: List[float] = []
+        self.cycle_results: List[Dict[str, str]] = []
+        self._cycle_elapsed = 0.0
+        self._apply_script()
+
+    @property
+    def done(self) -> bool:
+        return len(self.cycle_samples) >= self.target_cycles
+
+    def wrap_states(self, states) -> None:
+        from states.state_types import StateType
+
+        for state_type, state in states.items():
+            state.handle = self._timed(state_type, state.handle, StateType)
+            tracker = getattr(state, "tracker", None)
+            if tracker is not None and not getattr(tracker, "_bench_wrapped", False):
+                tracker.finish_cycle = self._on_results(tracker)
+                tracker._bench_wrapped = True
+
+    def _on_results(self, tracker):
+        finish_cycle = tracker.finish_cycle
+
+        def wrapped():
+            groups = dict(tracker.group_results)
+            results = finish_cycle()
+            # "available[02]": which groups were seen open
+            annotated = {}
+            for code, status in results.items():
+                opened = [
+                    g for g, s in groups.get(code, {}).items() if s == "available"
+                ]
+                annotated[code] = f"{status}[{','.join(opened)}]" if opened else status
+            self.cycle_results.append(annotated)
+            return results
+
+        return wrapped
+
+    def _timed(self, state_type, handle, StateType):
+        def wrapped():
+            start = time.perf_counter()
+            next_state = handle()
+            elapsed = time.perf_counter() - start
+            self.state_samples[state_type.name].append(elapsed)
+
+            if self.done:
+                return next_state
+
+            # Poll sleeps are idle time, not check latency
+            if state_type != StateType.POLL_WAIT:
+                self._cycle_elapsed += elapsed
+            if next_state == StateType.POLL_WAIT or state_type == StateType.EXIT:
+                self._close_cycle()
+                if self.done and next_state == StateType.POLL_WAIT:
+                    return StateType.EXIT
+            return next_state
+
+        return wrapped
+
+    def _close_cycle(self) -> None:
+        self.cycle_samples.append(self._cycle_elapsed)
+        self._cycle_elapsed = 0.0
+        self._apply_script()
+
+    def _apply_script(self) -> None:
+        """Open --open-group of the courses once the upcoming cycle reaches --open-at."""
+        if self.open_at and len(self.cycle_samples) + 1 >= self.open_at:
+            index = self.open_group - 1
+            for course in self.desktop.courses.values():
+                if not course.full:
+                    groups = course.groups + [False] * (index + 1 - len(course.groups))
+                    groups[index] = True
+                    course.groups = groups
+
+    def report(self) -> dict:
+        return {
+            "states": {
+                name: _summary(samples) for name, samples in self.state_samples.items()
+            },
+            "cycles": _summary(self.cycle_samples),
+            "cycle_results": self.cycle_results,
+            "desktop": dict(self.desktop.stats),
+        }
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument(
+        "--courses", default="GTI611", help="Comma separated course codes to track"
+    )
+    parser.add_argument(
+        "--full", default="", help="Comma separated courses that answer 'complets'"
+    )
+    parser.add_argument(
+        "--groups", type=int, default=1, help="Group rows shown per open course"
+    )
+    parser.add_argument(
+        "--open-at",
+        type=int,
+        default=0,
+        help="Cycle from which a group of open courses becomes available",
+    )
+    parser.add_argument(
+        "--open-group",
+        type=int,
+        default=1,
+        help="Which group row (1-based) --open-at makes available",
+    )
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="DPI scale of the fake windows"
+    )
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=1.0,
+        help="Multiply every time.sleep() in the app (0.1 = ten times faster)",
+    )
+    parser.add_argument("--no-session-popup", action="store_true")
+    parser.add_argument("--json", help="Write the report to this file as JSON")
+    parser.add_argument(
+        "--workdir", help="Where logs/ goes (default: a temporary directory)"
+    )
+    return parser.parse_args(argv)
+
+
+def _print_report(report: dict) -> None:
+    header = f"{'state':<16}{'count':>7}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["states"].items()) + [("CYCLE", report["cycles"])]
+    for name, s in rows:
+        print(
+            f"{name:<16}{s['count']:>7}{s['mean_ms']:>11.1f}{s['p50_ms']:>11.1f}{s['p95_ms']:>11.1f}{s['max_ms']:>11.1f}"
+        )
+    print()
+    for i, results in enumerate(report["cycle_results"], 1):
+        print(f"cycle {i}: {', '.join(f'{c}={s}' for c, s in results.items())}")
+    print(f"desktop: {report['desktop']}")
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    codes = [c.strip().upper() for c in args.courses.split(",") if c.strip()]
+    full = {c.strip().upper() for c in args.full.split(",") if c.strip()}
+    courses = {
+        code: SimCourse(full=code in full, groups=[False] * max(1, args.groups))
+        for code in codes
+    }
+    desktop = SimulatedDesktop(
+        courses=courses,
+        scale=args.scale,
+        session_popup=not args.no_session_popup,
+    )
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cheminotify-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    os.environ.update(
+        {
+            "CHEMINOT_FILE_PATH": "cheminot.jnlp",
+            "CHEMINOT_USERNAME": "simulated",
+            "CHEMINOT_PASSWORD": "simulated",
+            "TRACKING_COURSE_CODES": ",".join(codes),
+            "PERSISTENT_SESSION": "1" if args.persistent else "0",
+            "POLL_INTERVAL_SECONDS": "0",
+            "POPUP_SIGNATURES_FILE": os.path.join(workdir, "popup_signatures.json"),
+            # Never ping a real webhook from the bench
+            "DISCORD_WEBHOOK_URL": "",
+        }
+    )
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    if args.sleep_scale != 1.0:
+        time.sleep = lambda seconds: _real_sleep(max(0.0, seconds) * args.sleep_scale)
+
+    # Fakes first: the app modules import pyautogui & co at import time
+    backends.install(desktop)
+
+    from states.course_tracker import CourseTracker
+    from states.factory import create_states
+    from states.manager import StateManager
+    from states.state_types import StateType
+
+    recorder = BenchRecorder(desktop, args.cycles, args.open_at, args.open_group)
+    started = time.perf_counter()
+    while not recorder.done:
+        states = create_states(CourseTracker())
+        recorder.wrap_states(states)
+        StateManager(states, initial_state=StateType.INITIAL).run()
+
+    from utils.metrics import metrics
+
+    report = recorder.report()
+    report["metrics"] = metrics.snapshot()["counters"]
+    report["wall_s"] = time.perf_counter() - started
+    report["config"] = vars(args)
+
+    _print_report(report)
+    print(f"wall time: {report['wall_s']:.1f}s, workdir: {workdir}")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+import hashlib
+import threading
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.constants.button_coords import (
+    COLORS,
+    COURSE_SELECTION_COORDS,
+    HORAIRE_STATE_COORDS,
+    LOGIN_STATE_COORDS,
+    REF_WINDOW_SIZES,
+    TABS,
+)
+from utils.constants.texts import WINDOW_TITLES
+
+SCREEN_SIZE = (1280, 800)
+DESKTOP_COLOR = (0, 99, 177)
+WINDOW_COLOR = (212, 208, 200)
+INACTIVE_TAB_COLOR = (160, 160, 160)
+POPUP_COLOR = (255, 255, 255)
+
+# Non-client area around the client rect (border and title bar)
+BORDER = 8
+TITLE_BAR = 31
+
+# How close (logical px) a click must land to hit a button
+HIT_RADIUS = 5
+
+# Horaire view: group rows stacked under the first group pixel. The simulated
+# layout only; the app finds the rows by scanning the group column.
+GROUP_ROW_PITCH = 16
+GROUP_ROW_HEIGHT = 7
+GROUP_BLOCK_WIDTH = 40
+
+COURSE_FULL_TEXT = (
+    "Les cours sont complets. Vous pouvez vous inscrire sur la liste des annulations."
+)
+SESSION_SELECTION_TEXT = (
+    "Pour quelle session voulez-vous modifier votre choix de cours ?"
+)
+
+
+class SimCourse:
+    """Scripted state of one course: full, or open with per-group availability."""
+
+    def __init__(self, full: bool = False, groups: Optional[List[bool]] = None):
+        self.full = full
+        self.groups = groups if groups is not None else [False]
+
+
+class SimWindow:
+    """A top-level window of the simulated desktop."""
+
+    def __init__(
+        self,
+        desktop: "SimulatedDesktop",
+        hwnd: int,
+        title: str,
+        kind: str,
+        client_origin: Tuple[int, int],
+        client_size: Tuple[int, int],
+        text: str = "",
+    ):
+        self.desktop = desktop
+        self.hwnd = hwnd
+        self.title = title
+        self.kind = kind
+        self.client_origin = client_origin
+        self.client_size = client_size
+        self.text = text
+        self.visible = True
+
+    @property
+    def rect(self) -> Tuple[int, int, int, int]:
+        """Window rect (left, top, right, bottom) including the non-client area."""
+        x, y = self.client_origin
+        w, h = self.client_size
+        return x - BORDER, y - TITLE_BAR, x + w + BORDER, y + h + BORDER
+
+    def contains(self, x: int, y: int) -> bool:
+        left, top, right, bottom = self.rect
+        return left <= x < right and top <= y < bottom
+
+
+class SimulatedDesktop:
+    """
+    Fake Windows desktop running a fake Cheminot: login window, main window
+    with tabs coloured from COLORS, course selection popups and a horaire grid
+    whose group availability is scripted per course.
+
+    All state changes happen under one lock; delayed events (app launch, login)
+    fire from timer threads like the real app would.
+    """
+
+    def __init__(
+        self,
+        courses: Optional[Dict[str, SimCourse]] = None,
+        scale: float = 1.0,
+        launch_delay: float = 0.5,
+        login_delay: float = 0.3,
+        session_popup: bool = True,
+    ):
+        self.courses = courses or {}
+        self.scale = scale
+        self.launch_delay = launch_delay
+        self.login_delay = login_delay
+        self.session_popup = session_popup
+
+        self.lock = threading.RLock()
+        self.windows: List[SimWindow] = []  # bottom to top
+        self.active: Optional[SimWindow] = None
+        self.mouse = (SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
+        self._next_hwnd = 0x1000
+
+        # Fake Cheminot state
+        self.fields = {"USERNAME_FIELD": "", "PASSWORD_FIELD": ""}
+        self.focused_field: Optional[str] = None
+        self.active_tab = "CONSULTATION"
+        self.selected_course: Optional[str] = None
+
+        self.on_window_created: List[Callable[[int], None]] = []
+        self.stats = {"clicks": 0, "screenshots": 0, "pixels": 0, "ocr": 0}
+
+    # -- windows -------------------------------------------------------------
+
+    def _create_window(
+        self,
+        title: str,
+        kind: str,
+        client_origin: Tuple[int, int],
+        client_size: Tuple[int, int],
+        text: str = "",
+    ) -> SimWindow:
+        with self.lock:
+            self._next_hwnd += 1
+            win = SimWindow(
+                self, self._next_hwnd, title, kind, client_origin, client_size, text
+            )
+            self.windows.append(win)
+            self.active = win
+        for callback in self.on_window_created:
+            callback(win.hwnd)
+        return win
+
+    def window(self, hwnd: int) -> Optional[SimWindow]:
+        with self.lock:
+            for win in self.windows:
+                if win.hwnd == hwnd:
+                    return win
+        return None
+
+    def find_kind(self, kind: str) -> Optional[SimWindow]:
+        with self.lock:
+            for win in reversed(self.windows):
+                if win.kind == kind:
+                    return win
+        return None
+
+    def activate(self, hwnd: int) -> None:
+        with self.lock:
+            win = self.window(hwnd)
+            if win is None:
+                return
+            self.windows.remove(win)
+            self.windows.append(win)
+            self.active = win
+
+    def close(self, hwnd: int) -> None:
+        with self.lock:
+            win = self.window(hwnd)
+            if win is None:
+                return
+            self.windows.remove(win)
+            if win.kind == "popup" and win.text == SESSION_SELECTION_TEXT:
+                self._after_session_selected()
+            self.active = self.windows[-1] if self.windows else None
+
+    def _scaled_size(self, ref_name: str) -> Tuple[int, int]:
+        ref_w, ref_h = REF_WINDOW_SIZES[ref_name]
+        return int(ref_w * self.scale), int(ref_h * self.scale)
+
+    def _open_popup(self, title: str, text: str) -> SimWindow:
+        main = self.find_kind("main")
+        x, y = main.client_origin if main else (400, 200)
+        return self._create_window(title, "popup", (x + 120, y + 150), (360, 120), text)
+
+    # -- app lifecycle -------------------------------------------------------
+
+    def launch(self, path: str = "") -> None:
+        """os.startfile(cheminot.jnlp): the login window shows up after a delay."""
+        threading.Timer(self.launch_delay, self._show_login).start()
+
+    def _show_login(self) -> None:
+        with self.lock:
+            self.fields = {"USERNAME_FIELD": "", "PASSWORD_FIELD": ""}
+            self.focused_field = None
+        self._create_window(
+            WINDOW_TITLES["LOGIN_TITLE_BAR"][0],
+            "login",
+            (60, 80),
+            self._scaled_size("LOGIN"),
+        )
+
+    def _submit_login(self) -> None:
+        if not all(self.fields.values()):
+            return
+        if self.session_popup:
+            threading.Timer(
+                self.login_delay,
+                lambda: self._open_popup("ChemiNot", SESSION_SELECTION_TEXT),
+            ).start()
+        else:
+            threading.Timer(self.login_delay, self._show_main).start()
+
+    def _after_session_selected(self) -> None:
+        threading.Timer(self.login_delay, self._show_main).start()
+
+    def _show_main(self) -> None:
+        with self.lock:
+            self.active_tab = "CONSULTATION"
+            self.selected_course = None
+        self._create_window(
+            WINDOW_TITLES["MAIN_WINDOW"][0],
+            "main",
+            (460, 80),
+            self._scaled_size("LE_CHEMINOT"),
+        )
+
+    # -- input ---------------------------------------------------------------
+
+    def _hit(self, logical: Tuple[float, float], target: Tuple[int, int]) -> bool:
+        return (
+            abs(logical[0] - target[0]) <= HIT_RADIUS
+            and abs(logical[1] - target[1]) <= HIT_RADIUS
+        )
+
+    def _to_logical(self, win: SimWindow, x: int, y: int) -> Tuple[float, float]:
+        ox, oy = win.client_origin
+        return (x - ox) / self.scale, (y - oy) / self.scale
+
+    def click(self, x: int, y: int) -> None:
+        with self.lock:
+            self.stats["clicks"] += 1
+            self.mouse = (x, y)
+            target = next((w for w in reversed(self.windows) if w.contains(x, y)), None)
+            if target is None:
+                return
+            self.activate(target.hwnd)
+            logical = self._to_logical(target, x, y)
+            if target.kind == "login":
+                self._click_login(logical)
+            elif target.kind == "main":
+                self._click_main(target, logical)
+
+    def _click_login(self, logical) -> None:
+        for field in ("USERNAME_FIELD", "PASSWORD_FIELD"):
+            if self._hit(logical, LOGIN_STATE_COORDS[field]):
+                self.focused_field = field
+                return
+        if self._hit(logical, LOGIN_STATE_COORDS["LOGIN_BUTTON"]):
+            self._submit_login()
+
+    def _click_main(self, win: SimWindow, logical) -> None:
+        for tab in (
+            "CONSULTATION",
+            "INSCRIPTION_SESSION",
+            "SELECTION_COURS",
+            "HORAIRE",
+        ):
+            if self._hit(logical, TABS[tab]):
+                self.active_tab = tab
+                return
+        if self._hit(logical, TABS["QUITTER"]):
+            self.close(win.hwnd)
+            return
+
+        if self.active_tab != "SELECTION_COURS":
+            return
+        hits = [
+            code
+            for code in self.courses
+            if code in COURSE_SELECTION_COORDS
+            and self._hit(logical, COURSE_SELECTION_COORDS[code])
+        ]
+        if not hits:
+            return
+        # Some buttons sit a few px apart: the closest one wins
+        code = min(
+            hits,
+            key=lambda c: abs(logical[0] - COURSE_SELECTION_COORDS[c][0])
+            + abs(logical[1] - COURSE_SELECTION_COORDS[c][1]),
+        )
+        self.selected_course = code
+        if self.courses[code].full:
+            self._open_popup("ChemiNot", COURSE_FULL_TEXT)
+        else:
+            self.active_tab = "HORAIRE"
+
+    def type_text(self, text: str) -> None:
+        with self.lock:
+            if self.focused_field:
+                self.fields[self.focused_field] += text
+
+    def press(self, key: str) -> None:
+        with self.lock:
+            active = self.active
+            if key == "delete" and self.focused_field:
+                self.fields[self.focused_field] = ""
+            elif key in ("space", "enter") and active and active.kind == "popup":
+                self.close(active.hwnd)
+
+    def hotkey(self, *keys: str) -> None:
+        with self.lock:
+            if keys == ("alt", "f4") and self.active:
+                self.close(self.active.hwnd)
+
+    def post_close(self, hwnd: int) -> None:
+        """WM_CLOSE sent to a window."""
+        self.close(hwnd)
+
+    # -- rendering -----------------------------------------------------------
+
+    def _fill(self, img, origin, rect, color) -> None:
+        """Fill a client-relative logical rect (x0, y0, x1, y1), scaled, clipped."""
+        ox, oy = origin
+        x0, y0, x1, y1 = (int(v * self.scale) for v in rect)
+        h, w = img.shape[:2]
+        x0, x1 = max(0, ox + x0), min(w, ox + x1)
+        y0, y1 = max(0, oy + y0), min(h, oy + y1)
+        if x0 < x1 and y0 < y1:
+            img[y0:y1, x0:x1] = color
+
+    def _render_window(self, img: np.ndarray, win: SimWindow) -> None:
+        left, top, right, bottom = win.rect
+        h, w = img.shape[:2]
+        img[max(0, top) : min(h, bottom), max(0, left) : min(w, right)] = (0, 0, 120)
+
+        ox, oy = win.client_origin
+        cw, ch = win.client_size
+        img[max(0, oy) : min(h, oy + ch), max(0, ox) : min(w, ox + cw)] = (
+            POPUP_COLOR if win.kind == "popup" else WINDOW_COLOR
+        )
+
+        if win.kind == "main":
+            self._render_main(img, win.client_origin)
+        elif win.kind == "popup":
+            # Deterministic stripes from the text, so each dialog looks unique
+            digest = hashlib.md5(win.text.encode("utf-8")).digest()
+            for i, byte in enumerate(digest[:12]):
+                x0 = 10 + i * 28
+                self._fill(
+                    img, win.client_origin, (x0, 30, x0 + 6 + byte % 16, 70), (0, 0, 0)
+                )
+
+    def _render_main(self, img: np.ndarray, origin) -> None:
+        active_tabs = {self.active_tab}
+        if self.active_tab in ("SELECTION_COURS", "HORAIRE"):
+            active_tabs.add("INSCRIPTION_SESSION")
+
+        for tab in (
+            "CONSULTATION",
+            "INSCRIPTION_SESSION",
+            "SELECTION_COURS",
+            "HORAIRE",
+        ):
+            x, y = TABS[tab]
+            color = COLORS[tab][0] if tab in active_tabs else INACTIVE_TAB_COLOR
+            self._fill(img, origin, (x - 6, y - 3, x + 7, y + 4), color)
+
+        if self.active_tab == "HORAIRE" and self.selected_course in self.courses:
+            x, y = HORAIRE_STATE_COORDS["FIRST_GROUP_COURSE_BLACK_PIXEL"]
+            for i, available in enumerate(self.courses[self.selected_course].groups):
+                top = y - 3 + i * GROUP_ROW_PITCH
+                color = (
+                    COLORS["COURSE_AVAILABLE"][0]
+                    if available
+                    else COLORS["COURSE_UNAVAILABLE"][0]
+                )
+                self._fill(
+                    img,
+                    origin,
+                    (
+                        x - GROUP_BLOCK_WIDTH // 2,
+                        top,
+                        x + GROUP_BLOCK_WIDTH // 2,
+                        top + GROUP_ROW_HEIGHT,
+                    ),
+                    color,
+                )
+
+    def render(self) -> np.ndarray:
+        """Composite every visible window, bottom to top, into one RGB frame."""
+        with self.lock:
+            img = np.empty((SCREEN_SIZE[1], SCREEN_SIZE[0], 3), dtype=np.uint8)
+            img[:] = DESKTOP_COLOR
+            for win in self.windows:
+                if win.visible:
+                    self._render_window(img, win)
+            return img
+
+    def ocr_text(self) -> str:
+        """What OCR would read: the text of the top-most popup, if any."""
+        with self.lock:
+            self.stats["ocr"] += 1
+            for win in reversed(self.windows):
+                if win.kind == "popup":
+                    return win.text
+        return ""
@@ -4,10 +4,16 @@ import time
 from typing import Optional, List
 from abc import ABC, abstractmethod
 from .state_types import StateType
+from .course_tracker import NOTIFIED_STATUS
+from .screen_identifier import is_tab_active
 
 from utils.logging_config import configure_logging
-from commands.screenshot import take_debug_screenshot
-from commands.popup_detector import normalize
+from commands.screenshot import screenshot
+from utils.flight_recorder import Capture, flight_recorder
+from utils.window_registry import window_registry
+from utils.constants.texts import WINDOW_TITLES
+from utils.scheduler import get_poll_scheduler
+from notifications.cycle_notifier import get_cycle_notifier
 
 
 class AppState(ABC):
@@ -44,7 +50,49 @@ class AppState(ABC):
     def is_debug_mode(self) -> bool:
         return os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG"
 
-    def take_screenshot(self, name_suffix: Optional[str] = None) -> Optional[str]:
+    def is_persistent_mode(self) -> bool:
+        return os.getenv("PERSISTENT_SESSION", "0") == "1"
+
+    def end_of_check_state(self) -> StateType:
+        """
+        State to go to once a course check is done.
+        In persistent-session mode we stay logged in and wait for the next tick,
+        otherwise the session is closed and main() relaunches Cheminot later.
+        """
+        if self.is_persistent_mode():
+            return StateType.POLL_WAIT
+        return StateType.EXIT
+
+    def finish_check_cycle(self, tracker) -> StateType:
+        """
+        Every tracked course was checked: notify this cycle's availability
+        changes in one message and leave for the end-of-check state.
+        """
+        results = tracker.finish_cycle()
+        get_cycle_notifier().flush(
+            {
+                code: NOTIFIED_STATUS[status]
+                for code, status in results.items()
+                if status in NOTIFIED_STATUS
+            }
+        )
+        self.logger.info(f"All courses checked, {self.describe_next_check()}")
+        return self.end_of_check_state()
+
+    def describe_next_check(self) -> str:
+        """Human readable description of when the next check will happen."""
+        interval = get_poll_scheduler().interval_at()
+        if self.is_persistent_mode():
+            return f"next in-session check in about {interval:.0f}s"
+
+        next_at = time.strftime("%H:%M:%S", time.localtime(time.time() + interval))
+        return f"App will restart in about {interval / 60:.1f}m (next at {next_at})"
+
+    def take_screenshot(self, name_suffix: Optional[str] = None) -> Optional[Capture]:
+        """
+        Debug screenshot, kept in the flight recorder rather than written.
+        `capture.save()` writes it when it is needed after all.
+        """
         if not self.is_debug_mode():
             return None
 
@@ -54,13 +102,28 @@ class AppState(ABC):
             if name_suffix:
                 name = f"{name}_{name_suffix}"
 
-            return take_debug_screenshot(name)
+            return flight_recorder.record(screenshot(), name)
         except Exception as e:
             self.logger.error(f"Failed to take screenshot: {str(e)}")
             return None
 
-    def take_error_screenshot(self, error_name: str = "error") -> Optional[str]:
-        return self.take_screenshot(f"ERROR_{error_name}")
+    def take_error_screenshot(self, error_name: str = "error") -> None:
+        """Screenshot the error and write it with the captures leading to it."""
+        self.take_screenshot(f"ERROR_{error_name}")
+        flight_recorder.dump(error_name)
+
+    def detect_tab(self, tab: str) -> bool:
+        """
+        Whether the main window is showing `tab`, checked like identify_screen()
+        does. A quiet check: an inactive tab is an answer, not a mismatch.
+        """
+        window = self.ensure_window_focus(WINDOW_TITLES["MAIN_WINDOW"])
+        if not window:
+            return False
+
+        active = is_tab_active(window, tab)
+        self.logger.info(f"{tab} tab is {'active' if active else 'not active'}")
+        return active
 
     def ensure_window_focus(self, window_titles: List[str]) -> Optional[gw.Win32Window]:
         """
@@ -69,20 +132,7 @@ class AppState(ABC):
         """
         self.logger.debug(f"Ensuring window focus for: {', '.join(window_titles)}")
 
-        time.sleep(0.5)
-
-        found_window = None
-        windows = gw.getAllWindows()
-
-        for title in window_titles:
-            self.logger.debug(f"Searching for window with title like `{title}`")
-            for win in windows:
-                if normalize(title) in normalize(win.title):
-                    found_window = win
-                    self.logger.debug(f"Found window with match: `{win.title}`")
-                    break
-            if found_window:
-                break
+        found_window = window_registry.find(window_titles)
 
         if found_window:
             self.logger.debug(f"Found window, activating: {found_window.title}")
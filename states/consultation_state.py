@@ -1,35 +1,13 @@
-import time
-
 from .base import AppState
 from .state_types import StateType
-from commands.coords import click, is_pixel_color_match
+from commands.coords import click
+from commands.waits import pixel_matches, wait_until
 from utils.constants.button_coords import TABS, COLORS
 
 
 class ConsultationState(AppState):
     def detect(self) -> bool:
-        consultation_window = self.ensure_window_focus(["Le ChemiNot"])
-        if not consultation_window:
-            return False
-
-        tab_coords = TABS["CONSULTATION"]
-        active_colors = COLORS["CONSULTATION"]
-
-        tab_is_active = is_pixel_color_match(
-            window=consultation_window,
-            coords=tab_coords,
-            element_name="CONSULTATION_TAB",
-            expected_colors=active_colors,
-        )
-
-        if tab_is_active:
-            self.logger.info("Consultation state detected - consultation tab is active")
-            return True
-        else:
-            self.logger.info(
-                "Consultation window found but consultation tab is not active"
-            )
-            return False
+        return self.detect_tab("CONSULTATION")
 
     def handle(self) -> StateType:
         self.logger.info("Handling consultation state")
@@ -44,7 +22,14 @@ class ConsultationState(AppState):
         self.logger.info("Clicking on INSCRIPTION_SESSION tab")
         click(TABS["INSCRIPTION_SESSION"], window=window)
 
-        time.sleep(0.5)
+        if window:
+            wait_until(
+                pixel_matches(
+                    window, TABS["INSCRIPTION_SESSION"], COLORS["INSCRIPTION_SESSION"]
+                ),
+                timeout=3,
+                description="inscription tab to be active",
+            )
 
         self.logger.info(
             "Navigated to inscription session, transitioning to inscription state"
@@ -0,0 +1,95 @@
+import os
+from typing import Dict, List, Optional
+
+from utils.logging_config import configure_logging
+from notifications.notification_state import NOTIFIED_AVAILABLE, NOTIFIED_UNAVAILABLE
+
+DEFAULT_COURSE_CODE = "GTI611"
+
+# Per-course check results
+COURSE_AVAILABLE = "available"
+COURSE_UNAVAILABLE = "unavailable"
+COURSE_FULL = "full"
+COURSE_UNKNOWN = "unknown"
+COURSE_NO_COORDS = "no_coords"
+
+# Results that say something the user should hear about; unknown ones do not
+NOTIFIED_STATUS = {
+    COURSE_AVAILABLE: NOTIFIED_AVAILABLE,
+    COURSE_UNAVAILABLE: NOTIFIED_UNAVAILABLE,
+    COURSE_FULL: NOTIFIED_UNAVAILABLE,
+}
+
+
+def get_tracking_course_codes() -> List[str]:
+    """
+    Read the courses to track from TRACKING_COURSE_CODES (comma separated,
+    e.g. "GTI611,LOG710,GTI745"), falling back to the single TRACKING_COURSE_CODE.
+    """
+    raw = os.getenv("TRACKING_COURSE_CODES") or os.getenv(
+        "TRACKING_COURSE_CODE", DEFAULT_COURSE_CODE
+    )
+
+    codes = []
+    for code in raw.strip('"').split(","):
+        code = code.strip().upper()
+        if code and code not in codes:
+            codes.append(code)
+
+    return codes or [DEFAULT_COURSE_CODE]
+
+
+class CourseTracker:
+    """
+    Walks every tracked course within one login and collects per-course results.
+    Shared by SelectionCoursState and HoraireState so one session checks them all.
+    """
+
+    def __init__(self, course_codes: Optional[List[str]] = None):
+        self.course_codes = course_codes or get_tracking_course_codes()
+        self.logger = configure_logging(self.__class__.__name__)
+        self._index = 0
+        self.results: Dict[str, str] = {}
+        # Per-group results of the courses whose horaire was read
+        self.group_results: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def current(self) -> Optional[str]:
+        """Course code being checked, or None once every course was checked."""
+        if self._index < len(self.course_codes):
+            return self.course_codes[self._index]
+        return None
+
+    def has_more(self) -> bool:
+        return self.current is not None
+
+    def record(self, status: str, groups: Optional[Dict[str, str]] = None) -> None:
+        """
+        Record the result for the current course and move to the next one.
+        `groups` maps group numbers to their own result, when they were read.
+        """
+        course_code = self.current
+        if course_code is None:
+            self.logger.warning(f"No course left to record '{status}' for")
+            return
+
+        self.results[course_code] = status
+        detail = ""
+        if groups:
+            self.group_results[course_code] = dict(groups)
+            detail = " [" + ", ".join(f"{g}={s}" for g, s in groups.items()) + "]"
+        self.logger.info(
+            f"{course_code}: {status}{detail} ({self._index + 1}/{len(self.course_codes)})"
+        )
+        self._index += 1
+
+    def finish_cycle(self) -> Dict[str, str]:
+        """Log the per-course results of this cycle and rewind for the next one."""
+        results = dict(self.results)
+        summary = ", ".join(f"{code}={status}" for code, status in results.items())
+        self.logger.info(f"Cycle results: {summary or 'no course checked'}")
+
+        self._index = 0
+        self.results = {}
+        self.group_results = {}
+        return results
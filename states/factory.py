@@ -0,0 +1,28 @@
+from typing import Dict, Optional
+
+from .base import AppState
+from .consultation_state import ConsultationState
+from .course_tracker import CourseTracker
+from .exit_state import ExitState
+from .horaire_state import HoraireState
+from .initial_state import InitialState
+from .inscription_state import InscriptionState
+from .login_state import LoginState
+from .poll_wait_state import PollWaitState
+from .selection_cours_state import SelectionCoursState
+from .state_types import StateType
+
+
+def create_states(tracker: Optional[CourseTracker] = None) -> Dict[StateType, AppState]:
+    """Fresh state instances for one session, sharing one course tracker."""
+    tracker = tracker or CourseTracker()
+    return {
+        StateType.INITIAL: InitialState(),
+        StateType.LOGIN: LoginState(),
+        StateType.CONSULTATION: ConsultationState(),
+        StateType.INSCRIPTION: InscriptionState(),
+        StateType.SELECTION_COURS: SelectionCoursState(tracker),
+        StateType.HORAIRE: HoraireState(tracker),
+        StateType.POLL_WAIT: PollWaitState(),
+        StateType.EXIT: ExitState(),
+    }
@@ -1,25 +1,41 @@
-import os
 import time
+from typing import Optional
 
 from .base import AppState
 from .state_types import StateType
-from notifications.discord import DiscordNotification
-from commands.coords import moveTo, is_pixel_color_match
-from utils.constants.button_coords import COLORS, HORAIRE_STATE_COORDS, TABS
+from .course_tracker import (
+    COURSE_AVAILABLE,
+    COURSE_UNAVAILABLE,
+    COURSE_UNKNOWN,
+    CourseTracker,
+)
+from notifications.cycle_notifier import get_cycle_notifier
+from commands.coords import moveTo
+from commands.frame_cache import frame_cache
+from commands.horaire_groups import (
+    FIRST_GROUP,
+    GROUP_AVAILABLE,
+    GROUP_PALETTE,
+    GROUP_UNKNOWN,
+    read_groups,
+)
+from commands.waits import pixel_matches, wait_until
+from utils.detection_latency import detection_timeline
+from utils.flight_recorder import flight_recorder
+from utils.metrics import metrics
+from utils.constants.button_coords import HORAIRE_STATE_COORDS
+
+# How long the first group row may take to be drawn after the course click
+GROUP_DRAW_TIMEOUT = 1.5
 
 
 class HoraireState(AppState):
-    def detect(self) -> bool:
-        window = self.ensure_window_focus(["Le ChemiNot"])
-        if not window:
-            return False
+    def __init__(self, tracker: Optional[CourseTracker] = None):
+        super().__init__()
+        self.tracker = tracker or CourseTracker()
 
-        return is_pixel_color_match(
-            window=window,
-            coords=TABS["HORAIRE"],
-            element_name="HORAIRE_TAB",
-            expected_colors=COLORS["HORAIRE"],
-        )
+    def detect(self) -> bool:
+        return self.detect_tab("HORAIRE")
 
     def handle(self) -> StateType:
         self.logger.info("Handling HoraireState: checking course availability")
@@ -29,52 +45,73 @@ class HoraireState(AppState):
             self.logger.warning("Could not focus horaire window, but continuing")
             self.take_error_screenshot("no_window_found")
 
-        # Replace the _take_window_screenshot call with base class method
-        screenshot_path = self.take_screenshot("before_pixel_check")
+        # Kept in memory, only written if it ends up attached to a notification
+        capture = self.take_screenshot("before_pixel_check")
 
         logical_pt = HORAIRE_STATE_COORDS["FIRST_GROUP_COURSE_BLACK_PIXEL"]
         moveTo(logical_pt, window=window, duration=0.1)
         time.sleep(0.1)
 
-        course_code = os.getenv("TRACKING_COURSE_CODE", "GTI611").upper()
-        retry_wait_min = float(os.getenv("RETRY_WAIT_MINUTES", 15))
-
-        if is_pixel_color_match(
-            window=window,
-            coords=logical_pt,
-            element_name="COURSE_AVAILABLE",
-            expected_colors=COLORS["COURSE_AVAILABLE"],
-        ):
-            # BLACK pixel means course is available
-            self.logger.info(
-                f"{course_code} is available (pixel is black) - sending notification"
-            )
+        course_code = self.tracker.current or "UNKNOWN"
 
-            current_time = time.strftime("%B %d, %Y at %I:%M %p")
-            subject = "Course available"
-            body = f"{course_code} is now available!\n"
-            body += f"Detected on {current_time}"
+        # Every group row is classified from the same capture
+        groups = self._read_groups(window)
+        group_statuses = {g.group: g.status for g in groups}
+        open_groups = [g.group for g in groups if g.status == GROUP_AVAILABLE]
 
-            discord_notifier = DiscordNotification()
-            discord_notifier.send(subject, body, screenshot_path)
+        if open_groups:
+            # BLACK pixel in a group row means that group has a seat
             self.logger.info(
-                f"Notification sent for {course_code}, exiting session. App will restart in {retry_wait_min}m"
+                f"{course_code} is available in group(s) {', '.join(open_groups)}"
             )
-            return StateType.EXIT
-        elif is_pixel_color_match(
-            window=window,
-            coords=logical_pt,
-            element_name="COURSE_UNAVAILABLE",
-            expected_colors=COLORS["COURSE_UNAVAILABLE"],
-        ):
-            # NOT available - exit to restart session
-            self.logger.info(
-                f"{course_code} not available (pixel is gray C0C0C0) - exiting session. App will restart in {retry_wait_min}m"
+            detection = detection_timeline.positive(course_code, self._frame_time())
+
+            # Notified at the end of the cycle, only if it was not already open
+            get_cycle_notifier().seen_available(
+                course_code,
+                detection,
+                capture.save() if capture else None,
+                groups=open_groups,
             )
-            return StateType.EXIT
+            self.tracker.record(COURSE_AVAILABLE, group_statuses)
+        elif groups and groups[0].status != GROUP_UNKNOWN:
+            # Every group row is gray C0C0C0
+            self.logger.info(f"{course_code} not available in {len(groups)} group(s)")
+            detection_timeline.negative(course_code, self._frame_time())
+            self.tracker.record(COURSE_UNAVAILABLE, group_statuses)
         else:
-            # Unknown pixel color - log and exit for safety
+            # Unknown pixel color - log and move on
+            color = groups[0].color if groups else None
             self.logger.warning(
-                f"Unknown pixel color detected for {course_code} - exiting session for safety"
+                f"Unknown group color {color} detected for {course_code}"
             )
-            return StateType.EXIT
+            metrics.inc("pixel_mismatches_total", element="COURSE_GROUP")
+            flight_recorder.dump("COURSE_GROUP_color_mismatch")
+            self.tracker.record(COURSE_UNKNOWN)
+
+        if self.tracker.has_more():
+            self.logger.info("Checking next tracked course")
+            return StateType.SELECTION_COURS
+
+        return self.finish_check_cycle(self.tracker)
+
+    def _read_groups(self, window):
+        """Group rows of the horaire panel, read once its first row is drawn."""
+        if window:
+            # Leaves the frame that showed the row in the cache for read_groups
+            wait_until(
+                pixel_matches(
+                    window,
+                    FIRST_GROUP,
+                    [c for cs in GROUP_PALETTE.values() for c in cs],
+                ),
+                timeout=GROUP_DRAW_TIMEOUT,
+                description="first horaire group row",
+                poll=0.05,
+            )
+        return read_groups(window) or []
+
+    def _frame_time(self) -> float:
+        """Capture time of the frame the pixel check just read."""
+        frame = frame_cache.last_frame
+        return frame.captured_at if frame is not None else time.time()
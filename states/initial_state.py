@@ -1,9 +1,9 @@
 import os
-import time
 import win32gui
 import win32con
 
 from commands.popup_detector import PopupDetector
+from commands.waits import wait_until, window_exists, window_gone
 from .base import AppState
 from .state_types import StateType
 from utils.constants.texts import (
@@ -42,7 +42,13 @@ class InitialState(AppState):
                 win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
 
         win32gui.EnumWindows(_close_if_unwanted, None)
-        time.sleep(1)
+        wait_until(
+            window_gone(
+                WINDOW_TITLES["MAIN_WINDOW"] + WINDOW_TITLES["LOGIN_TITLE_BAR"]
+            ),
+            timeout=3,
+            description="previous Cheminot windows to close",
+        )
 
     def handle(self) -> StateType:
         self.logger.info("InitialState: cleaning up unwanted windows...")
@@ -60,20 +66,18 @@ class InitialState(AppState):
         os.startfile(cheminot_path)
 
         # Wait for the app to load
-        self.logger.info("Waiting for Java to launch the application (3 seconds)...")
-        time.sleep(3)
-
-        max_wait_seconds = 30
-        for i in range(max_wait_seconds):
-            self.logger.info(
-                f"Attempt #{i + 1} to locate and focus the Cheminot window..."
-            )
-            app_titles = WINDOW_TITLES["LOGIN_TITLE_BAR"]
+        self.logger.info("Waiting for Java to launch the application...")
+        app_titles = WINDOW_TITLES["LOGIN_TITLE_BAR"]
+        if wait_until(
+            window_exists(app_titles),
+            timeout=33,
+            description="Cheminot login window",
+            poll=0.25,
+        ):
             window = self.ensure_window_focus(app_titles)
             if window:
                 self.logger.info(f"Application window found: {window.title}")
                 return StateType.LOGIN
-            time.sleep(1)
 
         self.logger.error("Could not find application window after launch!")
         raise RuntimeError(
@@ -1,25 +1,14 @@
-import time
-import pygetwindow as gw
-
 from .base import AppState
 from .state_types import StateType
-from utils.constants.button_coords import COLORS, TABS
-from commands.coords import click, is_pixel_color_match
+from utils.constants.button_coords import TABS
+from commands.coords import click
 from commands.popup_detector import PopupDetector
+from commands.waits import region_stable, wait_until
 
 
 class InscriptionState(AppState):
     def detect(self) -> bool:
-        window = self.ensure_window_focus(["Le ChemiNot"])
-        if not window:
-            return False
-
-        return is_pixel_color_match(
-            window=window,
-            coords=TABS["INSCRIPTION_SESSION"],
-            element_name="INSCRIPTION_SESSION_TAB",
-            expected_colors=COLORS["INSCRIPTION_SESSION"],
-        )
+        return self.detect_tab("INSCRIPTION_SESSION")
 
     def handle(self) -> StateType:
         self.logger.info("Handling inscription state")
@@ -42,7 +31,12 @@ class InscriptionState(AppState):
 
         popup_detector.detect_and_handle_active_popups()
 
-        time.sleep(1)
+        if window:
+            wait_until(
+                region_stable(window),
+                timeout=3,
+                description="course selection view to settle",
+            )
 
         self.logger.info(
             "Navigated to course selection, transitioning to selection course state"
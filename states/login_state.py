@@ -1,25 +1,26 @@
 import os
-import time
 import pyautogui
-import pygetwindow as gw
 import dotenv
 
 from .base import AppState
 from .state_types import StateType
+from .screen_identifier import login_window
 from commands.coords import click
-from utils.constants.button_coords import LOGIN_STATE_COORDS
+from commands.waits import pixel_matches, wait_until, window_exists
+from utils.constants.button_coords import COLORS, LOGIN_STATE_COORDS, TABS
 from utils.constants.texts import WINDOW_TITLES
+from utils.window_helpers import list_window_titles
 from commands.popup_detector import PopupDetector
 
 
 class LoginState(AppState):
     def detect(self) -> bool:
-        for title in WINDOW_TITLES["LOGIN_TITLE_BAR"]:
-            if gw.getWindowsWithTitle(title):
-                self.logger.info(
-                    f"Login state detected: found window with '{title}' title"
-                )
-                return True
+        window = login_window()
+        if window is not None:
+            self.logger.info(
+                f"Login state detected: found window with '{window.title}' title"
+            )
+            return True
 
         self.logger.info("Login state not detected")
         return False
@@ -49,50 +50,68 @@ class LoginState(AppState):
             )
             return StateType.EXIT
 
-        self.logger.info("Entering username...")
-        click(LOGIN_STATE_COORDS["USERNAME_FIELD"], window=window, state_name="LOGIN")
-        time.sleep(1.0)
-        pyautogui.hotkey("ctrl", "a")
-        time.sleep(0.5)
-        pyautogui.press("delete")
-        time.sleep(0.7)
+        typing_interval = float(os.getenv("TYPING_INTERVAL_SECONDS", 0.03))
 
-        for char in app_username:
-            pyautogui.write(char)
-            time.sleep(0.1)
-        time.sleep(0.3)
+        self.logger.info("Entering username...")
+        self._fill_field(
+            LOGIN_STATE_COORDS["USERNAME_FIELD"], app_username, window, typing_interval
+        )
 
         self.logger.info("Entering password...")
-        click(LOGIN_STATE_COORDS["PASSWORD_FIELD"], window=window, state_name="LOGIN")
-        time.sleep(0.1)
-        pyautogui.hotkey("ctrl", "a")
-        time.sleep(0.3)
-        pyautogui.press("delete")
-        time.sleep(0.3)
-
-        for char in app_password:
-            pyautogui.write(char)
-            time.sleep(0.1)
+        self._fill_field(
+            LOGIN_STATE_COORDS["PASSWORD_FIELD"], app_password, window, typing_interval
+        )
 
         self.logger.info("Clicking login button...")
-        time.sleep(0.5)
+        before = list_window_titles()
         click(LOGIN_STATE_COORDS["LOGIN_BUTTON"], window=window, state_name="LOGIN")
 
-        # This clears out the popup (that asks whether you want to enroll/cancel session)
-        time.sleep(1)
-        pyautogui.press("tab")
-        time.sleep(0.5)
-        pyautogui.press("space")
+        main_titles = WINDOW_TITLES["MAIN_WINDOW"]
+        main_window_shown = window_exists(main_titles)
+
+        def _session_popup_shown() -> bool:
+            new_titles = list_window_titles() - before
+            return any(not any(m in t for m in main_titles) for t in new_titles)
+
+        # Login either opens the popup (that asks whether you want to enroll/cancel
+        # session) or goes straight to the main window
+        wait_until(
+            lambda: _session_popup_shown() or main_window_shown(),
+            timeout=10,
+            description="session popup or main window after login",
+        )
+        if _session_popup_shown():
+            # This clears out the popup
+            pyautogui.press("tab")
+            pyautogui.press("space")
 
         self.logger.info("Waiting for login to complete")
-        time.sleep(5.0)
+        if not wait_until(main_window_shown, timeout=30, description="main window"):
+            self.take_error_screenshot("login_timeout")
+            self.logger.error("Main window did not show up after login")
+            return StateType.EXIT
 
         # Check for and handle any popups that might be active
         detector = PopupDetector()
         detector.detect_and_handle_active_popups()
 
-        # Add extra wait time before transitioning to consultation state
-        time.sleep(2.0)
+        # Wait until the consultation tab is rendered before moving on
+        main_window = self.ensure_window_focus(main_titles)
+        if main_window:
+            wait_until(
+                pixel_matches(
+                    main_window, TABS["CONSULTATION"], COLORS["CONSULTATION"]
+                ),
+                timeout=10,
+                description="consultation tab to be active",
+            )
 
         self.logger.info("Login complete, transitioning to consultation state")
         return StateType.CONSULTATION
+
+    def _fill_field(self, coords, text: str, window, typing_interval: float) -> None:
+        """Click a login field, clear it and type `text` into it."""
+        click(coords, window=window, state_name="LOGIN")
+        pyautogui.hotkey("ctrl", "a")
+        pyautogui.press("delete")
+        pyautogui.write(text, interval=typing_interval)
@@ -3,23 +3,64 @@ import traceback
 import os
 from typing import Dict, Optional
 from utils.logging_config import configure_logging
+from utils.metrics import metrics
+from utils.scheduler import get_poll_scheduler
+from utils.flight_recorder import flight_recorder
+from commands.popup_detector import PopupDetector
 from .base import AppState
+from .recovery import (
+    RECOVERY_GIVE_UP,
+    RECOVERY_RELAUNCH,
+    RECOVERY_RESUME,
+    RECOVERY_RETRY,
+    RecoveryPolicy,
+)
+from .screen_identifier import ScreenIdentification, identify_screen
 from .state_types import StateType
 
+# States whose transition to POLL_WAIT/EXIT ends a check of every course
+CHECK_STATES = (StateType.SELECTION_COURS, StateType.HORAIRE)
+
+# Identified screen -> state to resume from. The horaire panel shows the
+# course selected before the error, so its check starts over from the selection.
+RESUME_STATES = {
+    StateType.LOGIN: StateType.LOGIN,
+    StateType.CONSULTATION: StateType.CONSULTATION,
+    StateType.INSCRIPTION: StateType.INSCRIPTION,
+    StateType.SELECTION_COURS: StateType.SELECTION_COURS,
+    StateType.HORAIRE: StateType.SELECTION_COURS,
+}
+
 
 class StateManager:
-    """Manages application states, transitions, and enforces a session timeout."""
+    """
+    Manages application states, transitions, and enforces a session timeout.
+    Every handle() is timed and every transition counted in `utils.metrics`.
+    With STATE_RESUME=1 the screen is identified at startup, so the session
+    picks up where Cheminot actually is instead of relaunching it.
+    A state error goes through the RecoveryPolicy (retry, resume from the
+    identified screen, relaunch) before the session gives up with EXIT.
+    """
 
     def __init__(
         self,
         states: Dict[StateType, AppState],
         initial_state: StateType = StateType.INITIAL,
         session_timeout_seconds: Optional[int] = None,
+        resume: Optional[bool] = None,
+        recovery: Optional[RecoveryPolicy] = None,
     ):
+        if resume is None:
+            resume = os.getenv("STATE_RESUME", "1") == "1"
         self.states = states
         self.current_state_name = initial_state
         self.session_timeout = session_timeout_seconds
+        self.resume = resume
+        self.recovery = recovery or RecoveryPolicy()
         self.session_start_time = None
+        self.cycle_start_time = None
+        # Check cycles finished this session; 0 means the session failed
+        self.cycles_completed = 0
         self.logger = configure_logging(self.__class__.__name__)
 
     def take_error_screenshot(self, error_name: str = "state_manager_error"):
@@ -35,10 +76,123 @@ class StateManager:
             self.logger.error(f"Failed to take error screenshot: {str(e)}")
             return None
 
+    def detect(self, state_name: StateType) -> bool:
+        """Run the detect() of a state, timed like handle()."""
+        state = self.states.get(state_name)
+        if not state:
+            return False
+        flight_recorder.state = state_name.name
+        with metrics.timer("state_detect_seconds", state=state_name.name):
+            return state.detect()
+
+    def identify(self) -> ScreenIdentification:
+        """Which state the app is in, from one capture of the screen."""
+        flight_recorder.state = "IDENTIFY"
+        with metrics.timer("state_identify_seconds"):
+            return identify_screen()
+
+    def resume_state(self, reason: str) -> Optional[StateType]:
+        """
+        State to resume from, after closing any popup in the way.
+        None if Cheminot is not in a state a session can pick up.
+        """
+        identification = self.identify()
+        if identification.popup:
+            self.logger.info(f"Closing popup '{identification.popup}' before resuming")
+            PopupDetector().detect_and_handle_active_popups()
+            identification = self.identify()
+
+        resumed = RESUME_STATES.get(identification.state)
+        if resumed is None or resumed not in self.states:
+            return None
+        self.logger.info(f"Resuming at {resumed} ({reason}: {identification.detail})")
+        metrics.inc("state_resumes_total", reason=reason, state=resumed.name)
+        return resumed
+
+    def _recover(self, failed_state: StateType) -> StateType:
+        """
+        State to go to after `failed_state` raised, following the recovery
+        policy: the failed state again, the identified screen's state, INITIAL
+        for a relaunch, or EXIT once every budget is spent.
+        """
+        if failed_state == StateType.EXIT:
+            return StateType.EXIT
+        self.recovery.record_failure()
+
+        action = self.recovery.next_action()
+        while action != RECOVERY_GIVE_UP:
+            if action == RECOVERY_RESUME and not self.resume:
+                action = self.recovery.next_action(after=action)
+                continue
+
+            delay = self.recovery.take(action)
+            self.logger.warning(
+                f"Recovering from the {failed_state} error: {action} in {delay:.1f}s "
+                f"({self.recovery.describe()})"
+            )
+            metrics.inc(
+                "state_recoveries_total", action=action, state=failed_state.name
+            )
+            time.sleep(delay)
+
+            try:
+                next_state = self._apply_recovery(action, failed_state)
+            except Exception as e:
+                self.logger.error(f"Recovery '{action}' failed: {e}")
+                next_state = None
+            if next_state is not None:
+                return next_state
+            action = self.recovery.next_action(after=action)
+
+        self.logger.error(
+            f"Giving up after {self.recovery.streak} consecutive errors "
+            f"({self.recovery.describe()})"
+        )
+        metrics.inc(
+            "state_recoveries_total", action=RECOVERY_GIVE_UP, state=failed_state.name
+        )
+        return StateType.EXIT
+
+    def _apply_recovery(
+        self, action: str, failed_state: StateType
+    ) -> Optional[StateType]:
+        """Carry out one recovery action; None if it found nothing to go on with."""
+        if action == RECOVERY_RETRY:
+            # A stray popup is the usual reason a state fails; clear it first
+            PopupDetector().detect_and_handle_active_popups()
+            return failed_state
+        if action == RECOVERY_RESUME:
+            return self.resume_state("error")
+        if action == RECOVERY_RELAUNCH:
+            return StateType.INITIAL
+        return None
+
+    def _end_of_cycle(self, state_name: StateType, next_state: StateType) -> bool:
+        if next_state == StateType.POLL_WAIT:
+            return True
+        return state_name in CHECK_STATES and next_state == StateType.EXIT
+
     def run(self):
         """Main state machine loop"""
         self.session_start_time = time.time()
+        self.cycle_start_time = time.time()
 
+        # Cheminot may already be open (e.g. after a restart of this script)
+        if self.resume and self.current_state_name == StateType.INITIAL:
+            try:
+                self.current_state_name = (
+                    self.resume_state("startup") or StateType.INITIAL
+                )
+            except Exception as e:
+                self.logger.error(f"Could not identify the screen at startup: {e}")
+
+        try:
+            self._run_states()
+        finally:
+            metrics.observe("session_seconds", time.time() - self.session_start_time)
+            metrics.flush()
+
+    def _run_states(self):
         while True:
             # Check session timeout if enabled
             if (
@@ -48,6 +202,7 @@ class StateManager:
                 self.logger.info(
                     f"Session timeout reached ({self.session_timeout / 60:.1f} minutes)"
                 )
+                metrics.inc("session_timeouts_total")
                 self.current_state_name = StateType.EXIT
 
             try:
@@ -59,10 +214,32 @@ class StateManager:
                     break
 
                 # Process the current state and get the next state
-                next_state = current_state.handle()
+                flight_recorder.state = self.current_state_name.name
+                with metrics.timer(
+                    "state_handle_seconds", state=self.current_state_name.name
+                ):
+                    next_state = current_state.handle()
                 self.logger.info(
                     f"State transition: {self.current_state_name} -> {next_state}"
                 )
+                metrics.inc(
+                    "state_transitions_total",
+                    from_state=self.current_state_name.name,
+                    to_state=next_state.name,
+                )
+
+                if self._end_of_cycle(self.current_state_name, next_state):
+                    metrics.observe(
+                        "cycle_seconds", time.time() - self.cycle_start_time
+                    )
+                    self.cycles_completed += 1
+                    # The infrastructure works again: in-session waits drop the backoff
+                    get_poll_scheduler().record_success()
+                if self.current_state_name == StateType.POLL_WAIT:
+                    # The wait itself is idle time, the next cycle starts now
+                    self.cycle_start_time = time.time()
+
+                self.recovery.record_success()
 
                 if self.current_state_name == StateType.EXIT:
                     self.logger.info("EXIT state completed, exiting state machine")
@@ -73,4 +250,17 @@ class StateManager:
             except Exception as e:
                 self.logger.error(f"Error in state {self.current_state_name}: {e}")
                 self.logger.error(traceback.format_exc())
-                self.current_state_name = StateType.EXIT
+                metrics.inc(
+                    "state_exceptions_total",
+                    state=self.current_state_name.name,
+                    error=e.__class__.__name__,
+                )
+                flight_recorder.dump(
+                    f"{self.current_state_name.name}_{e.__class__.__name__}"
+                )
+                if self.current_state_name == StateType.EXIT:
+                    # Nothing left to recover for, and EXIT would only raise again
+                    break
+                self.current_state_name = self._recover(self.current_state_name)
+
+            metrics.maybe_flush()
@@ -0,0 +1,58 @@
+import time
+
+from .base import AppState
+from .state_types import StateType
+from .screen_identifier import is_tab_active
+from commands.popup_detector import PopupDetector
+from utils.constants.texts import WINDOW_TITLES
+from utils.scheduler import get_poll_scheduler
+
+
+class PollWaitState(AppState):
+    """
+    Persistent-session mode - keeps Cheminot logged in between checks.
+    Waits as long as the poll schedule says, then goes back to SELECTION_COURS
+    if the session is still alive, or to EXIT so main() does a full relaunch.
+    """
+
+    def detect(self) -> bool:
+        return self.is_session_alive()
+
+    def is_session_alive(self) -> bool:
+        """
+        The session is considered alive when the main window still exists
+        and one of the course tabs (SELECTION_COURS or HORAIRE) is active.
+        """
+        window = self.ensure_window_focus(WINDOW_TITLES["MAIN_WINDOW"])
+        if not window:
+            self.logger.warning("Main window is gone, session is dead")
+            return False
+
+        # Only one of the tabs is active: a quiet check, so the expected
+        # mismatch of the other is not logged, counted or dumped
+        for tab in ("HORAIRE", "SELECTION_COURS"):
+            if is_tab_active(window, tab):
+                self.logger.debug(f"Session alive: {tab} tab is active")
+                return True
+
+        self.logger.warning("No course tab is active, session is dead")
+        return False
+
+    def handle(self) -> StateType:
+        scheduler = get_poll_scheduler()
+        interval = scheduler.next_wait()
+        self.logger.info(
+            f"Waiting before next in-session check, {scheduler.describe(interval)}"
+        )
+        time.sleep(interval)
+
+        # Clear any stray popups before checking the tabs
+        PopupDetector().detect_and_handle_active_popups()
+
+        if not self.is_session_alive():
+            self.take_error_screenshot("session_dead")
+            self.logger.warning("Session died, falling back to a full relaunch")
+            return StateType.EXIT
+
+        self.logger.info("Session still alive, re-running course selection")
+        return StateType.SELECTION_COURS
@@ -0,0 +1,82 @@
+import os
+from typing import Dict, Optional
+
+from utils.logging_config import configure_logging
+
+logger = configure_logging("RecoveryPolicy")
+
+RECOVERY_RETRY = "retry"
+RECOVERY_RESUME = "resume"
+RECOVERY_RELAUNCH = "relaunch"
+RECOVERY_GIVE_UP = "give_up"
+
+# Escalation order: each consecutive failure starts one step further down
+RECOVERY_LADDER = (RECOVERY_RETRY, RECOVERY_RESUME, RECOVERY_RELAUNCH)
+
+
+class RecoveryPolicy:
+    """
+    What the StateManager does when a state raises, instead of ending the session:
+    retry the failed state, re-identify the screen and resume from there, or
+    relaunch Cheminot right away. Consecutive failures escalate down the
+    ladder, each action has a per-session budget, and every recovery waits an
+    exponential backoff first. Once every budget is spent the session gives up.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        if budgets is None:
+            budgets = {
+                RECOVERY_RETRY: int(os.getenv("RECOVERY_RETRIES", 2)),
+                RECOVERY_RESUME: int(os.getenv("RECOVERY_RESUMES", 3)),
+                RECOVERY_RELAUNCH: int(os.getenv("RECOVERY_RELAUNCHES", 1)),
+            }
+        if backoff_base is None:
+            backoff_base = float(os.getenv("RECOVERY_BACKOFF_SECONDS", 2))
+        if backoff_max is None:
+            backoff_max = float(os.getenv("RECOVERY_BACKOFF_MAX_SECONDS", 30))
+        self.budgets = budgets
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.used = {action: 0 for action in RECOVERY_LADDER}
+        # Failures since the last state that handled without raising
+        self.streak = 0
+
+    def record_success(self) -> None:
+        if self.streak:
+            logger.info(f"Recovered after {self.streak} consecutive state errors")
+        self.streak = 0
+
+    def record_failure(self) -> None:
+        self.streak += 1
+
+    def remaining(self, action: str) -> int:
+        return max(self.budgets.get(action, 0) - self.used[action], 0)
+
+    def next_action(self, after: Optional[str] = None) -> str:
+        """
+        First action with budget left, from the step the failure streak has
+        reached (or past `after`, an action that just could not help).
+        """
+        start = min(max(self.streak - 1, 0), len(RECOVERY_LADDER) - 1)
+        if after is not None:
+            start = max(start, RECOVERY_LADDER.index(after) + 1)
+        for action in RECOVERY_LADDER[start:]:
+            if self.remaining(action):
+                return action
+        return RECOVERY_GIVE_UP
+
+    def take(self, action: str) -> float:
+        """Spend one `action` from its budget; returns the backoff to wait first."""
+        self.used[action] += 1
+        return min(self.backoff_max, self.backoff_base * 2 ** max(self.streak - 1, 0))
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"{action} {self.used[action]}/{self.budgets.get(action, 0)}"
+            for action in RECOVERY_LADDER
+        )
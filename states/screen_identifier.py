@@ -0,0 +1,132 @@
+from typing import NamedTuple, Optional, Tuple
+
+from .state_types import StateType
+from commands.color_classifier import MIN_CONFIDENCE
+from commands.coords import classify_pixel
+from commands.frame_cache import frame_cache
+from utils.constants.button_coords import COLORS, TABS
+from utils.constants.texts import (
+    EXEMPTED_WINDOW_TITLES,
+    UNWANTED_WINDOW_TITLES,
+    WINDOW_TITLES,
+)
+from utils.logging_config import configure_logging
+from utils.window_registry import WindowSnapshot, window_registry
+
+logger = configure_logging("ScreenIdentifier")
+
+# Active tab of the main window -> state showing it, in flow order. The
+# inscription tab stays active under its SELECTION_COURS and HORAIRE sub-tabs.
+TAB_STATES = {
+    "CONSULTATION": StateType.CONSULTATION,
+    "INSCRIPTION_SESSION": StateType.INSCRIPTION,
+    "SELECTION_COURS": StateType.SELECTION_COURS,
+    "HORAIRE": StateType.HORAIRE,
+}
+
+# Same size limit as PopupDetector.detect_and_handle_active_popups
+POPUP_MAX_SIZE = (800, 600)
+
+
+class ScreenIdentification(NamedTuple):
+    """Which state the app is actually in, and what showed it."""
+
+    state: StateType
+    detail: str
+    popup: Optional[str] = None
+    confidence: float = 1.0
+
+
+def find_popup(snapshot: WindowSnapshot) -> Optional[str]:
+    """Title of a visible Cheminot popup (small window, not login/main), if any."""
+    normalized = window_registry.normalized
+    protected = [
+        normalized(t)
+        for t in WINDOW_TITLES["LOGIN_TITLE_BAR"]
+        + WINDOW_TITLES["MAIN_WINDOW"]
+        + EXEMPTED_WINDOW_TITLES
+    ]
+    popup_titles = [normalized(t) for t in UNWANTED_WINDOW_TITLES]
+
+    for hwnd, window in snapshot.windows.items():
+        title = snapshot.titles[hwnd]
+        norm = normalized(title)
+        if not norm or not window.visible:
+            continue
+        if any(p in norm for p in protected):
+            continue
+        if window.width >= POPUP_MAX_SIZE[0] or window.height >= POPUP_MAX_SIZE[1]:
+            continue
+        if any(p in norm for p in popup_titles):
+            return title
+    return None
+
+
+def login_window():
+    """The login window, if open: the LOGIN state's signature."""
+    return window_registry.find(WINDOW_TITLES["LOGIN_TITLE_BAR"])
+
+
+def tab_confidence(window, tab: str) -> float:
+    """
+    Confidence that `tab` of the main window shows its active colours, from
+    the cached frame; 0.0 below MIN_CONFIDENCE. The one tab check behind both
+    identify_screen() and the detect() of every tab state.
+    """
+    match = classify_pixel(TABS[tab], {tab: COLORS[tab]}, window=window)
+    if match.label is None or match.confidence < MIN_CONFIDENCE:
+        return 0.0
+    return match.confidence
+
+
+def is_tab_active(window, tab: str) -> bool:
+    """Whether `tab` of the main window is the active one."""
+    return tab_confidence(window, tab) > 0.0
+
+
+def active_tab(window) -> Tuple[Optional[str], float]:
+    """
+    The deepest main window tab showing its active colours, with the
+    classifier's confidence; (None, 0.0) if no tab does.
+    """
+    active: Tuple[Optional[str], float] = (None, 0.0)
+    for tab in TAB_STATES:
+        confidence = tab_confidence(window, tab)
+        if confidence:
+            active = (tab, confidence)
+    return active
+
+
+def identify_screen() -> ScreenIdentification:
+    """
+    Run every state's detection signature against one window enumeration
+    and one capture of the main window: popups, the login window title and
+    the active tab colours, with the same helpers as the states' detect().
+    INITIAL means Cheminot is not running (or shows nothing we know).
+    """
+    snapshot = window_registry.snapshot(refresh=True)
+    popup = find_popup(snapshot)
+
+    main = window_registry.find(WINDOW_TITLES["MAIN_WINDOW"])
+    if main is not None:
+        # A fresh look at the screen, not a frame from before the error
+        frame_cache.invalidate()
+        tab, confidence = active_tab(main)
+        if tab is not None:
+            result = ScreenIdentification(
+                TAB_STATES[tab], f"{tab} tab active", popup, confidence
+            )
+            logger.info(f"Screen identified as {result.state} ({result.detail})")
+            return result
+        logger.info("Main window open but no known tab is active")
+
+    if login_window() is not None:
+        result = ScreenIdentification(StateType.LOGIN, "login window open", popup)
+    elif main is not None:
+        result = ScreenIdentification(
+            StateType.INITIAL, "unknown main window", popup, 0.0
+        )
+    else:
+        result = ScreenIdentification(StateType.INITIAL, "Cheminot not running", popup)
+    logger.info(f"Screen identified as {result.state} ({result.detail})")
+    return result
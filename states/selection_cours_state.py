@@ -1,34 +1,39 @@
-import os
 import time
-import pygetwindow as gw
-import pytesseract
+from typing import Optional
 import pyautogui
+import pygetwindow as gw
 
 from .base import AppState
 from .state_types import StateType
-from utils.constants.button_coords import COLORS, COURSE_SELECTION_COORDS, TABS
-from utils.window_helpers import list_window_titles, wait_for_new_window
-from commands.coords import click, is_pixel_color_match
+from .course_tracker import COURSE_FULL, COURSE_NO_COORDS, CourseTracker
+from utils.constants.button_coords import COURSE_SELECTION_COORDS, TABS
+from utils.constants.texts import POPUP_UNKNOWN_RETURN_VALUE
+from utils.window_helpers import wait_for_new_window
+from utils.window_registry import window_registry
+from utils.metrics import metrics
+from utils.detection_latency import detection_timeline
+from commands.coords import click
+from commands.ocr import get_ocr_service
+from commands.popup_signatures import get_signature_store
 from commands.screenshot import screenshot
 
+# Signature store namespace and label for course selection popups
+SIGNATURE_NAMESPACE = "course_selection"
+POPUP_NOT_FULL = "not_full"
+
 
 class SelectionCoursState(AppState):
+    def __init__(self, tracker: Optional[CourseTracker] = None):
+        super().__init__()
+        self.tracker = tracker or CourseTracker()
+
     def detect(self) -> bool:
         """
         Detects if the current state is the Selection Cours state by checking:
         1. If the 'Le ChemiNot' window exists
         2. If the Selection Cours tab has the expected color indicating it's active
         """
-        window = self.ensure_window_focus(["Le ChemiNot"])
-        if not window:
-            return False
-
-        return is_pixel_color_match(
-            window=window,
-            coords=TABS["SELECTION_COURS"],
-            element_name="SELECTION_COURS_TAB",
-            expected_colors=COLORS["SELECTION_COURS"],
-        )
+        return self.detect_tab("SELECTION_COURS")
 
     def handle(self) -> StateType:
         self.logger.info("Handling course selection state")
@@ -41,22 +46,36 @@ class SelectionCoursState(AppState):
         click(TABS["SELECTION_COURS"])
         time.sleep(1)
 
-        course_code = os.getenv("TRACKING_COURSE_CODE", "GTI611")
-        if course_code:
-            course_code = course_code.upper()
-        else:
-            self.logger.error(
-                "TRACKING_COURSE_CODE environment variable not set, using default"
-            )
-            course_code = "GTI611"
-
-        # Coordinates of the course button
-        coords = COURSE_SELECTION_COORDS.get(course_code)
-        if not coords:
-            self.logger.error(f"No coordinates for course {course_code}, exiting.")
-            return StateType.EXIT
-
-        before = list_window_titles()
+        # Walk the remaining courses until one needs an availability check
+        while self.tracker.has_more():
+            course_code = self.tracker.current
+
+            # Coordinates of the course button
+            coords = COURSE_SELECTION_COORDS.get(course_code)
+            if not coords:
+                self.logger.error(f"No coordinates for course {course_code}, skipping.")
+                self.tracker.record(COURSE_NO_COORDS)
+                continue
+
+            self.logger.info(f"Selecting course {course_code}")
+            if self._is_course_full(coords, window):
+                self.logger.info(f"{course_code} is full")
+                detection_timeline.negative(course_code)
+                self.tracker.record(COURSE_FULL)
+                continue
+
+            # No blocking popup or course open -> advance to availability check
+            self.logger.info("No blocking popup; moving to availability check")
+            return StateType.HORAIRE
+
+        return self.finish_check_cycle(self.tracker)
+
+    def _is_course_full(self, coords, window) -> bool:
+        """
+        Click the course button and OCR the popup it opens, if any.
+        Returns True when the popup says the course is full.
+        """
+        before = window_registry.snapshot(refresh=True)
         click(coords)
 
         # Fix for window.title in ignore set
@@ -64,42 +83,49 @@ class SelectionCoursState(AppState):
         if window:
             ignore_set.add(window.title)
 
-        new_title = wait_for_new_window(before, timeout=1.5, ignore=ignore_set)
+        popup = wait_for_new_window(before, timeout=1.5, ignore=ignore_set)
+        if popup is None:
+            return False
 
-        if new_title:
-            self.logger.info(f"-> Detected popup: '{new_title}'")
-            popup = gw.getWindowsWithTitle(new_title)[0]
+        new_title = popup.title
+        self.logger.info(f"-> Detected popup: '{new_title}'")
+        try:
             popup.activate()
-            time.sleep(0.3)
+        except gw.PyGetWindowException:
+            self.logger.warning(f"Popup '{new_title}' disappeared before OCR")
+            return False
+        time.sleep(0.3)
+
+        bbox = (popup.left, popup.top, popup.width, popup.height)
+        img = screenshot(region=bbox)
 
-            # OCR the popup text
-            bbox = (popup.left, popup.top, popup.width, popup.height)
-            img = screenshot(region=bbox)
-            text = pytesseract.image_to_string(img).lower()
+        # Known dialogs are recognized from their signature, others are OCR'd
+        size = (popup.width, popup.height)
+        store = get_signature_store()
+        label = store.lookup(SIGNATURE_NAMESPACE, new_title, size, img)
+        if label is None:
+            text = get_ocr_service().image_to_string(img, lang="eng").lower()
             self.logger.debug(f"Popup text: {repr(text)}")
+            is_full = "complets" in text or "annulations" in text
+            if text.strip():
+                label = COURSE_FULL if is_full else POPUP_NOT_FULL
+                store.remember(SIGNATURE_NAMESPACE, new_title, size, img, label)
+        else:
+            self.logger.debug(f"Popup recognized from its signature: {label}")
 
-            try:
-                popup.close()
-                self.logger.info("-> Closed popup window cleanly")
-            except Exception:
-                pyautogui.hotkey("alt", "f4")
-                self.logger.info("-> Closed popup window with Alt+F4")
-
-            # If course is full, exit to restart the session
-            if "complets" in text or "annulations" in text:
-                retry_wait_min = float(os.getenv("RETRY_WAIT_MINUTES", 15))
-
-                self.logger.info(
-                    f"Course full, exiting session. Cheminot will restart in {retry_wait_min}m (next at {time.strftime('%H:%M:%S', time.localtime(time.time() + retry_wait_min * 60))})"
-                )
-                return StateType.EXIT
-            else:
-                self.logger.warning(
-                    "Popup was not a 'course full' message, proceeding. Taking screenshot `unknown_popup_debug` for debugging."
-                )
-
-                self.take_screenshot("unknown_popup_debug")
-
-        # No blocking popup or course open -> advance to availability check
-        self.logger.info("No blocking popup; moving to availability check")
-        return StateType.HORAIRE
+        metrics.inc("popups_total", type=label or POPUP_UNKNOWN_RETURN_VALUE)
+        try:
+            popup.close()
+            self.logger.info("-> Closed popup window cleanly")
+        except Exception:
+            pyautogui.hotkey("alt", "f4")
+            self.logger.info("-> Closed popup window with Alt+F4")
+
+        if label == COURSE_FULL:
+            return True
+
+        self.logger.warning(
+            "Popup was not a 'course full' message, proceeding. Dumping recent captures for debugging."
+        )
+        self.take_error_screenshot("unknown_popup")
+        return False
@@ -10,6 +10,7 @@ class StateType(Enum):
     INSCRIPTION = "INSCRIPTION"
     SELECTION_COURS = "SELECTION_COURS"
     HORAIRE = "HORAIRE"
+    POLL_WAIT = "POLL_WAIT"
     EXIT = "EXIT"
 
     def __str__(self) -> str:
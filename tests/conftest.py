@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+import pytest
+
+from simulator import backends
+from simulator.desktop import SimulatedDesktop
+
+# The app modules bind the Windows fakes at import time, so the whole session
+# shares one simulated desktop, reset before every test
+_desktop = SimulatedDesktop(launch_delay=0.0, login_delay=0.0)
+
+
+def pytest_sessionstart(session):
+    # Logs, screenshots and state files land in the working directory
+    os.chdir(tempfile.mkdtemp(prefix="cheminotify-tests-"))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["DISCORD_WEBHOOK_URL"] = ""
+    backends.install(_desktop)
+
+
+@pytest.fixture
+def desktop() -> SimulatedDesktop:
+    from commands.frame_cache import frame_cache
+    from commands.window_transform import window_transforms
+    from utils.window_registry import window_registry
+
+    with _desktop.lock:
+        _desktop.windows.clear()
+        _desktop.active = None
+        _desktop.courses = {}
+        _desktop.scale = 1.0
+        _desktop.active_tab = "CONSULTATION"
+        _desktop.selected_course = None
+    frame_cache.invalidate()
+    window_transforms.invalidate()
+    window_registry.invalidate()
+    return _desktop
+
+
+@pytest.fixture
+def main_window(desktop):
+    """Open the simulated main window on a tab; returns its pygetwindow window."""
+    from commands.frame_cache import frame_cache
+    from utils.constants.texts import WINDOW_TITLES
+    from utils.window_registry import window_registry
+
+    def _open(tab: str = "CONSULTATION", course=None):
+        desktop._show_main()
+        with desktop.lock:
+            desktop.active_tab = tab
+            desktop.selected_course = course
+        frame_cache.invalidate()
+        window_registry.invalidate()
+        return window_registry.find(WINDOW_TITLES["MAIN_WINDOW"])
+
+    return _open
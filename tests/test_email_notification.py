@@ -0,0 +1,149 @@
+import socket
+import socketserver
+import threading
+from email import message_from_bytes
+
+import pytest
+
+from notifications.email import EmailNotification
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: no auth, no TLS, one message per DATA."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server = self.server
+        server.connections += 1
+        server.sockets.append(self.connection)
+        self.reply("220 localhost ESMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode().strip().split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "NOOP":
+                server.noops += 1
+                self.reply("250 OK")
+            elif verb == "MAIL":
+                if server.drop_on_mail:
+                    # Alive for NOOP, gone by the time the message is sent
+                    server.drop_on_mail -= 1
+                    return
+                self.reply("550 Sender rejected" if server.reject else "250 OK")
+            elif verb == "RCPT":
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    data += chunk
+                server.messages.append(message_from_bytes(data[:-3]))
+                self.reply("250 OK queued")
+            elif verb == "RSET":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.connections = 0
+        self.noops = 0
+        self.drop_on_mail = 0
+        self.reject = False
+        self.messages = []
+        self.sockets = []
+
+    def drop_connections(self) -> None:
+        """Hang up on every client, like a server timing out idle sessions."""
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+@pytest.fixture
+def smtp_server():
+    server = _SMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def channel(smtp_server, monkeypatch):
+    monkeypatch.setenv("SMTP_STARTTLS", "0")
+    monkeypatch.setenv("SMTP_TIMEOUT_SECONDS", "2")
+    channel = EmailNotification(
+        host="127.0.0.1",
+        port=smtp_server.server_address[1],
+        sender="cheminotify@example.com",
+        recipients=["student@example.com"],
+    )
+    yield channel
+    channel.close()
+
+
+def test_sends_and_keeps_the_connection_open(channel, smtp_server):
+    assert channel.send("MAT145 available", "Group 02 has a seat")
+    assert channel.send("LOG100 available", "Group 01 has a seat")
+
+    assert [m["Subject"] for m in smtp_server.messages] == [
+        "MAT145 available",
+        "LOG100 available",
+    ]
+    assert smtp_server.messages[0]["To"] == "student@example.com"
+    # The second message went over the first connection, checked with NOOP
+    assert smtp_server.connections == 1
+    assert smtp_server.noops == 1
+
+
+def test_reconnects_after_the_server_dropped_the_connection(channel, smtp_server):
+    assert channel.send("first", "body")
+    smtp_server.drop_connections()
+
+    assert channel.send("second", "body")
+    assert [m["Subject"] for m in smtp_server.messages] == ["first", "second"]
+    assert smtp_server.connections == 2
+
+
+def test_retries_once_when_the_connection_dies_mid_send(channel, smtp_server):
+    assert channel.send("first", "body")
+    smtp_server.drop_on_mail = 1
+
+    assert channel.send("second", "body")
+    assert [m["Subject"] for m in smtp_server.messages] == ["first", "second"]
+    assert smtp_server.connections == 2
+
+
+def test_rejected_message_fails_without_retry(channel, smtp_server):
+    smtp_server.reject = True
+
+    assert not channel.send("rejected", "body")
+    assert smtp_server.messages == []
+    assert smtp_server.connections == 1
+
+
+def test_fails_when_the_server_is_gone(channel, smtp_server):
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    smtp_server.drop_connections()
+
+    assert not channel.send("lost", "body")
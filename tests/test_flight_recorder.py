@@ -0,0 +1,80 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from utils import screenshot_writer
+from utils.flight_recorder import FlightRecorder
+
+
+class _StalledWriter:
+    """Screenshot writer whose queue holds `size` captures and never drains."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.queued = []
+        self.dropped = []
+
+    def submit(self, img, base_name, directory="", timestamp=True, **kwargs):
+        future: Future = Future()
+        if len(self.queued) < self.size:
+            self.queued.append(base_name)
+        else:
+            self.dropped.append(base_name)
+            future.set_result(None)
+        return future
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = _StalledWriter(size=16)
+    monkeypatch.setattr(screenshot_writer, "_writer", writer)
+    return writer
+
+
+def _recorder(frames: int, **kwargs) -> FlightRecorder:
+    recorder = FlightRecorder(capacity=20, cooldown=0, directory="dumps", **kwargs)
+    for i in range(frames):
+        recorder.state = f"S{i}"
+        recorder.record_frame(np.full((4, 4, 3), i, dtype=np.uint8))
+    return recorder
+
+
+def _frames(names):
+    return sorted(name.split("_")[-2] for name in names)
+
+
+def test_info_mode_dumps_only_the_last_frames(writer, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    recorder = _recorder(5, info_frames=2)
+
+    futures = recorder.dump("COURSE_GROUP_color_mismatch")
+
+    assert len(futures) == 2
+    assert _frames(writer.queued) == ["S3", "S4"]
+    assert recorder.size == 0
+
+
+def test_debug_mode_dumps_the_whole_buffer(writer, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    recorder = _recorder(5, info_frames=2)
+
+    recorder.dump("HORAIRE_ValueError")
+
+    assert _frames(writer.queued) == ["S0", "S1", "S2", "S3", "S4"]
+
+
+def test_full_writer_queue_drops_the_oldest_frames_without_blocking(
+    writer, monkeypatch
+):
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    writer.size = 2
+    recorder = _recorder(5)
+
+    futures = recorder.dump("HORAIRE_ValueError")
+
+    assert len(futures) == 5
+    assert _frames(writer.queued) == ["S3", "S4"]
+    assert _frames(writer.dropped) == ["S0", "S1", "S2"]
+    # Futures stay in capture order, dropped ones already resolved to None
+    assert [f.done() for f in futures] == [True, True, True, False, False]
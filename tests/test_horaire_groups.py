@@ -0,0 +1,85 @@
+import numpy as np
+
+from commands.horaire_groups import (
+    GROUP_AVAILABLE,
+    GROUP_UNAVAILABLE,
+    GROUP_UNKNOWN,
+    find_group_rows,
+    read_groups,
+)
+from simulator.desktop import SimCourse
+from utils.constants.button_coords import COLORS
+
+BLACK = COLORS["COURSE_AVAILABLE"][0]
+GRAY = COLORS["COURSE_UNAVAILABLE"][0]
+BACKGROUND = (212, 208, 200)
+
+
+def _strip(rows, width=3):
+    """Column strip from (height, colour) runs, top to bottom."""
+    return np.concatenate(
+        [np.full((height, width, 3), color, dtype=np.uint8) for height, color in rows]
+    )
+
+
+def test_rows_split_on_gaps_and_colour_changes():
+    strip = _strip(
+        [(5, GRAY), (4, BACKGROUND), (6, BLACK), (6, GRAY), (30, BACKGROUND)]
+    )
+    assert find_group_rows(strip, min_height=3, max_gap=10) == [
+        (0, 5, GROUP_UNAVAILABLE),
+        (9, 15, GROUP_AVAILABLE),
+        (15, 21, GROUP_UNAVAILABLE),
+    ]
+
+
+def test_noisy_pixel_keeps_the_row():
+    strip = _strip([(6, BLACK), (4, BACKGROUND)])
+    strip[2, 0] = (90, 140, 60)
+    assert find_group_rows(strip, min_height=3, max_gap=10) == [(0, 6, GROUP_AVAILABLE)]
+
+
+def test_thin_runs_and_rows_past_a_long_gap_are_ignored():
+    strip = _strip(
+        [(5, GRAY), (4, BACKGROUND), (1, BLACK), (20, BACKGROUND), (5, BLACK)]
+    )
+    assert find_group_rows(strip, min_height=3, max_gap=10) == [
+        (0, 5, GROUP_UNAVAILABLE)
+    ]
+
+
+def test_no_group_colour_at_the_first_group():
+    strip = _strip([(6, BACKGROUND), (5, BLACK)])
+    assert find_group_rows(strip, min_height=3, max_gap=10) == []
+
+
+def test_reads_every_group_row_from_the_simulated_horaire(main_window, desktop):
+    desktop.courses = {"LOG100": SimCourse(groups=[False, True, False])}
+    window = main_window("HORAIRE", "LOG100")
+
+    groups = read_groups(window)
+
+    assert [(g.group, g.status) for g in groups] == [
+        ("01", GROUP_UNAVAILABLE),
+        ("02", GROUP_AVAILABLE),
+        ("03", GROUP_UNAVAILABLE),
+    ]
+    assert groups[1].color == BLACK
+
+
+def test_reads_group_rows_of_a_scaled_window(main_window, desktop):
+    desktop.scale = 1.25
+    desktop.courses = {"LOG100": SimCourse(groups=[False, False, False, True])}
+    window = main_window("HORAIRE", "LOG100")
+
+    statuses = [g.status for g in read_groups(window)]
+
+    assert statuses == [GROUP_UNAVAILABLE] * 3 + [GROUP_AVAILABLE]
+
+
+def test_first_group_unknown_without_a_group_colour(main_window, desktop):
+    window = main_window("HORAIRE")
+
+    groups = read_groups(window)
+
+    assert [g.status for g in groups] == [GROUP_UNKNOWN]
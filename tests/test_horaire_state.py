@@ -0,0 +1,27 @@
+import threading
+import time
+
+from commands.horaire_groups import GROUP_AVAILABLE, GROUP_UNAVAILABLE, GROUP_UNKNOWN
+from simulator.desktop import SimCourse
+from states.horaire_state import GROUP_DRAW_TIMEOUT, HoraireState
+
+
+def test_reads_groups_as_soon_as_the_first_row_is_drawn(main_window, desktop):
+    desktop.courses = {"LOG100": SimCourse(groups=[False, True])}
+    window = main_window("HORAIRE")
+    # The horaire panel fills in a moment after the course click
+    threading.Timer(0.2, setattr, (desktop, "selected_course", "LOG100")).start()
+
+    started = time.monotonic()
+    groups = HoraireState()._read_groups(window)
+
+    assert [g.status for g in groups] == [GROUP_UNAVAILABLE, GROUP_AVAILABLE]
+    assert time.monotonic() - started < GROUP_DRAW_TIMEOUT
+
+
+def test_gives_up_on_a_panel_that_is_never_drawn(main_window):
+    window = main_window("HORAIRE")
+
+    groups = HoraireState()._read_groups(window)
+
+    assert [g.status for g in groups] == [GROUP_UNKNOWN]
@@ -0,0 +1,90 @@
+import http.client
+import http.server
+import threading
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+
+from notifications.http_session import WebhookRetry, _build_session, may_have_posted
+
+
+def _stale_error():
+    return ProtocolError(
+        "Connection aborted.",
+        http.client.RemoteDisconnected("Remote end closed connection without response"),
+    )
+
+
+def _retry():
+    return WebhookRetry(total=3, read=0, other=0, allowed_methods={"POST"})
+
+
+def test_stale_connection_retried_once():
+    retry = _retry().increment(method="POST", url="/", error=_stale_error())
+    assert retry.total == 2
+
+    with pytest.raises(MaxRetryError):
+        retry.increment(method="POST", url="/", error=_stale_error())
+
+
+def test_read_timeout_never_retried():
+    error = ReadTimeoutError(None, "/", "Read timed out.")
+    with pytest.raises(MaxRetryError):
+        _retry().increment(method="POST", url="/", error=error)
+
+
+class _WebhookHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 204; `drop_next` requests close the kept-alive connection unanswered."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server.posts += 1
+        if server.drop_next:
+            server.drop_next -= 1
+            self.close_connection = True
+            return
+        if server.delay:
+            server.release.wait(server.delay)
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    monkeypatch.setenv("NOTIFICATION_RETRY_BACKOFF_SECONDS", "0")
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _WebhookHandler)
+    server.posts, server.drop_next, server.delay = 0, 0, 0.0
+    server.release = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/"
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_dropped_keep_alive_connection_is_resent(webhook):
+    server, url = webhook
+    session = _build_session()
+    assert session.post(url, data=b"first", timeout=2).status_code == 204
+
+    # Stands in for a pooled connection the server had already closed
+    server.drop_next = 1
+    assert session.post(url, data=b"second", timeout=2).status_code == 204
+    assert server.posts == 3
+
+
+def test_slow_answer_is_posted_once(webhook):
+    server, url = webhook
+    server.delay = 2.0
+    with pytest.raises(requests.exceptions.ConnectionError) as error:
+        _build_session().post(url, data=b"slow", timeout=(2, 0.2))
+    assert server.posts == 1
+    assert may_have_posted(error.value)
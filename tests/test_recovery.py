@@ -0,0 +1,89 @@
+from states.recovery import (
+    RECOVERY_GIVE_UP,
+    RECOVERY_RELAUNCH,
+    RECOVERY_RESUME,
+    RECOVERY_RETRY,
+    RecoveryPolicy,
+)
+
+
+def _policy(retries=2, resumes=3, relaunches=1, base=2.0, cap=30.0):
+    return RecoveryPolicy(
+        budgets={
+            RECOVERY_RETRY: retries,
+            RECOVERY_RESUME: resumes,
+            RECOVERY_RELAUNCH: relaunches,
+        },
+        backoff_base=base,
+        backoff_max=cap,
+    )
+
+
+def _fail(policy, times=1):
+    for _ in range(times):
+        policy.record_failure()
+
+
+def test_streak_escalates_down_the_ladder():
+    policy = _policy()
+
+    _fail(policy)
+    assert policy.next_action() == RECOVERY_RETRY
+    _fail(policy)
+    assert policy.next_action() == RECOVERY_RESUME
+    _fail(policy)
+    assert policy.next_action() == RECOVERY_RELAUNCH
+    _fail(policy)
+    assert policy.next_action() == RECOVERY_RELAUNCH
+
+    policy.record_success()
+    _fail(policy)
+    assert policy.next_action() == RECOVERY_RETRY
+
+
+def test_spent_action_is_skipped():
+    policy = _policy(retries=1)
+    _fail(policy)
+    policy.take(RECOVERY_RETRY)
+
+    _fail(policy)
+    policy.record_success()
+    _fail(policy)
+    assert policy.remaining(RECOVERY_RETRY) == 0
+    assert policy.next_action() == RECOVERY_RESUME
+
+
+def test_after_moves_past_an_action_that_did_not_help():
+    policy = _policy()
+    _fail(policy)
+
+    assert policy.next_action(after=RECOVERY_RETRY) == RECOVERY_RESUME
+    assert policy.next_action(after=RECOVERY_RESUME) == RECOVERY_RELAUNCH
+    assert policy.next_action(after=RECOVERY_RELAUNCH) == RECOVERY_GIVE_UP
+
+
+def test_gives_up_once_every_budget_is_spent():
+    policy = _policy(retries=1, resumes=1, relaunches=1)
+
+    actions = []
+    while True:
+        _fail(policy)
+        action = policy.next_action()
+        if action == RECOVERY_GIVE_UP:
+            break
+        policy.take(action)
+        actions.append(action)
+
+    assert actions == [RECOVERY_RETRY, RECOVERY_RESUME, RECOVERY_RELAUNCH]
+    assert "relaunch 1/1" in policy.describe()
+
+
+def test_backoff_doubles_up_to_the_cap():
+    policy = _policy(retries=10, resumes=10, relaunches=10, base=2.0, cap=10.0)
+
+    waits = []
+    for _ in range(5):
+        _fail(policy)
+        waits.append(policy.take(policy.next_action()))
+
+    assert waits == [2.0, 4.0, 8.0, 10.0, 10.0]
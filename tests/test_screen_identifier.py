@@ -0,0 +1,48 @@
+import pytest
+
+from states.factory import create_states
+from states.screen_identifier import TAB_STATES, identify_screen
+from states.state_types import StateType
+
+
+def test_horaire_tab_with_a_popup(main_window, desktop):
+    main_window("HORAIRE", "LOG100")
+    desktop._open_popup("Attention", "Ce cours est complet")
+
+    result = identify_screen()
+
+    assert result.state == StateType.HORAIRE
+    assert result.popup == "Attention"
+
+
+# The inscription tab stays active under its two sub-tabs
+ACTIVE_STATES = {
+    "CONSULTATION": {StateType.CONSULTATION},
+    "INSCRIPTION_SESSION": {StateType.INSCRIPTION},
+    "SELECTION_COURS": {StateType.INSCRIPTION, StateType.SELECTION_COURS},
+    "HORAIRE": {StateType.INSCRIPTION, StateType.HORAIRE},
+}
+
+
+@pytest.mark.parametrize("tab", list(TAB_STATES))
+def test_detect_agrees_with_identify_screen(main_window, tab):
+    main_window(tab)
+    states = create_states()
+
+    assert identify_screen().state == TAB_STATES[tab]
+    detected = {state for state in TAB_STATES.values() if states[state].detect()}
+    assert detected == ACTIVE_STATES[tab]
+
+
+def test_login_window(desktop):
+    desktop._show_login()
+
+    assert identify_screen().state == StateType.LOGIN
+    assert create_states()[StateType.LOGIN].detect()
+
+
+def test_cheminot_not_running(desktop):
+    result = identify_screen()
+
+    assert result.state == StateType.INITIAL
+    assert result.popup is None
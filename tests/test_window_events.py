@@ -0,0 +1,67 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from utils import window_events
+from utils.window_events import (
+    FakeWindowEventSource,
+    PollingWindowEventSource,
+    WinEventHookSource,
+    get_window_event_source,
+    set_window_event_source,
+)
+from utils.window_helpers import EVENT_RECHECK_SECONDS, wait_for_new_window
+from utils.window_registry import window_registry
+
+
+@pytest.fixture
+def shared_source():
+    """Restore the simulator's event source after a test swaps it."""
+    original = get_window_event_source()
+    yield
+    set_window_event_source(original)
+
+
+def test_fake_source_wakes_a_waiter_on_emit():
+    source = FakeWindowEventSource()
+    seq = source.seq
+    threading.Timer(0.05, source.emit, (0x1234,)).start()
+
+    assert source.wait(seq, timeout=2.0)
+    assert source.events[-1][:2] == (seq + 1, 0x1234)
+
+
+def test_fake_source_times_out_without_events():
+    source = FakeWindowEventSource()
+
+    assert not source.wait(source.seq, timeout=0.05)
+
+
+def test_new_window_is_seen_on_its_event_not_the_recheck(desktop, shared_source):
+    source = FakeWindowEventSource()
+    set_window_event_source(source)
+    before = window_registry.snapshot(refresh=True)
+
+    def _open():
+        popup = desktop._open_popup("ChemiNot", "Cours complet")
+        source.emit(popup.hwnd)
+
+    threading.Timer(0.05, _open).start()
+    started = time.monotonic()
+    popup = wait_for_new_window(before, timeout=2.0)
+
+    assert popup is not None
+    assert time.monotonic() - started < EVENT_RECHECK_SECONDS
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a failing hook")
+def test_falls_back_to_polling_when_the_hooks_fail(monkeypatch, shared_source):
+    monkeypatch.setattr(window_events, "_create_source", WinEventHookSource)
+    set_window_event_source(None)
+
+    source = get_window_event_source()
+
+    assert isinstance(source, PollingWindowEventSource)
+    assert not source.event_driven
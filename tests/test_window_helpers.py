@@ -0,0 +1,32 @@
+import threading
+
+from utils.window_helpers import wait_for_new_window
+from utils.window_registry import window_registry
+
+
+def test_returns_the_new_window_not_an_older_one_with_its_title(desktop):
+    leftover = desktop._open_popup("Avertissement", "Ancien avertissement")
+    before = window_registry.snapshot(refresh=True)
+    opened = []
+    threading.Timer(
+        0.1, lambda: opened.append(desktop._open_popup("Avertissement", "Nouveau"))
+    ).start()
+
+    popup = wait_for_new_window(before, timeout=2.0)
+
+    assert popup is not None
+    assert popup._hWnd == opened[0].hwnd != leftover.hwnd
+    assert popup.title == "Avertissement"
+
+
+def test_none_when_no_window_appears(desktop):
+    before = window_registry.snapshot(refresh=True)
+
+    assert wait_for_new_window(before, timeout=0.2) is None
+
+
+def test_ignored_titles_are_skipped(desktop):
+    before = window_registry.snapshot(refresh=True)
+    desktop._open_popup("CONSULTATION", "")
+
+    assert wait_for_new_window(before, timeout=0.2, ignore={"CONSULTATION"}) is None
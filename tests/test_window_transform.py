@@ -0,0 +1,23 @@
+from commands.window_transform import window_transforms
+
+
+def test_moved_window_is_measured_again_at_once(main_window, desktop):
+    window = main_window()
+    before = window_transforms.get(window)
+    measures = window_transforms.measures
+
+    with desktop.lock:
+        desktop.find_kind("main").client_origin = (300, 120)
+    after = window_transforms.get(window)
+
+    assert tuple(before.origin) == (460, 80)
+    assert tuple(after.origin) == (300, 120)
+    assert tuple(after.point_to_screen((100, 50))) == (400, 170)
+    assert window_transforms.measures == measures + 1
+
+
+def test_unmoved_window_keeps_its_transform(main_window):
+    window = main_window()
+    first = window_transforms.get(window)
+
+    assert window_transforms.get(window) is first
@@ -129,6 +129,18 @@ AM_Y = 209
 PM_Y = 292
 EV_Y = 367
 
+# Group rows of the horaire panel, stacked under FIRST_GROUP_COURSE_BLACK_PIXEL.
+# The column is scanned from there down to the calendar grid (AM_Y) and each run
+# of one group colour is a row, so the rows are found in the capture itself.
+# Half-width (physical px) of the column band whose majority colour classifies
+# each pixel row
+HORAIRE_GROUP_BAND_RADIUS = 1
+# Shortest run (logical px) counted as a group row: thinner ones are lines or glyphs
+HORAIRE_GROUP_MIN_ROW_HEIGHT = 3
+# Longest gap (logical px) between two group rows; the scan ends past it
+HORAIRE_GROUP_MAX_GAP = 24
+HORAIRE_MAX_GROUPS = 10
+
 HORAIRE_STATE_COORDS = {
     "FIRST_GROUP_COURSE_BLACK_PIXEL": (348, 67),
     "MONDAY_AM": (MONDAY_X, AM_Y),
@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, Optional
+
+from utils.file_utils import append_line
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+
+logger = configure_logging("DetectionLatency")
+
+
+def _clock(ts: Optional[float]) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(ts)) if ts else "never"
+
+
+class Detection:
+    """
+    Timestamps of one positive detection, from the frame in which the seat was
+    seen to the webhook answering 2xx. Stages are filled in as they happen,
+    possibly from another thread, and the record is reported once delivered.
+    """
+
+    def __init__(
+        self,
+        timeline: "DetectionTimeline",
+        course_code: str,
+        captured_at: float,
+        last_negative_at: Optional[float],
+        first_positive: bool,
+    ):
+        self.timeline = timeline
+        self.course_code = course_code
+        self.captured_at = captured_at
+        self.last_negative_at = last_negative_at
+        self.first_positive = first_positive
+        self.enqueued_at: Optional[float] = None
+        self.delivered_at: Optional[float] = None
+        self.failed = False
+
+    @property
+    def opening_window(self) -> Optional[float]:
+        """The seat opened at most this long before it was seen."""
+        if not self.first_positive or self.last_negative_at is None:
+            return None
+        return self.captured_at - self.last_negative_at
+
+    def enqueued(self, at: Optional[float] = None) -> None:
+        self.enqueued_at = at or time.time()
+
+    def delivered(self, at: Optional[float] = None) -> None:
+        """Webhook answered 2xx: the notification reached the channel."""
+        self.delivered_at = at or time.time()
+        self.timeline.finish(self)
+
+    def failed_delivery(self) -> None:
+        self.failed = True
+        self.timeline.finish(self)
+
+    def to_dict(self) -> dict:
+        def since_capture(ts):
+            return round(ts - self.captured_at, 3) if ts else None
+
+        opening = self.opening_window
+        return {
+            "course": self.course_code,
+            "last_negative_at": self.last_negative_at,
+            "captured_at": self.captured_at,
+            "enqueued_at": self.enqueued_at,
+            "delivered_at": self.delivered_at,
+            "first_positive": self.first_positive,
+            "opening_window_s": round(opening, 3) if opening is not None else None,
+            "capture_to_enqueue_s": since_capture(self.enqueued_at),
+            "capture_to_delivery_s": since_capture(self.delivered_at),
+            "failed": self.failed,
+        }
+
+
+class DetectionTimeline:
+    """
+    Per-course record of when each course was last confirmed unavailable and
+    of every positive detection. For each detection it reports two numbers:
+    - opening window: last negative -> frame with the seat (polling cost)
+    - delivery: frame with the seat -> webhook 2xx (notification cost)
+    Lives for the whole process, so negatives carry over between sessions.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("DETECTIONS_FILE", "logs/detections.jsonl")
+        self._lock = threading.Lock()
+        self.last_negative: Dict[str, float] = {}
+        self._positive_since_negative: Dict[str, bool] = {}
+        self.last_detection: Dict[str, Detection] = {}
+
+    def negative(self, course_code: str, at: Optional[float] = None) -> None:
+        """The course was just confirmed unavailable (or full)."""
+        with self._lock:
+            self.last_negative[course_code] = at or time.time()
+            self._positive_since_negative[course_code] = False
+
+    def positive(
+        self, course_code: str, captured_at: Optional[float] = None
+    ) -> Detection:
+        """The course was seen available in a frame captured at `captured_at`."""
+        with self._lock:
+            first = not self._positive_since_negative.get(course_code, False)
+            self._positive_since_negative[course_code] = True
+            detection = Detection(
+                self,
+                course_code,
+                captured_at or time.time(),
+                self.last_negative.get(course_code),
+                first,
+            )
+            self.last_detection[course_code] = detection
+        return detection
+
+    def finish(self, detection: Detection) -> None:
+        """Report a detection once its notification was delivered (or failed)."""
+        record = detection.to_dict()
+        course = detection.course_code
+
+        if record["opening_window_s"] is not None:
+            metrics.observe(
+                "detection_opening_window_seconds",
+                record["opening_window_s"],
+                course=course,
+            )
+        if record["capture_to_enqueue_s"] is not None:
+            metrics.observe(
+                "detection_enqueue_seconds",
+                record["capture_to_enqueue_s"],
+                course=course,
+            )
+        if record["capture_to_delivery_s"] is not None:
+            metrics.observe(
+                "detection_delivery_seconds",
+                record["capture_to_delivery_s"],
+                course=course,
+            )
+
+        opening = (
+            f"opened within {record['opening_window_s']:.1f}s"
+            if record["opening_window_s"] is not None
+            else "opening not bounded"
+        )
+        delivery = (
+            f"{record['capture_to_delivery_s']:.2f}s"
+            if record["capture_to_delivery_s"] is not None
+            else "not delivered"
+        )
+        logger.info(
+            f"{course} detection: {opening} (last negative {_clock(detection.last_negative_at)}, "
+            f"seen {_clock(detection.captured_at)}), capture -> webhook {delivery}"
+        )
+
+        try:
+            append_line(self.path, json.dumps(record))
+        except Exception as e:
+            logger.warning(f"Could not write detection record: {e}")
+
+
+# Shared by the states for the whole process
+detection_timeline = DetectionTimeline()
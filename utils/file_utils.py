@@ -1,12 +1,70 @@
 import os
+import gzip
 import time
-import glob
+import shutil
 import datetime
-from typing import Optional, List
+import threading
+from typing import Optional
 from utils.logging_config import configure_logging
 
 logger = configure_logging(__name__)
 
+_append_lock = threading.Lock()
+
+
+def build_filepath(
+    base_name: str,
+    directory: str = "logs/screenshots",
+    extension: str = "png",
+    timestamp: bool = True,
+    suffix: Optional[str] = None,
+) -> str:
+    """
+    Path save_file() would write to: `<directory>/<timestamp>_<base_name>_<suffix>.<extension>`.
+    """
+    name_parts = [base_name]
+    if suffix:
+        name_parts.append(suffix)
+
+    # Add timestamp if requested
+    if timestamp:
+        timestamp_str = time.strftime("%Y%m%d-%H%M%S")
+        filename = f"{timestamp_str}_{'_'.join(name_parts)}.{extension}"
+    else:
+        filename = f"{'_'.join(name_parts)}.{extension}"
+
+    return os.path.join(directory, filename)
+
+
+def rotate_gzip(path: str, backups: int) -> None:
+    """
+    Roll `path` over to `path`.1.gz, shifting older archives up to `backups`,
+    the same naming as the rotating log handlers. Retention prunes the .gz files.
+    """
+    for i in range(backups - 1, 0, -1):
+        older = f"{path}.{i}.gz"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}.gz")
+    if backups > 0:
+        with open(path, "rb") as src, gzip.open(f"{path}.1.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+def append_line(path: str, line: str) -> None:
+    """
+    Append one line to an append-only log such as metrics.jsonl, rotating it
+    first once it passes JSONL_ROTATE_MB (keeping JSONL_BACKUPS archives).
+    """
+    max_bytes = int(float(os.getenv("JSONL_ROTATE_MB", 10)) * 1024 * 1024)
+    backups = int(os.getenv("JSONL_BACKUPS", 3))
+    with _append_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            rotate_gzip(path, backups)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
 
 def save_file(
     file_data,
@@ -35,19 +93,7 @@ def save_file(
         # Create directory if it doesn't exist
         os.makedirs(directory, exist_ok=True)
 
-        # Build filename
-        name_parts = [base_name]
-        if suffix:
-            name_parts.append(suffix)
-
-        # Add timestamp if requested
-        if timestamp:
-            timestamp_str = time.strftime("%Y%m%d-%H%M%S")
-            filename = f"{timestamp_str}_{'_'.join(name_parts)}.{extension}"
-        else:
-            filename = f"{'_'.join(name_parts)}.{extension}"
-
-        filepath = os.path.join(directory, filename)
+        filepath = build_filepath(base_name, directory, extension, timestamp, suffix)
 
         if hasattr(file_data, "save"):  # For PIL Image objects
             file_data.save(filepath)
@@ -68,52 +114,3 @@ def save_file(
         if filepath:
             logger.error(f"Error occurred while saving to: {filepath}")
         return None
-
-
-def cleanup_old_screenshots(
-    days: int = 7, directories: Optional[List[str]] = None
-) -> int:
-    """
-    Delete screenshot files older than the specified number of days.
-
-    Args:
-        days: Number of days to keep files (older files will be deleted)
-        directories: List of directories to clean (defaults to all screenshot directories)
-
-    Returns:
-        Number of files deleted
-    """
-    if directories is None:
-        directories = [
-            "logs/screenshots",
-            "logs/ocr_screenshots",
-            "logs/pixel_screenshots",
-        ]
-
-    current_time = time.time()
-    max_age = days * 24 * 60 * 60  # Convert days to seconds
-    deleted_count = 0
-
-    logger.info(f"Cleaning up screenshots older than {days} days...")
-
-    for directory in directories:
-        if not os.path.exists(directory):
-            logger.debug(f"Directory doesn't exist, skipping: {directory}")
-            continue
-
-        # Get all PNG files in the directory
-        pattern = os.path.join(directory, "*.png")
-        files = glob.glob(pattern)
-
-        for file_path in files:
-            file_age = current_time - os.path.getmtime(file_path)
-            if file_age > max_age:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                    logger.debug(f"Deleted old screenshot: {file_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete {file_path}: {str(e)}")
-
-    logger.info(f"Cleanup completed: {deleted_count} files deleted")
-    return deleted_count
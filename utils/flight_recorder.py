@@ -0,0 +1,193 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+
+logger = configure_logging("FlightRecorder")
+
+
+class Capture:
+    """One frame kept in memory, with the state it was taken in."""
+
+    def __init__(
+        self,
+        image: Union[Image.Image, np.ndarray],
+        state: str,
+        label: str,
+        captured_at: Optional[float] = None,
+    ):
+        self.image = image
+        self.state = state
+        self.label = label
+        self.captured_at = captured_at or time.time()
+        self._saved: Optional[Future] = None
+
+    @property
+    def nbytes(self) -> int:
+        if isinstance(self.image, np.ndarray):
+            return self.image.nbytes
+        w, h = self.image.size
+        return w * h * len(self.image.getbands())
+
+    @property
+    def name(self) -> str:
+        return f"{self.state}_{self.label}" if self.label else self.state
+
+    def to_image(self) -> Image.Image:
+        if isinstance(self.image, np.ndarray):
+            return Image.fromarray(self.image)
+        return self.image
+
+    def save(
+        self, directory: str = "logs/screenshots", prefix: Optional[str] = None
+    ) -> "Future[Optional[str]]":
+        """
+        Write the capture in the background (once) and return the path's Future.
+        With a `prefix` the file is named after the capture time, for dumps.
+        """
+        if self._saved is None:
+            from utils.screenshot_writer import get_screenshot_writer
+
+            if prefix is None:
+                self._saved = get_screenshot_writer().submit(
+                    self.to_image(), self.name, directory=directory
+                )
+            else:
+                clock = time.strftime("%H%M%S", time.localtime(self.captured_at))
+                millis = int(self.captured_at * 1000) % 1000
+                self._saved = get_screenshot_writer().submit(
+                    self.to_image(),
+                    f"{prefix}_{clock}.{millis:03d}_{self.name}",
+                    directory=directory,
+                    timestamp=False,
+                )
+        return self._saved
+
+
+class FlightRecorder:
+    """
+    Ring buffer of the last captures: window frames read by the pixel checks
+    and DEBUG screenshots. Nothing is written while things go well; on a
+    failure (state exception, pixel mismatch, unknown popup) the buffer is
+    dumped to its own folder under logs/screenshots for context; outside
+    DEBUG only its last few captures are.
+    Bounded both in captures and in bytes; the oldest captures go first.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        directory: str = "logs/screenshots",
+        info_frames: Optional[int] = None,
+    ):
+        if capacity is None:
+            capacity = int(os.getenv("FLIGHT_RECORDER_FRAMES", 20))
+        if info_frames is None:
+            info_frames = int(os.getenv("FLIGHT_RECORDER_INFO_FRAMES", 2))
+        if max_bytes is None:
+            max_bytes = int(
+                float(os.getenv("FLIGHT_RECORDER_MAX_MB", 128)) * 1024 * 1024
+            )
+        if cooldown is None:
+            cooldown = float(os.getenv("FLIGHT_RECORDER_COOLDOWN_SECONDS", 300))
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.cooldown = cooldown
+        self.directory = directory
+        self.info_frames = info_frames
+        # Set by the StateManager, so captures know which state took them
+        self.state = "UNKNOWN"
+
+        self._lock = threading.Lock()
+        self._captures: Deque[Capture] = deque()
+        self._bytes = 0
+        self._last_dump: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    @property
+    def size(self) -> int:
+        return len(self._captures)
+
+    def _append(self, capture: Capture) -> None:
+        with self._lock:
+            self._captures.append(capture)
+            self._bytes += capture.nbytes
+            while self._captures and (
+                len(self._captures) > self.capacity or self._bytes > self.max_bytes
+            ):
+                self._bytes -= self._captures.popleft().nbytes
+
+    def record_frame(self, array: np.ndarray, label: str = "frame") -> None:
+        """Keep a window frame; dropped when the recorder is disabled."""
+        if self.enabled:
+            self._append(Capture(array, self.state, label))
+
+    def record(self, image: Image.Image, label: str = "") -> Capture:
+        """
+        Keep a screenshot. With the recorder disabled it is written at once,
+        as debug screenshots used to be.
+        """
+        capture = Capture(image, self.state, label)
+        if self.enabled:
+            self._append(capture)
+        else:
+            capture.save(self.directory)
+        return capture
+
+    def dump(self, reason: str) -> List["Future[Optional[str]]"]:
+        """
+        Write the buffered captures to logs/screenshots/<time>_<reason>/ and
+        empty the buffer: all of them in DEBUG mode, else the last info_frames.
+        The same reason is dumped at most once per cooldown, so a check that
+        keeps failing does not write the buffer every cycle.
+        Never blocks: saves go through the writer queue newest first, so if it
+        fills up the oldest captures are the ones dropped (and counted).
+        """
+        now = time.time()
+        with self._lock:
+            last = self._last_dump.get(reason)
+            if last is not None and now - last < self.cooldown:
+                logger.debug(
+                    f"Skipping dump for {reason}, last one {now - last:.0f}s ago"
+                )
+                return []
+            if not self._captures:
+                return []
+            self._last_dump[reason] = now
+            captures = list(self._captures)
+            self._captures.clear()
+            self._bytes = 0
+
+        if os.getenv("LOG_LEVEL", "INFO").upper() != "DEBUG":
+            captures = captures[-self.info_frames :] if self.info_frames > 0 else []
+        if not captures:
+            return []
+
+        safe_reason = "".join(c if c.isalnum() or c in "-_" else "_" for c in reason)
+        directory = os.path.join(
+            self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_reason}"
+        )
+        futures = [
+            capture.save(directory, prefix=f"{i:02d}")
+            for i, capture in reversed(list(enumerate(captures)))
+        ][::-1]
+        metrics.inc("flight_recorder_dumps_total", reason=reason)
+        logger.info(f"Dumping {len(captures)} captures to {directory} ({reason})")
+        return futures
+
+
+# Shared by the frame cache, coords, popup detection and the states
+flight_recorder = FlightRecorder()
@@ -1,31 +1,92 @@
 import os
+import gzip
+import queue
+import atexit
+import shutil
 import logging
+import threading
+import logging.handlers
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-def configure_logging(name="Logger"):
-    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-    numeric_level = getattr(logging, log_level, logging.INFO)
+_listener = None
+_lock = threading.Lock()
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress the rolled-over log into `dest` (cheminotify.log.1.gz, ...)."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _rotating_handler(path: str, level: int) -> logging.Handler:
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        mode="a",
+        maxBytes=int(float(os.getenv("LOG_ROTATE_MB", 10)) * 1024 * 1024),
+        backupCount=int(os.getenv("LOG_BACKUPS", 5)),
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    handler.setLevel(level)
+    return handler
+
+
+def _setup(numeric_level: int) -> None:
+    """
+    Build the pipeline once: loggers only put records on a queue, a
+    QueueListener thread writes them to the console and the rotating files.
+    """
+    global _listener
 
     os.makedirs("logs", exist_ok=True)
     os.makedirs("logs/screenshots", exist_ok=True)
     os.makedirs("logs/ocr_screenshots", exist_ok=True)
 
+    formatter = logging.Formatter(LOG_FORMAT)
     handlers = [
         logging.StreamHandler(),
-        logging.FileHandler("logs/cheminotify.log", mode="a"),
-        logging.FileHandler("logs/error.log", mode="a"),
+        _rotating_handler("logs/cheminotify.log", logging.NOTSET),
+        # error.log only gets ERROR and above
+        _rotating_handler("logs/error.log", logging.ERROR),
     ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
 
-    # Set error.log to only log ERROR and above
-    error_handler = handlers[2]
-    error_handler.setLevel(logging.ERROR)
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(numeric_level)
 
-    # Configure logging
-    logging.basicConfig(
-        level=numeric_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=handlers,
-        force=True,
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
     )
+    _listener.start()
+    # Write out what is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def configure_logging(name="Logger"):
+    """
+    Logger for `name`. The first call sets up logging for the whole process;
+    later calls only follow LOG_LEVEL, so creating states per session is cheap.
+    """
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    numeric_level = getattr(logging, log_level, logging.INFO)
+
+    with _lock:
+        if _listener is None:
+            _setup(numeric_level)
+        else:
+            logging.getLogger().setLevel(numeric_level)
 
     return logging.getLogger(name)
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from utils.file_utils import append_line
+from utils.logging_config import configure_logging
+
+logger = configure_logging("Metrics")
+
+METRIC_PREFIX = "cheminotify_"
+
+# Seconds; covers a quick pixel check up to a full relaunch
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# HELP lines of the Prometheus textfile
+METRIC_HELP = {
+    "state_handle_seconds": "Duration of AppState.handle() per state",
+    "state_detect_seconds": "Duration of AppState.detect() per state",
+    "state_transitions_total": "State transitions",
+    "state_identify_seconds": "Duration of a screen-state identification",
+    "state_resumes_total": "Sessions resumed from the identified screen, per reason",
+    "state_recoveries_total": "Recovery actions taken after a state error, per action",
+    "state_exceptions_total": "Exceptions raised by a state",
+    "session_timeouts_total": "Sessions ended by the session timeout",
+    "session_seconds": "Duration of a StateManager session",
+    "cycle_seconds": "Time to check every tracked course once",
+    "popups_total": "Popups handled, per popup type",
+    "pixel_mismatches_total": "Pixel checks that matched no expected colour",
+    "pixel_near_matches_total": "Pixel checks matched within tolerance but not exactly",
+    "detection_opening_window_seconds": "Last negative check to the frame that saw the seat",
+    "detection_enqueue_seconds": "Frame that saw the seat to notification enqueue",
+    "detection_delivery_seconds": "Frame that saw the seat to webhook 2xx",
+    "notifications_total": "Notifications sent, per channel and result",
+    "notification_transitions_total": "Availability changes notified, per course",
+    "screenshots_written_total": "Screenshots written by the background writer",
+    "screenshots_dropped_total": "Screenshots dropped because the writer queue was full",
+    "flight_recorder_dumps_total": "Flight recorder dumps, per reason",
+    "retention_deleted_files_total": "Files deleted by the retention service",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _prom_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    In-memory counters and histograms for the state machine.
+    Flushed every METRICS_FLUSH_SECONDS to a JSONL file (one snapshot per
+    line) and to a Prometheus textfile for the node exporter to scrape.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        prom_path: Optional[str] = None,
+        flush_seconds: Optional[float] = None,
+    ):
+        self.jsonl_path = (
+            jsonl_path
+            if jsonl_path is not None
+            else os.getenv("METRICS_JSONL_FILE", "logs/metrics.jsonl")
+        )
+        self.prom_path = (
+            prom_path
+            if prom_path is not None
+            else os.getenv("METRICS_PROM_FILE", "logs/cheminotify.prom")
+        )
+        if flush_seconds is None:
+            flush_seconds = float(os.getenv("METRICS_FLUSH_SECONDS", 30))
+        self.flush_seconds = flush_seconds
+
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._last_flush = time.time()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of the `with` block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def snapshot(self) -> dict:
+        """Plain-dict copy of every series, as written to the JSONL file."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in self._counters.items()
+                for key, value in series.items()
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "count": hist.count,
+                    "sum": round(hist.sum, 6),
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else str(bound)): total
+                        for bound, total in hist.cumulative()
+                    },
+                }
+                for name, series in self._histograms.items()
+                for key, hist in series.items()
+            ]
+        return {"ts": time.time(), "counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (textfile collector)."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = METRIC_PREFIX + name
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {full} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_prom_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                full = METRIC_PREFIX + name
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {full} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, hist in sorted(series.items()):
+                    for bound, total in hist.cumulative():
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(
+                            f"{full}_bucket{_prom_labels(key, ('le', le))} {total}"
+                        )
+                    lines.append(f"{full}_sum{_prom_labels(key)} {hist.sum:.6f}")
+                    lines.append(f"{full}_count{_prom_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Append a snapshot to the JSONL file and rewrite the textfile."""
+        self._last_flush = time.time()
+        try:
+            if self.jsonl_path:
+                # Size-capped: rotated to gzipped archives that retention prunes
+                append_line(self.jsonl_path, json.dumps(self.snapshot()))
+
+            if self.prom_path:
+                os.makedirs(os.path.dirname(self.prom_path) or ".", exist_ok=True)
+                # The node exporter must never read a half-written file
+                tmp_path = f"{self.prom_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                    f.write(self.to_prometheus())
+                os.replace(tmp_path, self.prom_path)
+        except Exception as e:
+            logger.warning(f"Could not flush metrics: {e}")
+
+    def maybe_flush(self) -> None:
+        """Flush if the last flush is older than METRICS_FLUSH_SECONDS."""
+        if time.time() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+
+# Shared by the state manager, the states and the commands
+metrics = MetricsRegistry()
@@ -0,0 +1,192 @@
+import os
+import time
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+
+logger = configure_logging("Retention")
+
+# Files a retention rule may delete; state files (.json) and the live
+# .jsonl logs are never touched, those rotate themselves (file_utils.append_line)
+SCREENSHOT_EXTENSIONS = (".png", ".bmp", ".qoi", ".webp")
+# Rotated logs, gzipped by the logging handlers (utils.logging_config) and
+# by append_line for metrics.jsonl and detections.jsonl
+LOG_ARCHIVE_EXTENSIONS = (".gz",)
+
+MB = 1024 * 1024
+
+
+class RetentionRule:
+    """Age and total-size limits for the matching files under one directory."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_age_days: float,
+        max_mb: float,
+        extensions: Sequence[str] = SCREENSHOT_EXTENSIONS,
+        recursive: bool = True,
+    ):
+        self.directory = directory
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.max_bytes = int(max_mb * MB)
+        self.extensions = tuple(extensions)
+        self.recursive = recursive
+
+
+def _scan(directory: str, extensions: Tuple[str, ...], recursive: bool):
+    """
+    One os.scandir pass over `directory`: (path, mtime, size) of matching files
+    and the subdirectories seen. DirEntry.stat() needs no extra syscall on Windows.
+    """
+    files, subdirs = [], []
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                                subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(extensions):
+                            st = entry.stat(follow_symlinks=False)
+                            files.append((entry.path, st.st_mtime, st.st_size))
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Could not scan {current}: {e}")
+    return files, subdirs
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError as e:
+        logger.warning(f"Failed to delete {path}: {e}")
+        return False
+
+
+def apply_rule(rule: RetentionRule, now: Optional[float] = None) -> Tuple[int, int]:
+    """Enforce one rule. Returns (files deleted, bytes freed)."""
+    if not os.path.isdir(rule.directory):
+        return 0, 0
+    now = now or time.time()
+    files, subdirs = _scan(rule.directory, rule.extensions, rule.recursive)
+
+    deleted, freed = 0, 0
+    kept = []
+    for path, mtime, size in files:
+        if rule.max_age and now - mtime > rule.max_age:
+            if _remove(path):
+                deleted, freed = deleted + 1, freed + size
+                continue
+        kept.append((path, mtime, size))
+
+    # Over the size cap: the oldest files go first
+    total = sum(size for _, _, size in kept)
+    if rule.max_bytes and total > rule.max_bytes:
+        for path, _, size in sorted(kept, key=lambda f: f[1]):
+            if total <= rule.max_bytes:
+                break
+            if _remove(path):
+                deleted, freed, total = deleted + 1, freed + size, total - size
+
+    # Dump folders left empty (deepest first)
+    for subdir in sorted(subdirs, key=len, reverse=True):
+        try:
+            os.rmdir(subdir)
+        except OSError:
+            pass
+
+    return deleted, freed
+
+
+class RetentionService:
+    """
+    Keeps logs/ bounded on long runs. A daemon thread wakes up every
+    RETENTION_INTERVAL_MINUTES and enforces every rule's age and size limits
+    on screenshots and rotated logs. Nothing here runs on the state
+    machine's thread.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[RetentionRule]] = None,
+        interval: Optional[float] = None,
+    ):
+        self.rules = rules if rules is not None else self.default_rules()
+        if interval is None:
+            interval = float(os.getenv("RETENTION_INTERVAL_MINUTES", 60)) * 60
+        self.interval = interval
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def default_rules() -> List[RetentionRule]:
+        days = float(os.getenv("RETENTION_SCREENSHOT_DAYS", 7))
+        max_mb = float(os.getenv("RETENTION_SCREENSHOT_MAX_MB", 500))
+        return [
+            RetentionRule("logs/screenshots", days, max_mb),
+            RetentionRule("logs/ocr_screenshots", days, max_mb),
+            RetentionRule("logs/pixel_screenshots", days, max_mb),
+            RetentionRule(
+                "logs",
+                float(os.getenv("RETENTION_LOG_DAYS", 30)),
+                float(os.getenv("RETENTION_LOG_MAX_MB", 100)),
+                extensions=LOG_ARCHIVE_EXTENSIONS,
+                recursive=False,
+            ),
+        ]
+
+    def run_once(self) -> Tuple[int, int]:
+        """One retention pass. Returns (files deleted, bytes freed)."""
+        started = time.time()
+        deleted, freed = 0, 0
+        for rule in self.rules:
+            rule_deleted, rule_freed = apply_rule(rule, started)
+            deleted, freed = deleted + rule_deleted, freed + rule_freed
+
+        if deleted:
+            metrics.inc("retention_deleted_files_total", deleted)
+        logger.info(
+            f"Retention pass: {deleted} files deleted ({freed / MB:.1f} MB) "
+            f"in {time.time() - started:.2f}s"
+        )
+        return deleted, freed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """First pass right away, then every interval, on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_service: Optional[RetentionService] = None
+
+
+def get_retention_service() -> RetentionService:
+    """Shared retention service."""
+    global _service
+    if _service is None:
+        _service = RetentionService()
+    return _service
@@ -0,0 +1,208 @@
+import os
+import json
+import random
+import datetime
+from typing import List, Optional, Sequence
+
+from utils.logging_config import configure_logging
+
+logger = configure_logging("PollScheduler")
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# How far ahead to look for the next window start
+LOOKAHEAD_DAYS = 14
+
+
+def _parse_time(value: str) -> datetime.time:
+    return datetime.datetime.strptime(value.strip(), "%H:%M").time()
+
+
+class ScheduleWindow:
+    """
+    A time-of-day window with its own polling interval, optionally limited
+    to some dates and/or weekdays. `end` before `start` spans midnight.
+    """
+
+    def __init__(
+        self,
+        start: datetime.time,
+        end: datetime.time,
+        interval_seconds: float,
+        dates: Optional[Sequence[datetime.date]] = None,
+        weekdays: Optional[Sequence[int]] = None,
+    ):
+        self.start = start
+        self.end = end
+        self.interval_seconds = interval_seconds
+        self.dates = set(dates or [])
+        self.weekdays = set(weekdays or [])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScheduleWindow":
+        """
+        {"start": "08:00", "end": "10:00", "every_minutes": 2,
+         "dates": ["2026-11-20"], "weekdays": ["mon", "tue"]}
+        """
+        if "every_seconds" in data:
+            interval = float(data["every_seconds"])
+        else:
+            interval = float(data["every_minutes"]) * 60
+        return cls(
+            start=_parse_time(data.get("start", "00:00")),
+            end=_parse_time(data.get("end", "23:59")),
+            interval_seconds=interval,
+            dates=[datetime.date.fromisoformat(d) for d in data.get("dates", [])],
+            weekdays=[WEEKDAYS.index(d.lower()[:3]) for d in data.get("weekdays", [])],
+        )
+
+    def applies_on(self, day: datetime.date) -> bool:
+        if self.dates and day not in self.dates:
+            return False
+        if self.weekdays and day.weekday() not in self.weekdays:
+            return False
+        return True
+
+    def contains(self, moment: datetime.datetime) -> bool:
+        now = moment.time()
+        if self.start <= self.end:
+            return self.start <= now < self.end and self.applies_on(moment.date())
+        # Overnight: the part after midnight belongs to the previous day's window
+        if now >= self.start:
+            return self.applies_on(moment.date())
+        if now < self.end:
+            return self.applies_on(moment.date() - datetime.timedelta(days=1))
+        return False
+
+    def next_start(self, after: datetime.datetime) -> Optional[datetime.datetime]:
+        for offset in range(LOOKAHEAD_DAYS + 1):
+            day = after.date() + datetime.timedelta(days=offset)
+            start = datetime.datetime.combine(day, self.start)
+            if start > after and self.applies_on(day):
+                return start
+        return None
+
+
+class PollScheduler:
+    """
+    Decides how long to wait before the next check.
+    The first window containing the current time sets the interval, the
+    default interval applies otherwise. Waits get +/- jitter, never sleep
+    through the start of a faster window, and back off exponentially after
+    consecutive infrastructure failures (a session that checked nothing).
+    """
+
+    def __init__(
+        self,
+        default_interval: float,
+        windows: Optional[List[ScheduleWindow]] = None,
+        jitter: float = 0.1,
+        backoff_base: float = 60,
+        backoff_max: float = 3600,
+    ):
+        self.default_interval = default_interval
+        self.windows = windows or []
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, default_interval: float) -> "PollScheduler":
+        """
+        Windows come from POLL_SCHEDULE: a JSON file path or inline JSON,
+        {"windows": [...]} or just the list of windows.
+        """
+        windows = []
+        raw = os.getenv("POLL_SCHEDULE", "").strip()
+        if raw:
+            try:
+                if not raw.startswith(("{", "[")):
+                    with open(raw, "r", encoding="utf-8") as f:
+                        raw = f.read()
+                data = json.loads(raw)
+                if isinstance(data, dict):
+                    data = data.get("windows", [])
+                windows = [ScheduleWindow.from_dict(w) for w in data]
+            except Exception as e:
+                logger.error(f"Invalid POLL_SCHEDULE, using the default interval: {e}")
+                windows = []
+
+        scheduler = cls(
+            default_interval,
+            windows,
+            jitter=float(os.getenv("POLL_JITTER", 0.1)),
+            backoff_base=float(os.getenv("POLL_BACKOFF_BASE_SECONDS", 60)),
+            backoff_max=float(os.getenv("POLL_BACKOFF_MAX_MINUTES", 60)) * 60,
+        )
+        logger.debug(
+            f"Poll schedule: {len(windows)} windows, default every {default_interval:.0f}s"
+        )
+        return scheduler
+
+    def interval_at(self, moment: Optional[datetime.datetime] = None) -> float:
+        moment = moment or datetime.datetime.now()
+        for window in self.windows:
+            if window.contains(moment):
+                return window.interval_seconds
+        return self.default_interval
+
+    def record_success(self) -> None:
+        if self.failures:
+            logger.info(f"Recovered after {self.failures} failed sessions")
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    def next_wait(self, moment: Optional[datetime.datetime] = None) -> float:
+        """Seconds to wait before the next check, from `moment` (default: now)."""
+        moment = moment or datetime.datetime.now()
+        interval = self.interval_at(moment)
+
+        jitter = 1 + random.uniform(-self.jitter, self.jitter)
+
+        if self.failures:
+            backoff = min(
+                self.backoff_max,
+                max(interval, self.backoff_base) * 2 ** (self.failures - 1),
+            )
+            logger.warning(
+                f"{self.failures} consecutive failed sessions, backing off {backoff:.0f}s"
+            )
+            return backoff * jitter
+
+        wait = interval * jitter
+
+        # Wake up for a window that polls faster than the current interval
+        for window in self.windows:
+            if window.interval_seconds >= interval:
+                continue
+            start = window.next_start(moment)
+            if start is not None:
+                wait = min(wait, (start - moment).total_seconds())
+
+        return max(0.0, wait)
+
+    @staticmethod
+    def describe(wait: float) -> str:
+        next_at = datetime.datetime.now() + datetime.timedelta(seconds=wait)
+        return f"in {wait:.0f}s (next at {next_at.strftime('%H:%M:%S')})"
+
+
+_scheduler: Optional[PollScheduler] = None
+
+
+def get_poll_scheduler() -> PollScheduler:
+    """
+    Shared scheduler. Outside schedule windows it polls every
+    POLL_INTERVAL_SECONDS in persistent-session mode, else RETRY_WAIT_MINUTES.
+    """
+    global _scheduler
+    if _scheduler is None:
+        if os.getenv("PERSISTENT_SESSION", "0") == "1":
+            default_interval = float(os.getenv("POLL_INTERVAL_SECONDS", 60))
+        else:
+            default_interval = float(os.getenv("RETRY_WAIT_MINUTES", 15)) * 60
+        _scheduler = PollScheduler.from_env(default_interval)
+    return _scheduler
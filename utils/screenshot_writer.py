@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from PIL import Image
+
+from utils.file_utils import build_filepath
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+
+logger = configure_logging("ScreenshotWriter")
+
+# SCREENSHOT_ENCODER -> (Pillow format, file extension).
+# png at compress_level 1 is several times faster than Pillow's default 6,
+# raw (BMP) and QOI barely encode at all, lossless WebP gives the smallest files.
+ENCODERS = {
+    "png": ("PNG", "png"),
+    "raw": ("BMP", "bmp"),
+    "qoi": ("QOI", "qoi"),
+    "webp": ("WEBP", "webp"),
+}
+
+
+def _supported(encoder: str) -> bool:
+    """Whether this Pillow build can write the encoder's format."""
+    Image.init()
+    return encoder in ENCODERS and ENCODERS[encoder][0] in Image.SAVE
+
+
+class ScreenshotWriter:
+    """
+    Encodes and writes screenshots on a background thread, so states never
+    pay for PNG compression. The queue is bounded: when it is full the
+    screenshot is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        encoder: Optional[str] = None,
+        png_level: Optional[int] = None,
+    ):
+        queue_size = queue_size or int(os.getenv("SCREENSHOT_QUEUE_SIZE", 16))
+        encoder = (encoder or os.getenv("SCREENSHOT_ENCODER", "png")).lower()
+        if not _supported(encoder):
+            logger.warning(f"Screenshot encoder '{encoder}' unavailable, using png")
+            encoder = "png"
+        self.encoder = encoder
+        if png_level is None:
+            png_level = int(os.getenv("SCREENSHOT_PNG_LEVEL", 1))
+        self.png_level = png_level
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="ScreenshotWriter", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def extension(self) -> str:
+        return ENCODERS[self.encoder][1]
+
+    def _save_options(self) -> dict:
+        fmt = ENCODERS[self.encoder][0]
+        if fmt == "PNG":
+            return {"format": fmt, "compress_level": self.png_level}
+        if fmt == "WEBP":
+            return {"format": fmt, "lossless": True, "method": 0}
+        return {"format": fmt}
+
+    def submit(
+        self,
+        img: Image.Image,
+        base_name: str,
+        directory: str = "logs/screenshots",
+        suffix: Optional[str] = None,
+        timestamp: bool = True,
+    ) -> "Future[Optional[str]]":
+        """
+        Queue `img` for writing and return at once. The future resolves to
+        the file path, or None if the screenshot was dropped or failed.
+        The file name is timestamped now, not when it gets written.
+        """
+        future: Future = Future()
+        path = build_filepath(base_name, directory, self.extension, timestamp, suffix)
+        try:
+            self._queue.put_nowait((img, path, future))
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("screenshots_dropped_total")
+            logger.warning(f"Screenshot queue full, dropped {os.path.basename(path)}")
+            future.set_result(None)
+        return future
+
+    def _run(self) -> None:
+        while True:
+            img, path, future = self._queue.get()
+            try:
+                future.set_result(self._write(img, path))
+            except Exception as e:
+                logger.error(f"Failed to write screenshot {path}: {e}")
+                future.set_result(None)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, img: Image.Image, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        img.save(path, **self._save_options())
+        self.written += 1
+        metrics.inc("screenshots_written_total", encoder=self.encoder)
+        logger.debug(f"Screenshot saved: {path}")
+        return path
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued screenshots; True if every one was written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(
+                        f"{self._queue.unfinished_tasks} screenshots still queued after {timeout}s"
+                    )
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+
+_writer: Optional[ScreenshotWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    """Shared writer, started on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScreenshotWriter()
+    return _writer
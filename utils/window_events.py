@@ -0,0 +1,309 @@
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from utils.logging_config import configure_logging
+
+logger = configure_logging("WindowEvents")
+
+
+class WindowEventSource(ABC):
+    """
+    Wakes waiters when a top-level window is created, shown or renamed.
+    Subclasses feed events through `_emit`; callers block in `wait`.
+    """
+
+    # False for sources that can only sleep between polls
+    event_driven = True
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self.events: Deque[Tuple[int, int, float]] = deque(maxlen=256)
+
+    @property
+    def seq(self) -> int:
+        """Number of events seen so far; pass it to `wait` to block for newer ones."""
+        return self._seq
+
+    def _emit(self, hwnd: int) -> None:
+        with self._cond:
+            self._seq += 1
+            self.events.append((self._seq, hwnd, time.time()))
+            self._cond.notify_all()
+
+    def wait(self, after_seq: int, timeout: float) -> bool:
+        """
+        Block until an event newer than `after_seq` arrives or `timeout` elapses.
+        Returns True if an event arrived.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq > after_seq, timeout)
+
+    @abstractmethod
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class PollingWindowEventSource(WindowEventSource):
+    """Fallback that has no events at all: waiting just sleeps."""
+
+    event_driven = False
+
+    def start(self) -> None:
+        pass
+
+    def wait(self, after_seq: int, timeout: float) -> bool:
+        time.sleep(max(0.0, timeout))
+        return False
+
+
+class FakeWindowEventSource(WindowEventSource):
+    """Event source driven by hand, for tests and the simulated desktop."""
+
+    def start(self) -> None:
+        pass
+
+    def emit(self, hwnd: int) -> None:
+        self._emit(hwnd)
+
+
+class WinEventHookSource(WindowEventSource):
+    """
+    Windows backend: SetWinEventHook for EVENT_OBJECT_CREATE/SHOW/NAMECHANGE
+    on top-level windows, pumped by a message loop on its own thread.
+    """
+
+    EVENT_OBJECT_CREATE = 0x8000
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    GA_ROOT = 2
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._error: Optional[Exception] = None
+        self._callback = None
+        self._user32_dll = None
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="WinEventHook", daemon=True
+        )
+        self._thread.start()
+        if not self._ready.wait(2.0):
+            raise RuntimeError("WinEvent hook thread did not start")
+        if self._error is not None:
+            # No hooks means no events: let the caller fall back to polling
+            self._thread = None
+            raise self._error
+
+    @staticmethod
+    def _load_user32(WinEventProc):
+        """
+        A private user32 with the prototypes declared, so 64-bit handles are
+        not truncated to int; other ctypes users keep the shared windll.user32.
+        """
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = (
+            wintypes.DWORD,
+            wintypes.DWORD,
+            wintypes.HMODULE,
+            WinEventProc,
+            wintypes.DWORD,
+            wintypes.DWORD,
+            wintypes.DWORD,
+        )
+        user32.UnhookWinEvent.restype = wintypes.BOOL
+        user32.UnhookWinEvent.argtypes = (wintypes.HANDLE,)
+        user32.GetAncestor.restype = wintypes.HWND
+        user32.GetAncestor.argtypes = (wintypes.HWND, wintypes.UINT)
+        user32.GetMessageW.restype = wintypes.BOOL
+        user32.GetMessageW.argtypes = (
+            ctypes.POINTER(wintypes.MSG),
+            wintypes.HWND,
+            wintypes.UINT,
+            wintypes.UINT,
+        )
+        user32.TranslateMessage.argtypes = (ctypes.POINTER(wintypes.MSG),)
+        user32.DispatchMessageW.argtypes = (ctypes.POINTER(wintypes.MSG),)
+        user32.PostThreadMessageW.restype = wintypes.BOOL
+        user32.PostThreadMessageW.argtypes = (
+            wintypes.DWORD,
+            wintypes.UINT,
+            wintypes.WPARAM,
+            wintypes.LPARAM,
+        )
+        return user32
+
+    def _run(self) -> None:
+        try:
+            hooks = self._set_hooks()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = self._user32_dll
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
+
+    def _set_hooks(self) -> list:
+        """Install both hooks on this thread; raises if either is refused."""
+        import ctypes
+        from ctypes import wintypes
+
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None,
+            wintypes.HANDLE,
+            wintypes.DWORD,
+            wintypes.HWND,
+            wintypes.LONG,
+            wintypes.LONG,
+            wintypes.DWORD,
+            wintypes.DWORD,
+        )
+        user32 = self._user32_dll = self._load_user32(WinEventProc)
+        kernel32 = ctypes.WinDLL("kernel32")
+
+        def _on_event(hook, event, hwnd, id_object, id_child, thread, timestamp):
+            if id_object != self.OBJID_WINDOW or id_child != 0 or not hwnd:
+                return
+            # Only top-level windows can be popups
+            if user32.GetAncestor(hwnd, self.GA_ROOT) != hwnd:
+                return
+            self._emit(hwnd)
+
+        # Keep a reference or ctypes frees the callback under our feet
+        self._callback = WinEventProc(_on_event)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        hooks = []
+        for first, last in (
+            (self.EVENT_OBJECT_CREATE, self.EVENT_OBJECT_SHOW),
+            (self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE),
+        ):
+            hook = user32.SetWinEventHook(
+                first, last, None, self._callback, 0, 0, flags
+            )
+            if not hook:
+                error = ctypes.WinError(ctypes.get_last_error())
+                for installed in hooks:
+                    user32.UnhookWinEvent(installed)
+                raise error
+            hooks.append(hook)
+        self._thread_id = kernel32.GetCurrentThreadId()
+        return hooks
+
+    def stop(self) -> None:
+        if self._thread_id is not None:
+            self._user32_dll.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread_id = None
+            self._thread = None
+
+
+class X11WindowEventSource(WindowEventSource):
+    """
+    Linux backend: listens for CreateNotify/MapNotify on the root window.
+    Requires the optional `python-xlib` package.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        from Xlib import X, display
+
+        self._display = display.Display()
+        root = self._display.screen().root
+        root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        self._display.flush()
+
+        self._thread = threading.Thread(
+            target=self._run, args=(X,), name="X11WindowEvents", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, X) -> None:
+        while not self._stopped.is_set():
+            event = self._display.next_event()
+            if event.type in (X.CreateNotify, X.MapNotify):
+                self._emit(event.window.id)
+
+    def stop(self) -> None:
+        # next_event() blocks, so the daemon thread exits on the next event
+        self._stopped.set()
+        self._thread = None
+
+
+_source: Optional[WindowEventSource] = None
+
+
+def _create_source() -> WindowEventSource:
+    backend = os.getenv("WINDOW_EVENTS_BACKEND", "auto").lower()
+    if backend == "polling":
+        return PollingWindowEventSource()
+
+    if backend in ("auto", "winevent") and sys.platform == "win32":
+        return WinEventHookSource()
+    if backend in ("auto", "x11") and os.getenv("DISPLAY"):
+        return X11WindowEventSource()
+
+    return PollingWindowEventSource()
+
+
+def get_window_event_source() -> WindowEventSource:
+    """Shared event source, started on first use. Falls back to polling."""
+    global _source
+    if _source is None:
+        source = _create_source()
+        try:
+            source.start()
+        except Exception as e:
+            logger.warning(
+                f"{source.__class__.__name__} unavailable ({e}), falling back to polling"
+            )
+            source = PollingWindowEventSource()
+        logger.debug(f"Window event source: {source.__class__.__name__}")
+        _source = source
+    return _source
+
+
+def set_window_event_source(source: Optional[WindowEventSource]) -> None:
+    """Swap the shared event source (e.g. a FakeWindowEventSource in tests)."""
+    global _source
+    if _source is not None and _source is not source:
+        _source.stop()
+    _source = source
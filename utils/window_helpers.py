@@ -1,32 +1,69 @@
 import time
+from typing import Set, Optional, Union
+
 import pygetwindow as gw
-from typing import Set, Optional
+
+from utils.window_events import get_window_event_source
+from utils.window_registry import WindowSnapshot, window_registry
+
+# With an event source, still look again now and then in case a title
+# shows up without an event we listen to
+EVENT_RECHECK_SECONDS = 0.5
 
 
 def list_window_titles() -> Set[str]:
     """Return the set of all non-empty window titles right now."""
-    return {w.title for w in gw.getAllWindows() if w.title.strip()}
+    return window_registry.titles()
+
+
+def _new_window(
+    before: Union[Set[str], WindowSnapshot], ignore: Set[str]
+) -> Optional[gw.Window]:
+    snap = window_registry.snapshot(refresh=True)
+    if isinstance(before, WindowSnapshot):
+        candidates = snap.new_since(before)
+    else:
+        candidates = [
+            w for hwnd, w in snap.windows.items() if snap.titles[hwnd] not in before
+        ]
+    # return the first new window we see
+    for window in candidates:
+        title = snap.titles[window._hWnd]
+        if title.strip() and title not in ignore:
+            return window
+    return None
 
 
 def wait_for_new_window(
-    before: Set[str],
+    before: Union[Set[str], WindowSnapshot],
     timeout: float = 2.0,
     poll: float = 0.1,
     ignore: Optional[Set[str]] = None,
-) -> Optional[str]:
+) -> Optional[gw.Window]:
     """
-    Poll for up to `timeout` seconds for a window title to appear
-    that wasn't in `before`.  Returns the new title, or None if none arrive.
+    Wait for up to `timeout` seconds for a window to appear that wasn't in
+    `before`.  Returns the new window itself, or None if none arrive: looking
+    it up again by title could pick an older window with the same title.
+
+    `before` is either a set of titles or a registry snapshot; with a snapshot
+    new windows are found by hwnd, so a popup reusing an existing title is seen too.
+
+    Blocks on window creation/show events when an event backend is available,
+    and falls back to polling every `poll` seconds otherwise.
     """
     ignore = ignore or set()
+    source = get_window_event_source()
     deadline = time.time() + timeout
 
-    while time.time() < deadline:
-        now = list_window_titles()
-        diff = now - before - ignore
-        if diff:
-            # return the first new title we see
-            return diff.pop()
-        time.sleep(poll)
+    while True:
+        seq = source.seq
+        new_window = _new_window(before, ignore)
+        if new_window is not None:
+            return new_window
 
-    return None
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+
+        wait = EVENT_RECHECK_SECONDS if source.event_driven else poll
+        source.wait(seq, min(remaining, wait))
@@ -0,0 +1,110 @@
+import os
+import re
+import time
+import unicodedata
+import pygetwindow as gw
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def normalize(txt: str) -> str:
+    """
+    Normalize text for window matching: lower, ascii, strip, collapse whitespace.
+    """
+    txt = unicodedata.normalize("NFD", txt)
+    txt = txt.encode("ascii", "ignore").decode("utf-8")
+    txt = re.sub(r"\s+", " ", txt)
+    return txt.lower().strip()
+
+
+class WindowSnapshot:
+    """All top-level windows at one point in time, indexed by hwnd."""
+
+    def __init__(self, windows: Iterable[gw.Window]):
+        self.taken_at = time.time()
+        self.windows: Dict[int, gw.Window] = {}
+        # Window.title asks Win32 every time, so read each title once here
+        self.titles: Dict[int, str] = {}
+        for win in windows:
+            self.windows[win._hWnd] = win
+            self.titles[win._hWnd] = win.title
+        # Set of all non-empty window titles in this snapshot
+        self.title_set: Set[str] = {t for t in self.titles.values() if t.strip()}
+
+    def new_since(self, previous: "WindowSnapshot") -> List[gw.Window]:
+        """Windows present now but not in `previous`."""
+        return [w for hwnd, w in self.windows.items() if hwnd not in previous.windows]
+
+    def closed_since(self, previous: "WindowSnapshot") -> Dict[int, str]:
+        """hwnd -> title of the windows from `previous` that are gone now."""
+        return {
+            hwnd: title
+            for hwnd, title in previous.titles.items()
+            if hwnd not in self.windows
+        }
+
+
+class WindowRegistry:
+    """
+    Enumerates windows once per tick and shares the result between callers.
+    Normalized titles are memoized by raw title, so polling loops don't
+    redo the NFD + regex work for windows that didn't change.
+    """
+
+    MAX_CACHED_TITLES = 1024
+
+    def __init__(self, tick: Optional[float] = None):
+        if tick is None:
+            tick = float(os.getenv("WINDOW_REGISTRY_TICK_SECONDS", 0.05))
+        self.tick = tick
+        self._snapshot: Optional[WindowSnapshot] = None
+        self._normalized: Dict[str, str] = {}
+
+    def snapshot(self, refresh: bool = False) -> WindowSnapshot:
+        """Current snapshot, enumerating again only when the last one is older than a tick."""
+        snap = self._snapshot
+        if refresh or snap is None or time.time() - snap.taken_at > self.tick:
+            snap = self._snapshot = WindowSnapshot(gw.getAllWindows())
+        return snap
+
+    def invalidate(self) -> None:
+        """Force the next call to enumerate again (e.g. after closing a window)."""
+        self._snapshot = None
+
+    def normalized(self, title: str) -> str:
+        norm = self._normalized.get(title)
+        if norm is None:
+            if len(self._normalized) >= self.MAX_CACHED_TITLES:
+                self._normalized.clear()
+            norm = self._normalized[title] = normalize(title)
+        return norm
+
+    def titles(self, refresh: bool = False) -> Set[str]:
+        return set(self.snapshot(refresh).title_set)
+
+    def by_hwnd(self, hwnd: int) -> Optional[gw.Window]:
+        return self.snapshot().windows.get(hwnd)
+
+    def with_title(self, title: str) -> Optional[gw.Window]:
+        """First window whose raw title is exactly `title`."""
+        snap = self.snapshot()
+        for hwnd, win_title in snap.titles.items():
+            if win_title == title:
+                return snap.windows[hwnd]
+        return None
+
+    def find(self, titles: Iterable[str]) -> Optional[gw.Window]:
+        """
+        First window whose normalized title contains one of `titles`.
+        Earlier entries of `titles` take priority.
+        """
+        snap = self.snapshot()
+        for title in titles:
+            wanted = self.normalized(title)
+            for hwnd, win_title in snap.titles.items():
+                if wanted in self.normalized(win_title):
+                    return snap.windows[hwnd]
+        return None
+
+
+# Shared by the states, the popup detector and the window helpers
+window_registry = WindowRegistry()